@@ -0,0 +1,192 @@
+"""
+Per-request overhead of the auth middleware.
+
+Drives the ASGI stack in process, without sockets or Redis, and compares the pure ASGI
+`AuthMiddleware` with a `BaseHTTPMiddleware` reproduction of its previous implementation.
+
+    uv run python -m benchmarks.auth_middleware --requests 20000
+"""
+
+from typing import Any
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from collections.abc import Callable
+from uuid import uuid4
+
+from async_fastapi_jwt_auth import AuthJWT
+from fastapi import Request
+from pydantic import BaseModel
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.database.repository.redis import RedisConfig, TokenKey
+from core.security.auth.blacklist import BlacklistCache, BlacklistCacheConfig
+from core.security.auth.exceptions import AuthJWTError, BlacklistError
+from core.security.auth.ip_checker import IPChecker, NetworkConfig
+from core.security.auth.middleware import AuthMiddleware
+from core.security.auth.permissions import PermissionChecker
+from core.security.auth.schemas import UserId
+
+BLACKLIST = ["10.0.0.0/8", "192.168.0.0/16", "2001:db8::/32"]
+CHUNK = b"x" * 64 * 1024
+CHUNKS = 64
+
+
+class JWTSettings(BaseModel):
+    authjwt_secret_key: str = "benchmark-only-signing-key-0123456789"
+    authjwt_token_location: set[str] = {"cookies"}
+    authjwt_cookie_csrf_protect: bool = False
+
+
+@AuthJWT.load_config
+def get_config() -> JWTSettings:
+    return JWTSettings()
+
+
+class InMemoryRedis:
+    """The Redis calls the middleware makes, without a server."""
+
+    def __init__(self) -> None:
+        self.keys: set[str] = set()
+
+    async def exists(self, key: str) -> bool:
+        return key in self.keys
+
+    async def get(self, key: str) -> str | None:
+        return None
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """Previous middleware: BaseHTTPMiddleware, IPChecker per request, full AuthJWT checks."""
+
+    def __init__(self, app: ASGIApp, redis: InMemoryRedis) -> None:
+        super().__init__(app)
+        self.permission_checker = PermissionChecker(["/check"])
+        self.blacklist = NetworkConfig(blacklist=BLACKLIST)
+        self.redis = redis
+        self.logger = logging.getLogger("legacy_auth_middleware")
+
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Any]) -> Response:
+        self.logger.info("Request: query params: %s; headers: %s", request.query_params, request.headers)
+        authjwt = AuthJWT(request)
+        path = request.url.path.split("v1")[-1]
+        if IPChecker(self.blacklist).is_blocked(request.client.host if request.client else ""):
+            return JSONResponse(status_code=BlacklistError().status_code, content={})
+        if not self.permission_checker.is_exempt(path):
+            await authjwt.jwt_required()
+            access_token = await authjwt.get_raw_jwt()
+            await authjwt.jwt_refresh_token_required()
+            refresh_token = await authjwt.get_raw_jwt()
+            if not access_token or not refresh_token:
+                return JSONResponse(status_code=AuthJWTError().status_code, content={})
+            if await self.redis.exists(TokenKey(jti=str(refresh_token["jti"])).key):
+                return JSONResponse(status_code=AuthJWTError().status_code, content={})
+            request.state.user_id = UserId.model_validate_json(str(access_token["sub"])).user_id
+        return await call_next(request)
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    response: Response
+    if scope["path"].endswith("/download"):
+
+        async def body() -> Any:
+            for _ in range(CHUNKS):
+                yield CHUNK
+
+        response = StreamingResponse(body())
+    else:
+        response = PlainTextResponse("ok")
+    await response(scope, receive, send)
+
+
+async def cookie_header() -> bytes:
+    authjwt = AuthJWT()
+    subject = UserId(user_id=uuid4()).model_dump_json()
+    access = await authjwt.create_access_token(subject=subject)
+    refresh = await authjwt.create_refresh_token(subject=subject)
+    return f"access_token_cookie={access}; refresh_token_cookie={refresh}".encode()
+
+
+async def run(app: ASGIApp, path: str, cookies: bytes, requests: int) -> float:
+    """Mean microseconds per request."""
+    scope_template: Scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"cookie", cookies)],
+        "client": ("203.0.113.7", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> Message:
+        # Empty body, then a client that stays connected until the response is sent.
+        if not sent_body:
+            sent_body.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"Unexpected status {message['status']} for {path}")
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        sent_body: list[bool] = []
+        await app(dict(scope_template), receive, send)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def discard_log_output() -> None:
+    """Keep records formatted and emitted as in production, but write them to /dev/null."""
+    devnull = open(os.devnull, "w")  # noqa: SIM115, PTH123
+    loggers = [logging.getLogger(), *logging.Logger.manager.loggerDict.values()]
+    for logger in loggers:
+        for handler in getattr(logger, "handlers", []):
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(devnull)
+
+
+async def main(requests: int) -> None:
+    discard_log_output()
+    cookies = await cookie_header()
+    redis = InMemoryRedis()
+
+    asgi = AuthMiddleware(
+        endpoint,
+        permission_checker=PermissionChecker(["/check"]),
+        blacklist=BLACKLIST,
+        api_version="v1",
+        redis_config=RedisConfig(dsn="redis://unused", password=""),
+        blacklist_cache=BlacklistCache(BlacklistCacheConfig()),
+    )
+    asgi._redis_repo = redis  # type: ignore[assignment]
+    stacks: dict[str, ASGIApp] = {
+        "no middleware": endpoint,
+        "BaseHTTPMiddleware (before)": LegacyAuthMiddleware(endpoint, redis),
+        "pure ASGI (after)": asgi,
+    }
+
+    print(f"{'stack':<30}{'exempt':>12}{'authenticated':>16}{'4 MiB stream':>16}   us/request")
+    for name, app in stacks.items():
+        exempt = await run(app, "/api/v1/check", cookies, requests)
+        authenticated = await run(app, "/api/v1/files/", cookies, requests)
+        streamed = await run(app, "/api/v1/files/download", cookies, max(requests // 20, 1))
+        print(f"{name:<30}{exempt:>12.1f}{authenticated:>16.1f}{streamed:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10_000)
+    asyncio.run(main(parser.parse_args().requests))
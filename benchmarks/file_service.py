@@ -0,0 +1,150 @@
+"""
+Throughput of `FileService.upload` and `FileService.download`, end to end.
+
+On top of the storage calls `benchmarks.object_storage` measures, this includes hashing the
+spooled upload, taking the blob reference and recording the version in Postgres, and the
+cached metadata lookup of a download. Needs the Postgres (migrated) and Redis of the files
+service, configured as for the service; storage is `InMemoryStorageClient` unless `--backend
+settings` picks the configured one. Rows and objects it creates are deleted at the end.
+
+    PYTHONPATH=services/files/src uv run python -m benchmarks.file_service --size-mib 64
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from datetime import timedelta
+from io import BytesIO
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.auth_middleware import discard_log_output
+from conf.settings import settings
+from core.client.memory import InMemoryStorageClient
+from core.client.minio import ObjectStorageProtocol
+from core.database.postgres import PostgresEngine
+from core.database.repository.minio import MinioRepository
+from core.database.repository.redis import RedisConfig, RedisPoolConfig, RedisRepository, get_redis_client
+from core.database.schemas.minio import ObjectStorageConfig
+from repositories import (
+    BlobRepository,
+    CachedFileVersionRepository,
+    FileRepository,
+    FileVersionRepository,
+    UserRepository,
+    get_db_session,
+    get_minio_client,
+    get_pg_config,
+)
+from schemas.file import FileCreateData
+from services.file import FileService
+
+BUCKET = "files"
+
+
+async def timed(label: str, size: int, action: Callable[[], Awaitable[object]]) -> None:
+    started = time.perf_counter()
+    await action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32}{size / elapsed / 1024 / 1024:>12.1f} MiB/s{elapsed * 1000:>12.1f} ms")
+
+
+Action = Callable[[FileService], Awaitable[object]]
+
+
+async def in_session(storage: ObjectStorageProtocol, redis: RedisRepository, action: Action) -> None:
+    """Run `action` with a service on its own session, as one request would."""
+    async for session in get_db_session():
+        await action(file_service(session, storage, redis))
+
+
+def file_service(session: AsyncSession, storage: ObjectStorageProtocol, redis: RedisRepository) -> FileService:
+    version_repo = FileVersionRepository(session=session)
+    return FileService(
+        db_session=session,
+        minio_repo=MinioRepository(storage),
+        redis_repo=redis,
+        user_repo=UserRepository(session=session),
+        file_repo=FileRepository(session=session),
+        file_version_repo=version_repo,
+        blob_repo=BlobRepository(session=session),
+        version_cache=CachedFileVersionRepository(
+            repo=version_repo, redis=redis, ttl=timedelta(seconds=settings.redis.metadata_ttl)
+        ),
+    )
+
+
+def upload(user_id: UUID, path: str, data: bytes) -> Action:
+    file = UploadFile(BytesIO(data), size=len(data), filename=path.rsplit("/", 1)[-1])
+    return lambda service: service.upload(file, FileCreateData(path=path, user_id=user_id, bucket=BUCKET))
+
+
+def download(path: str, range_header: str | None = None) -> Action:
+    async def drain(service: FileService) -> None:
+        result = await service.download(path, range_header)
+        if result.content is not None:
+            async for _ in result.content:
+                pass
+
+    return drain
+
+
+def delete(user_id: UUID, path: str) -> Action:
+    return lambda service: service.delete(user_id, path)
+
+
+def get_storage(backend: str) -> ObjectStorageProtocol:
+    if backend == "settings":
+        return get_minio_client()
+    return InMemoryStorageClient(
+        ObjectStorageConfig(endpoint="memory", access_key="", secret_key="", part_size=settings.minio.part_size)
+    )
+
+
+async def main(size: int, backend: str) -> None:
+    discard_log_output()
+    # Downloads are streamed by the service here, not handed over to nginx.
+    settings.api.accel_redirect = None
+    storage = get_storage(backend)
+    await PostgresEngine.ensure_engine(get_pg_config())
+    redis = RedisRepository(
+        redis=await get_redis_client(RedisConfig(dsn=settings.redis.dsn, password=settings.redis.password))
+    )
+    user_id = uuid4()
+    prefix = f"/benchmarks/{uuid4()}"
+    data = os.urandom(size)
+
+    print(f"{'path':<32}{'throughput':>12}{'latency':>17}   {size // 1024 // 1024} MiB file, {backend} storage")
+    try:
+        await timed(
+            "upload, new content", size, lambda: in_session(storage, redis, upload(user_id, f"{prefix}/new", data))
+        )
+        await timed(
+            "upload, known content", size, lambda: in_session(storage, redis, upload(user_id, f"{prefix}/copy", data))
+        )
+        await timed("full download", size, lambda: in_session(storage, redis, download(f"{prefix}/new")))
+        await timed(
+            "ranged download (second half)",
+            size // 2,
+            lambda: in_session(storage, redis, download(f"{prefix}/new", f"bytes={size // 2}-")),
+        )
+    finally:
+        for name in ("new", "copy"):
+            with suppress(HTTPException):
+                await in_session(storage, redis, delete(user_id, f"{prefix}/{name}"))
+        await RedisPoolConfig.close_pool()
+        await PostgresEngine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mib", type=int, default=64)
+    parser.add_argument("--backend", choices=["memory", "settings"], default="memory")
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mib * 1024 * 1024, args.backend))
@@ -0,0 +1,108 @@
+"""
+Throughput of the upload and download paths of `MinioRepository`.
+
+Runs against `InMemoryStorageClient`, so it measures our own code (chunking, hashing,
+multipart assembly, ranged reads) rather than the network or a MinIO server, or against
+`FilesystemStorageClient` in a temporary directory (point TMPDIR at the disk to measure).
+`benchmarks.file_service` measures the same paths through `FileService`, database included.
+
+    uv run python -m benchmarks.object_storage --size-mib 256 --backend filesystem
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from collections.abc import Awaitable, Callable
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from uuid import uuid4
+
+from benchmarks.auth_middleware import discard_log_output
+from core.client.filesystem import FilesystemStorageClient
+from core.client.memory import InMemoryStorageClient
+from core.client.minio import ObjectStorageProtocol
+from core.database.repository.minio import MinioRepository
+from core.database.schemas.minio import (
+    MinioBlobDownload,
+    MinioBlobStream,
+    ObjectStorageConfig,
+    StagedObject,
+    StorageBlob,
+    StoragePart,
+)
+
+PART_SIZE = 8 * 1024 * 1024
+
+
+class BytesReader:
+    """`AsyncReader` over an in-memory buffer, like an `UploadFile` already spooled."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._data.read(size)
+
+
+async def timed(label: str, size: int, action: Callable[[], Awaitable[object]]) -> None:
+    started = time.perf_counter()
+    await action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32}{size / elapsed / 1024 / 1024:>12.1f} MiB/s")
+
+
+async def main(size: int, backend: str) -> None:
+    discard_log_output()
+    config = ObjectStorageConfig(endpoint="memory", access_key="", secret_key="", part_size=PART_SIZE)
+    storage: ObjectStorageProtocol
+    if backend == "filesystem":
+        root = tempfile.TemporaryDirectory(prefix="bench-storage-")
+        storage = FilesystemStorageClient(config, Path(root.name), fsync=False)
+    else:
+        storage = InMemoryStorageClient(config)
+    repo = MinioRepository(storage)
+    data = bytes(size)
+    blob = StorageBlob(checksum=sha256(data).hexdigest())
+
+    async def drain(download: MinioBlobDownload) -> None:
+        async for _ in repo.download_file(download):
+            pass
+
+    async def multipart() -> None:
+        staged = StagedObject(upload_id=uuid4())
+        upload_id = await repo.start_multipart_upload(staged)
+        parts = [
+            StoragePart(
+                part_number=number,
+                etag=await repo.upload_part(staged, upload_id, number, data[offset : offset + PART_SIZE]),
+            )
+            for number, offset in enumerate(range(0, size, PART_SIZE), start=1)
+        ]
+        await repo.complete_multipart_upload(staged, upload_id, parts)
+        await repo.checksum_file(staged)
+        await repo.promote_staged(staged, blob)
+
+    print(f"{'path':<32}{'throughput':>12}   {size // 1024 // 1024} MiB object, {PART_SIZE // 1024 // 1024} MiB parts")
+    await timed(
+        "streamed upload",
+        size,
+        lambda: repo.upload_file_stream(MinioBlobStream(checksum=blob.checksum, stream=BytesReader(data))),
+    )
+    await timed("multipart upload + verify", size, multipart)
+    await timed("full download", size, lambda: drain(MinioBlobDownload(checksum=blob.checksum)))
+    await timed(
+        "ranged download (second half)",
+        size // 2,
+        lambda: drain(MinioBlobDownload(checksum=blob.checksum, offset=size // 2)),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mib", type=int, default=256)
+    parser.add_argument("--backend", choices=["memory", "filesystem"], default="memory")
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mib * 1024 * 1024, args.backend))
@@ -0,0 +1,319 @@
+from typing import IO, TextIO
+
+import fcntl
+
+from asyncio import Task, create_task, shield, to_thread
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from contextlib import suppress
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from uuid import uuid4
+
+from minio import S3Error
+from pydantic import BaseModel
+
+from core.client.filesystem import FilesystemStorageClient, is_temporary
+from core.client.minio import ObjectStorageProtocol
+from core.database.schemas.minio import (
+    AsyncReader,
+    ObjectStorageConfig,
+    PresignedUpload,
+    StorageObject,
+    StorageObjectStat,
+    StoragePart,
+    UploadedObject,
+)
+from core.logging.logger import CoreLogger
+
+logger = CoreLogger.get_logger("storage_cache")
+
+CACHE_BUCKET = "objects"
+
+
+class StorageCacheStats(BaseModel):
+    hits: int
+    misses: int
+    bypassed: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: int
+
+
+class CachedStorageClient(ObjectStorageProtocol):
+    """
+    Read-through cache on local disk in front of another storage client, for immutable objects.
+
+    Whole objects are kept under `root` and evicted least recently used first once they take
+    more than `max_size` bytes. A miss starts a fill, one per object, which writes a temporary
+    file and renames it into place; concurrent misses of the whole object wait for it and are read
+    from disk, ranges are streamed from `storage` meanwhile. Objects larger than `max_object_size`,
+    remembered once a fill finds one, and names starting with one of `exclude` are always read from
+    `storage`.
+
+    Each process indexes its own slot directory under `root`, locked while the process lives, so
+    worker processes never evict each other's files; `max_size` applies to every slot.
+    """
+
+    def __init__(
+        self,
+        storage: ObjectStorageProtocol,
+        config: ObjectStorageConfig,
+        root: Path,
+        max_size: int,
+        max_object_size: int,
+        exclude: tuple[str, ...] = ("uploads/",),
+    ) -> None:
+        self.storage = storage
+        self.max_size = max_size
+        self.max_object_size = min(max_object_size, max_size)
+        self.exclude = exclude
+        self._config = config
+        self._root = root
+        self._slot_lock: TextIO | None = None
+        self._opening: Task[FilesystemStorageClient] | None = None
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._fills: dict[str, Task[None]] = {}
+        self._oversized: set[str] = set()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _key(object_name: str) -> str:
+        digest = sha256(object_name.encode()).hexdigest()
+        return f"{digest[:2]}/{digest}"
+
+    def _claim_slot(self) -> Path:
+        """Lock the first slot directory no other process holds; the lock goes with the process."""
+        self._root.mkdir(parents=True, exist_ok=True)
+        number = 0
+        while True:
+            slot = self._root / f"slot-{number}"
+            slot.mkdir(exist_ok=True)
+            lock = (slot / "lock").open("a")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                number += 1
+                continue
+            self._slot_lock = lock
+            return slot
+
+    @staticmethod
+    def _scan(directory: Path) -> list[tuple[float, str, int]]:
+        """Objects an earlier run cached, as (last read, key, size); unfinished fills go."""
+        found = []
+        for path in directory.glob("*/*"):
+            if is_temporary(path.name):
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            found.append((stat.st_atime, path.relative_to(directory).as_posix(), stat.st_size))
+        return found
+
+    async def _load(self) -> FilesystemStorageClient:
+        slot = await to_thread(self._claim_slot)
+        disk = FilesystemStorageClient(self._config, slot, fsync=False, default_bucket=CACHE_BUCKET)
+        for _, key, size in sorted(await to_thread(self._scan, slot / CACHE_BUCKET)):
+            self._entries[key] = size
+            self._size += size
+        await self._remove_files(disk, self._evicted())
+        return disk
+
+    async def open(self) -> FilesystemStorageClient:
+        """
+        Claim a slot and index the objects cached in it, least recently read first.
+
+        Only the first call does the work; later ones, and every read, wait for it.
+        """
+        if self._opening is None:
+            self._opening = create_task(self._load())
+        return await shield(self._opening)
+
+    def _evicted(self) -> list[str]:
+        """Drop index entries over the size budget and return their keys, for the files to go."""
+        keys = []
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._evictions += 1
+            keys.append(key)
+        return keys
+
+    @staticmethod
+    async def _remove_files(disk: FilesystemStorageClient, keys: list[str]) -> None:
+        def remove() -> None:
+            for key in keys:
+                disk.local_path(key).unlink(missing_ok=True)
+
+        if keys:
+            await to_thread(remove)
+
+    async def _fill(self, disk: FilesystemStorageClient, object_name: str, key: str) -> None:
+        """Copy an object to disk, unless it is too large to keep."""
+        stat = await self.storage.stat_object(object_name)
+        if stat.size > self.max_object_size:
+            self._oversized.add(key)
+            return
+        path = disk.local_path(key)
+
+        def open_temp() -> tuple[Path, IO[bytes]]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+            return tmp, tmp.open("wb")
+
+        tmp, f = await to_thread(open_temp)
+        size = 0
+        try:
+            async for chunk in await self.storage.get_object_stream(object_name):
+                await to_thread(f.write, chunk)
+                size += len(chunk)
+            await to_thread(f.close)
+            await to_thread(tmp.replace, path)
+        except BaseException:
+            f.close()
+            await to_thread(tmp.unlink, missing_ok=True)
+            raise
+
+        self._entries[key] = size
+        self._size += size
+        await self._remove_files(disk, self._evicted())
+
+    def _fill_done(self, key: str, task: Task[None]) -> None:
+        self._fills.pop(key, None)
+        if not task.cancelled() and (exc := task.exception()):
+            logger.warning("Failed to cache object %s: %s", key, exc)
+
+    def _start_fill(self, disk: FilesystemStorageClient, object_name: str, key: str) -> Task[None]:
+        fill = create_task(self._fill(disk, object_name, key))
+        fill.add_done_callback(lambda task: self._fill_done(key, task))
+        self._fills[key] = fill
+        return fill
+
+    async def _read_cached(
+        self, disk: FilesystemStorageClient, key: str, offset: int, length: int | None
+    ) -> AsyncGenerator[bytes, None] | None:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        try:
+            return await disk.get_object_stream(key, offset, length)
+        except S3Error as exc:
+            if exc.code != "NoSuchKey":
+                raise
+        # Removed behind our back; forget it and fetch it again.
+        self._size -= self._entries.pop(key, 0)
+        return None
+
+    async def _invalidate(self, object_name: str) -> None:
+        disk = await self.open()
+        key = self._key(object_name)
+        if (size := self._entries.pop(key, None)) is not None:
+            self._size -= size
+            await self._remove_files(disk, [key])
+
+    def stats(self) -> StorageCacheStats:
+        return StorageCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            bypassed=self._bypassed,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            size=self._size,
+            max_size=self.max_size,
+        )
+
+    async def get_object_stream(
+        self, object_name: str, offset: int = 0, length: int | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream an object, or a byte range of it, from disk.
+
+        A miss of the whole object waits for the fill, so concurrent misses fetch it from
+        `storage` once; it is only streamed from there when the fill fails. A range is streamed
+        from `storage` straight away, not to wait for the rest of the object.
+        """
+        if object_name.startswith(self.exclude):
+            return await self.storage.get_object_stream(object_name, offset, length)
+        disk = await self.open()
+        key = self._key(object_name)
+        if (cached := await self._read_cached(disk, key, offset, length)) is not None:
+            self._hits += 1
+            return cached
+        if key in self._oversized:
+            self._bypassed += 1
+            return await self.storage.get_object_stream(object_name, offset, length)
+
+        self._misses += 1
+        fill = self._fills.get(key) or self._start_fill(disk, object_name, key)
+        if offset or length is not None:
+            return await self.storage.get_object_stream(object_name, offset, length)
+        # A failed fill is logged by _fill_done; shielded, so a reader going away leaves it running.
+        with suppress(Exception):
+            await shield(fill)
+        if (cached := await self._read_cached(disk, key, offset, length)) is not None:
+            return cached
+        return await self.storage.get_object_stream(object_name, offset, length)
+
+    async def bucket_exists(self) -> bool:
+        return await self.storage.bucket_exists()
+
+    async def make_bucket(self) -> None:
+        await self.storage.make_bucket()
+
+    async def put_object(self, object_name: str, data: BytesIO, length: int) -> str:
+        await self._invalidate(object_name)
+        return await self.storage.put_object(object_name, data, length)
+
+    async def put_object_stream(self, object_name: str, stream: AsyncReader) -> UploadedObject:
+        await self._invalidate(object_name)
+        return await self.storage.put_object_stream(object_name, stream)
+
+    async def create_multipart_upload(self, object_name: str) -> str:
+        return await self.storage.create_multipart_upload(object_name)
+
+    async def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        return await self.storage.upload_part(object_name, upload_id, part_number, data)
+
+    async def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[StoragePart]) -> str:
+        await self._invalidate(object_name)
+        return await self.storage.complete_multipart_upload(object_name, upload_id, parts)
+
+    async def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        await self.storage.abort_multipart_upload(object_name, upload_id)
+
+    async def stat_object(self, object_name: str) -> StorageObjectStat:
+        return await self.storage.stat_object(object_name)
+
+    async def copy_object(self, source_name: str, object_name: str) -> str:
+        await self._invalidate(object_name)
+        return await self.storage.copy_object(source_name, object_name)
+
+    async def remove_object(self, object_name: str) -> None:
+        await self._invalidate(object_name)
+        await self.storage.remove_object(object_name)
+
+    async def list_objects(self, prefix: str) -> list[StorageObject]:
+        return await self.storage.list_objects(prefix)
+
+    async def generate_presigned_url(self, object_name: str, expires: int) -> str:
+        return await self.storage.generate_presigned_url(object_name, expires)
+
+    async def generate_presigned_put_url(
+        self, object_name: str, expires: int, checksum: str | None = None
+    ) -> PresignedUpload:
+        return await self.storage.generate_presigned_put_url(object_name, expires, checksum)
+
+    async def generate_presigned_part_url(
+        self, object_name: str, upload_id: str, part_number: int, expires: int
+    ) -> str:
+        return await self.storage.generate_presigned_part_url(object_name, upload_id, part_number, expires)
+
+    async def check(self) -> bool:
+        return await self.storage.check()
@@ -0,0 +1,332 @@
+from typing import IO
+
+import mmap
+import os
+import shutil
+
+from asyncio import to_thread
+from collections.abc import AsyncGenerator, Callable
+from datetime import UTC, datetime
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from uuid import uuid4
+
+from minio import S3Error
+
+from core.client.minio import ObjectStorageProtocol, read_ahead, storage_error
+from core.database.schemas.minio import (
+    AsyncReader,
+    ObjectStorageConfig,
+    PresignedUpload,
+    StorageObject,
+    StorageObjectStat,
+    StoragePart,
+    UploadedObject,
+)
+
+MULTIPART_DIR = ".multipart"
+
+
+def is_temporary(filename: str) -> bool:
+    return filename.startswith(".") and filename.endswith(".tmp")
+
+
+class FilesystemStorageClient(ObjectStorageProtocol):
+    """
+    Object storage on a local filesystem, one file per object under `root/<bucket>/<object_name>`.
+
+    Writes go to a temporary file that is renamed into place, so readers see either the old or
+    the new object; with `fsync` the data and the rename are flushed to disk first. Etags are
+    derived from size and mtime. Presigned URLs are not supported, clients upload through the API.
+    """
+
+    def __init__(
+        self, config: ObjectStorageConfig, root: Path, *, fsync: bool = True, default_bucket: str = "files"
+    ) -> None:
+        self.config = config
+        self.default_bucket = default_bucket
+        self.fsync = fsync
+        self._part_size = config.part_size
+        self._root = root
+        self._bucket_dir = root / default_bucket
+        self._multipart_dir = root / MULTIPART_DIR
+
+    def _error(self, code: str, message: str, object_name: str, status: int = 404) -> S3Error:
+        return storage_error(code, message, self.default_bucket, object_name, status)
+
+    def local_path(self, object_name: str) -> Path:
+        """File that holds `object_name`; names escaping the bucket directory are rejected."""
+        path = self._bucket_dir / object_name
+        if object_name.startswith("/") or any(part in {"", ".", ".."} for part in object_name.split("/")):
+            raise self._error("XMinioInvalidObjectName", "Object name contains invalid components.", object_name, 400)
+        return path
+
+    def _upload_dir(self, object_name: str, upload_id: str) -> Path:
+        upload_dir = self._multipart_dir / upload_id
+        try:
+            owner = (upload_dir / "object").read_text()
+        except (FileNotFoundError, ValueError):
+            owner = None
+        if owner != object_name:
+            raise self._error("NoSuchUpload", "The specified multipart upload does not exist.", object_name)
+        return upload_dir
+
+    @staticmethod
+    def _etag(stat: os.stat_result) -> str:
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def _fsync_dir(self, directory: Path) -> None:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _open_temp(path: Path) -> tuple[Path, IO[bytes]]:
+        """Temporary file next to `path`, in the same directory so it can be renamed over it."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        return tmp, tmp.open("wb")
+
+    def _commit(self, tmp: Path, f: IO[bytes], path: Path) -> os.stat_result:
+        """Close the temporary file and rename it over `path`, flushing both first with `fsync`."""
+        try:
+            with f:
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            tmp.replace(path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        if self.fsync:
+            self._fsync_dir(path.parent)
+        return path.stat()
+
+    def _write_atomic(self, path: Path, write: Callable[[IO[bytes]], object]) -> os.stat_result:
+        tmp, f = self._open_temp(path)
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            tmp.unlink(missing_ok=True)
+            raise
+        return self._commit(tmp, f, path)
+
+    def _stat(self, object_name: str) -> os.stat_result:
+        try:
+            return self.local_path(object_name).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            raise self._error("NoSuchKey", "The specified key does not exist.", object_name) from None
+
+    async def bucket_exists(self) -> bool:
+        return await to_thread(self._bucket_dir.is_dir)
+
+    async def make_bucket(self) -> None:
+        await to_thread(self._bucket_dir.mkdir, parents=True, exist_ok=True)
+
+    async def put_object(self, object_name: str, data: BytesIO, length: int) -> str:
+        path = self.local_path(object_name)
+        await to_thread(self._write_atomic, path, lambda f: f.write(data.read(length)))
+        return object_name
+
+    async def put_object_stream(self, object_name: str, stream: AsyncReader) -> UploadedObject:
+        """
+        Write a stream of unknown length to a temporary file, hashing it on the fly, then rename it.
+        """
+        path = self.local_path(object_name)
+        hasher = sha256()
+        size = 0
+
+        def append(f: IO[bytes], chunk: bytes) -> None:
+            hasher.update(chunk)
+            f.write(chunk)
+
+        tmp, f = await to_thread(self._open_temp, path)
+        try:
+            while chunk := await stream.read(self._part_size):
+                await to_thread(append, f, chunk)
+                size += len(chunk)
+        except BaseException:
+            f.close()
+            await to_thread(tmp.unlink, missing_ok=True)
+            raise
+        await to_thread(self._commit, tmp, f, path)
+        return UploadedObject(object_name=object_name, size=size, checksum=hasher.hexdigest())
+
+    @staticmethod
+    def _copy_file(source: Path, target: IO[bytes]) -> None:
+        with source.open("rb") as f:
+            shutil.copyfileobj(f, target, 1024 * 1024)
+
+    async def create_multipart_upload(self, object_name: str) -> str:
+        self.local_path(object_name)
+        upload_id = uuid4().hex
+        upload_dir = self._multipart_dir / upload_id
+
+        def create() -> None:
+            upload_dir.mkdir(parents=True)
+            (upload_dir / "object").write_text(object_name)
+
+        await to_thread(create)
+        return upload_id
+
+    async def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        def write() -> os.stat_result:
+            part = self._upload_dir(object_name, upload_id) / f"{part_number:05d}"
+            return self._write_atomic(part, lambda f: f.write(data))
+
+        return self._etag(await to_thread(write))
+
+    async def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[StoragePart]) -> str:
+        """
+        Concatenate the listed parts into the object and drop the upload.
+        """
+
+        def assemble() -> None:
+            upload_dir = self._upload_dir(object_name, upload_id)
+            files: list[Path] = []
+            for part in sorted(parts, key=lambda part: part.part_number):
+                file = upload_dir / f"{part.part_number:05d}"
+                try:
+                    etag = self._etag(file.stat())
+                except FileNotFoundError:
+                    etag = ""
+                if etag != part.etag.strip('"'):
+                    raise self._error("InvalidPart", f"Part {part.part_number} is missing or stale.", object_name, 400)
+                files.append(file)
+
+            def concat(target: IO[bytes]) -> None:
+                for file in files:
+                    self._copy_file(file, target)
+
+            self._write_atomic(self.local_path(object_name), concat)
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+        await to_thread(assemble)
+        return object_name
+
+    async def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        def abort() -> None:
+            shutil.rmtree(self._upload_dir(object_name, upload_id), ignore_errors=True)
+
+        await to_thread(abort)
+
+    async def get_object_stream(
+        self, object_name: str, offset: int = 0, length: int | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream an object, or a byte range of it, from a memory map of its file.
+
+        Each chunk is one copy sliced out of the mapped page cache, with no read calls; the copy is
+        made in a thread, where page faults cannot block the event loop. Chunks stay bytes rather
+        than views, since the mapping is closed while read-ahead chunks may still be waiting.
+        """
+        path = self.local_path(object_name)
+        try:
+            f = await to_thread(path.open, "rb")
+        except (FileNotFoundError, NotADirectoryError):
+            raise self._error("NoSuchKey", "The specified key does not exist.", object_name) from None
+        size = os.fstat(f.fileno()).st_size
+        if offset and offset >= size:
+            f.close()
+            raise self._error("InvalidRange", "The requested range is not satisfiable.", object_name, 416)
+        end = size if not length else min(offset + length, size)
+        chunk_size = self.config.read_chunk_size
+
+        async def stream_generator() -> AsyncGenerator[bytes, None]:
+            try:
+                if end <= offset:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    for start in range(offset, end, chunk_size):
+                        yield await to_thread(mapped.__getitem__, slice(start, min(start + chunk_size, end)))
+            finally:
+                f.close()
+
+        return read_ahead(stream_generator(), self.config.read_ahead)
+
+    async def stat_object(self, object_name: str) -> StorageObjectStat:
+        stat = await to_thread(self._stat, object_name)
+        return StorageObjectStat(object_name=object_name, size=stat.st_size, etag=self._etag(stat))
+
+    async def copy_object(self, source_name: str, object_name: str) -> str:
+        """
+        Copy an object; a hard link when possible, since objects are never modified in place.
+        """
+        source = self.local_path(source_name)
+        target = self.local_path(object_name)
+
+        def copy() -> None:
+            self._stat(source_name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{uuid4().hex}.tmp")
+            try:
+                os.link(source, tmp)
+            except OSError:
+                self._write_atomic(target, lambda f: self._copy_file(source, f))
+                return
+            tmp.replace(target)
+            if self.fsync:
+                self._fsync_dir(target.parent)
+
+        await to_thread(copy)
+        return object_name
+
+    async def remove_object(self, object_name: str) -> None:
+        path = self.local_path(object_name)
+
+        def remove() -> None:
+            path.unlink(missing_ok=True)
+            # Drop directories left empty, as S3 has no directories to keep.
+            parent = path.parent
+            while parent != self._bucket_dir:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+                parent = parent.parent
+
+        await to_thread(remove)
+
+    async def list_objects(self, prefix: str) -> list[StorageObject]:
+        def walk() -> list[StorageObject]:
+            start = self._bucket_dir / prefix.rsplit("/", 1)[0] if "/" in prefix else self._bucket_dir
+            objects = []
+            for directory, _, filenames in os.walk(start):
+                for filename in filenames:
+                    path = Path(directory) / filename
+                    name = path.relative_to(self._bucket_dir).as_posix()
+                    if is_temporary(filename) or not name.startswith(prefix):
+                        continue
+                    stat = path.stat()
+                    objects.append(
+                        StorageObject(
+                            object_name=name,
+                            version_id=self._etag(stat),
+                            last_modified=datetime.fromtimestamp(stat.st_mtime, UTC).isoformat(),
+                            size=stat.st_size,
+                        )
+                    )
+            return sorted(objects, key=lambda obj: obj.object_name)
+
+        return await to_thread(walk)
+
+    async def generate_presigned_url(self, object_name: str, expires: int) -> str:
+        raise self._error("NotImplemented", "Presigned URLs need an S3 backend.", object_name, 501)
+
+    async def generate_presigned_put_url(
+        self, object_name: str, expires: int, checksum: str | None = None
+    ) -> PresignedUpload:
+        raise self._error("NotImplemented", "Presigned URLs need an S3 backend.", object_name, 501)
+
+    async def generate_presigned_part_url(
+        self, object_name: str, upload_id: str, part_number: int, expires: int
+    ) -> str:
+        raise self._error("NotImplemented", "Presigned URLs need an S3 backend.", object_name, 501)
+
+    async def check(self) -> bool:
+        return await to_thread(os.access, self._bucket_dir, os.W_OK)
@@ -0,0 +1,187 @@
+from asyncio import sleep
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from hashlib import md5, sha256
+from io import BytesIO
+from urllib.parse import quote, urlencode
+from uuid import uuid4
+
+from minio import S3Error
+
+from core.client.minio import ObjectStorageProtocol, storage_error
+from core.database.schemas.minio import (
+    AsyncReader,
+    ObjectStorageConfig,
+    PresignedUpload,
+    StorageObject,
+    StorageObjectStat,
+    StoragePart,
+    UploadedObject,
+)
+
+
+@dataclass(slots=True)
+class _StoredObject:
+    data: bytes
+    etag: str
+    version_id: str = field(default_factory=lambda: uuid4().hex)
+    last_modified: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+
+@dataclass(slots=True)
+class _MultipartUpload:
+    object_name: str
+    parts: dict[int, tuple[str, bytes]] = field(default_factory=dict)
+
+
+class InMemoryStorageClient(ObjectStorageProtocol):
+    """
+    Object storage kept in process memory, for tests and benchmarks without a MinIO server.
+
+    Implements the whole `ObjectStorageProtocol`, multipart uploads and ranged reads included,
+    and fails the way MinIO does: missing objects and uploads raise `S3Error` with the S3 code.
+    Presigned URLs point to `memory://` and cannot be used over HTTP.
+    """
+
+    def __init__(self, config: ObjectStorageConfig, default_bucket: str = "files") -> None:
+        self.config = config
+        self.default_bucket = default_bucket
+        self._part_size = config.part_size
+        self._bucket_created = False
+        self._objects: dict[str, _StoredObject] = {}
+        self._uploads: dict[str, _MultipartUpload] = {}
+
+    def _error(self, code: str, message: str, object_name: str, status: int = 404) -> S3Error:
+        return storage_error(code, message, self.default_bucket, object_name, status)
+
+    def _get(self, object_name: str) -> _StoredObject:
+        stored = self._objects.get(object_name)
+        if stored is None:
+            raise self._error("NoSuchKey", "The specified key does not exist.", object_name)
+        return stored
+
+    def _get_upload(self, object_name: str, upload_id: str) -> _MultipartUpload:
+        upload = self._uploads.get(upload_id)
+        if upload is None or upload.object_name != object_name:
+            raise self._error("NoSuchUpload", "The specified multipart upload does not exist.", object_name)
+        return upload
+
+    async def bucket_exists(self) -> bool:
+        return self._bucket_created
+
+    async def make_bucket(self) -> None:
+        self._bucket_created = True
+
+    async def put_object(self, object_name: str, data: BytesIO, length: int) -> str:
+        content = data.read(length)
+        self._objects[object_name] = _StoredObject(data=content, etag=md5(content).hexdigest())  # noqa: S324
+        return object_name
+
+    async def put_object_stream(self, object_name: str, stream: AsyncReader) -> UploadedObject:
+        """
+        Store a stream of unknown length, hashing it on the fly.
+        """
+        hasher = sha256()
+        buffer = bytearray()
+        while chunk := await stream.read(self._part_size):
+            hasher.update(chunk)
+            buffer += chunk
+        await self.put_object(object_name, BytesIO(buffer), len(buffer))
+        return UploadedObject(object_name=object_name, size=len(buffer), checksum=hasher.hexdigest())
+
+    async def create_multipart_upload(self, object_name: str) -> str:
+        upload_id = uuid4().hex
+        self._uploads[upload_id] = _MultipartUpload(object_name=object_name)
+        return upload_id
+
+    async def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        etag = md5(data).hexdigest()  # noqa: S324
+        self._get_upload(object_name, upload_id).parts[part_number] = (etag, bytes(data))
+        return etag
+
+    async def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[StoragePart]) -> str:
+        """
+        Assemble the listed parts; as in S3, the etag is the MD5 of the part MD5s and the count.
+        """
+        upload = self._get_upload(object_name, upload_id)
+        chunks: list[bytes] = []
+        digests = bytearray()
+        for part in sorted(parts, key=lambda part: part.part_number):
+            etag, data = upload.parts.get(part.part_number, ("", b""))
+            if not etag or etag != part.etag.strip('"'):
+                raise self._error("InvalidPart", f"Part {part.part_number} is missing or stale.", object_name, 400)
+            chunks.append(data)
+            digests += bytes.fromhex(etag)
+        del self._uploads[upload_id]
+        etag = f"{md5(digests).hexdigest()}-{len(chunks)}"  # noqa: S324
+        self._objects[object_name] = _StoredObject(data=b"".join(chunks), etag=etag)
+        return object_name
+
+    async def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        self._get_upload(object_name, upload_id)
+        del self._uploads[upload_id]
+
+    async def get_object_stream(
+        self, object_name: str, offset: int = 0, length: int | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream an object, or a byte range of it, in chunks of the configured read size.
+        """
+        stored = self._get(object_name)
+        if offset and offset >= len(stored.data):
+            raise self._error("InvalidRange", "The requested range is not satisfiable.", object_name, 416)
+        end = len(stored.data) if not length else min(offset + length, len(stored.data))
+        chunk_size = self.config.read_chunk_size
+
+        async def stream_generator() -> AsyncGenerator[bytes, None]:
+            view = memoryview(stored.data)
+            for start in range(offset, end, chunk_size):
+                yield bytes(view[start : min(start + chunk_size, end)])
+                # Let other tasks run between chunks, as a network read would.
+                await sleep(0)
+
+        return stream_generator()
+
+    async def stat_object(self, object_name: str) -> StorageObjectStat:
+        stored = self._get(object_name)
+        return StorageObjectStat(object_name=object_name, size=len(stored.data), etag=stored.etag)
+
+    async def copy_object(self, source_name: str, object_name: str) -> str:
+        source = self._get(source_name)
+        self._objects[object_name] = _StoredObject(data=source.data, etag=source.etag)
+        return object_name
+
+    async def remove_object(self, object_name: str) -> None:
+        self._objects.pop(object_name, None)
+
+    async def list_objects(self, prefix: str) -> list[StorageObject]:
+        return [
+            StorageObject(
+                object_name=name,
+                version_id=stored.version_id,
+                last_modified=stored.last_modified.isoformat(),
+                size=len(stored.data),
+            )
+            for name, stored in sorted(self._objects.items())
+            if name.startswith(prefix)
+        ]
+
+    def _url(self, object_name: str, **params: str | int) -> str:
+        return f"memory://{self.default_bucket}/{quote(object_name)}?{urlencode(params)}"
+
+    async def generate_presigned_url(self, object_name: str, expires: int) -> str:
+        return self._url(object_name, method="GET", expires=expires)
+
+    async def generate_presigned_put_url(
+        self, object_name: str, expires: int, checksum: str | None = None
+    ) -> PresignedUpload:
+        return PresignedUpload(url=self._url(object_name, method="PUT", expires=expires))
+
+    async def generate_presigned_part_url(
+        self, object_name: str, upload_id: str, part_number: int, expires: int
+    ) -> str:
+        return self._url(object_name, method="PUT", expires=expires, uploadId=upload_id, partNumber=part_number)
+
+    async def check(self) -> bool:
+        return True
@@ -1,16 +1,50 @@
 from typing import Protocol
 
-from asyncio import to_thread
-from collections.abc import AsyncGenerator
+import base64
+import binascii
+
+from abc import ABC, abstractmethod
+from asyncio import Queue, Semaphore, Task, create_task, gather, to_thread
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import timedelta
+from hashlib import sha256
 from io import BytesIO
+from math import ceil
+
+import backoff
 
-from minio import Minio
+from httpx import TransportError
+from minio import Minio, S3Error
+from minio.commonconfig import ComposeSource, CopySource
+from minio.datatypes import Part
+from minio.error import InvalidResponseError, ServerError
+from urllib3 import HTTPResponse
+from urllib3.exceptions import HTTPError
 
-from core.database.schemas.minio import ObjectStorageConfig, StorageObject
+from core.connections.base import NOT_IMPLEMENTED
+from core.database.schemas.minio import (
+    AsyncReader,
+    ObjectStorageConfig,
+    PresignedUpload,
+    StorageObject,
+    StorageObjectStat,
+    StoragePart,
+    UploadedObject,
+)
 from core.logging.logger import CoreLogger
 
 logger = CoreLogger.get_logger("minio_client")
 
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PART_COUNT = 10_000
+# Largest object a single CopyObject request copies; larger ones are copied part by part.
+MAX_COPY_SIZE = 5 * 1024 * 1024 * 1024
+PART_ALIGNMENT = 1024 * 1024
+RETRYABLE_ERRORS = (S3Error, ServerError, InvalidResponseError, HTTPError, TransportError)
+# S3 error codes of throttling and server faults; other S3 errors come back the same on every try.
+TRANSIENT_CODES = frozenset({"InternalError", "RequestTimeout", "ServiceUnavailable", "SlowDown"})
+
 
 class MinioClientError(Exception):
     def __init__(self, message: str) -> None:
@@ -18,17 +52,283 @@ class MinioClientError(Exception):
         self.message = message
 
 
+def storage_error(code: str, message: str, bucket: str, object_name: str, status: int = 404) -> S3Error:
+    """`S3Error` as MinIO would raise it, for backends that do not talk to S3."""
+    return S3Error(
+        HTTPResponse(status=status),
+        code,
+        message,
+        f"/{bucket}/{object_name}",
+        None,
+        None,
+        bucket_name=bucket,
+        object_name=object_name,
+    )
+
+
+def is_permanent(exc: Exception) -> bool:
+    """Whether retrying cannot help, as with AccessDenied, NoSuchUpload or InvalidPart."""
+    if not isinstance(exc, S3Error):
+        return False
+    return exc.code not in TRANSIENT_CODES and exc.response.status < 500
+
+
+def checksum_hex(value: str | None) -> str | None:
+    """
+    Hex SHA-256 from an `x-amz-checksum-sha256` value.
+
+    Multipart objects carry a checksum of their part checksums (`<base64>-<parts>`), not of the
+    content, so there is none to return for them.
+    """
+    if not value or "-" in value:
+        return None
+    try:
+        return base64.b64decode(value, validate=True).hex()
+    except binascii.Error:
+        return None
+
+
+def checksum_header(checksum: str) -> dict[str, str]:
+    """Header declaring the hex SHA-256 `checksum` of a PUT, for storage to check the content."""
+    return {"x-amz-checksum-sha256": base64.b64encode(bytes.fromhex(checksum)).decode()}
+
+
+def raise_failed(tasks: list[Task[StoragePart]]) -> None:
+    """Raise the error of the first finished task that failed, if any."""
+    for task in tasks:
+        if task.done() and (exc := task.exception()):
+            raise exc
+
+
+class ReadAhead:
+    """
+    Chunks of a stream read up to `depth` ahead of the consumer by a background task.
+
+    The next reads overlap with sending the current chunk; once `depth` chunks are waiting,
+    reading pauses until the consumer catches up. Errors surface where the chunk would have.
+    Reading begins on `start()` or on iteration; `aclose()` stops it and closes the stream.
+    """
+
+    __slots__ = ("_chunks", "_queue", "_task")
+
+    def __init__(self, chunks: AsyncGenerator[bytes, None], depth: int) -> None:
+        self._chunks = chunks
+        self._queue: Queue[bytes | Exception | None] = Queue(maxsize=depth)
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = create_task(self._produce())
+
+    async def _produce(self) -> None:
+        try:
+            async for chunk in self._chunks:
+                await self._queue.put(chunk)
+        except Exception as exc:  # noqa: BLE001
+            await self._queue.put(exc)
+        else:
+            await self._queue.put(None)
+        finally:
+            await self._chunks.aclose()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self.start()
+        while (item := await self._queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def aclose(self) -> None:
+        if self._task is None:
+            await self._chunks.aclose()
+            return
+        self._task.cancel()
+        await gather(self._task, return_exceptions=True)
+
+
+def read_ahead(chunks: AsyncGenerator[bytes, None], depth: int) -> AsyncGenerator[bytes, None]:
+    """
+    Stream `chunks` through a `ReadAhead` of `depth` chunks, or as is when `depth` is 0.
+    """
+    if not depth:
+        return chunks
+    reader = ReadAhead(chunks, depth)
+
+    async def consume() -> AsyncGenerator[bytes, None]:
+        try:
+            async for chunk in reader:
+                yield chunk
+        finally:
+            await reader.aclose()
+
+    return consume()
+
+
 class ObjectStorageProtocol(Protocol):
     async def bucket_exists(self) -> bool: ...
     async def make_bucket(self) -> None: ...
     async def put_object(self, object_name: str, data: BytesIO, length: int) -> str: ...
-    async def get_object_stream(self, object_name: str) -> AsyncGenerator[bytes, None]: ...
+    async def put_object_stream(self, object_name: str, stream: AsyncReader) -> UploadedObject: ...
+    async def create_multipart_upload(self, object_name: str) -> str: ...
+    async def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str: ...
+    async def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[StoragePart]) -> str: ...
+    async def abort_multipart_upload(self, object_name: str, upload_id: str) -> None: ...
+    async def get_object_stream(
+        self, object_name: str, offset: int = 0, length: int | None = None
+    ) -> AsyncGenerator[bytes, None]: ...
+    async def stat_object(self, object_name: str) -> StorageObjectStat: ...
+    async def copy_object(self, source_name: str, object_name: str) -> str: ...
+    async def remove_object(self, object_name: str) -> None: ...
     async def list_objects(self, prefix: str) -> list[StorageObject]: ...
     async def generate_presigned_url(self, object_name: str, expires: int) -> str: ...
+    async def generate_presigned_put_url(
+        self, object_name: str, expires: int, checksum: str | None = None
+    ) -> PresignedUpload: ...
+    async def generate_presigned_part_url(
+        self, object_name: str, upload_id: str, part_number: int, expires: int
+    ) -> str: ...
     async def check(self) -> bool: ...
 
 
-class MinioClient(ObjectStorageProtocol):
+class MultipartStorageClient(ObjectStorageProtocol, ABC):
+    """
+    Concurrent multipart uploads built on the part calls of an S3 client.
+
+    Subclasses implement `_put_single` and the multipart methods of the protocol.
+    """
+
+    config: ObjectStorageConfig
+    _part_size: int
+
+    @abstractmethod
+    async def _put_single(self, object_name: str, data: BytesIO, length: int) -> str:
+        """
+        Upload an object in a single request.
+        """
+        raise NotImplementedError(NOT_IMPLEMENTED)
+
+    async def put_object(self, object_name: str, data: BytesIO, length: int) -> str:
+        """
+        Upload an object to the default bucket.
+
+        Objects larger than one part are split into parts uploaded concurrently.
+        """
+        part_size = self._choose_part_size(length)
+        if length <= part_size:
+            return await self._put_single(object_name, data, length)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            view = data.getbuffer()
+            try:
+                start = data.tell()
+                for offset in range(start, start + length, part_size):
+                    yield bytes(view[offset : min(offset + part_size, start + length)])
+            finally:
+                view.release()
+
+        upload_id = await self.create_multipart_upload(object_name)
+        try:
+            parts = await self._upload_parts(object_name, upload_id, chunks(), self.config.upload_concurrency)
+        except BaseException:
+            await self.abort_multipart_upload(object_name, upload_id)
+            raise
+        return await self.complete_multipart_upload(object_name, upload_id, parts)
+
+    def _choose_part_size(self, length: int) -> int:
+        """
+        Spread the object over the upload slots while staying within the S3 part limits.
+        """
+        size = min(max(ceil(length / self.config.upload_concurrency), MIN_PART_SIZE), self._part_size)
+        size = max(size, ceil(length / MAX_PART_COUNT))
+        return min(ceil(size / PART_ALIGNMENT) * PART_ALIGNMENT, MAX_PART_SIZE)
+
+    async def put_object_stream(self, object_name: str, stream: AsyncReader) -> UploadedObject:
+        """
+        Upload a stream of unknown length as a multipart object, hashing it on the fly.
+
+        No more than `max_parts_in_memory` parts are held in memory at any time.
+        """
+        hasher = sha256()
+        size = 0
+
+        async def chunks() -> AsyncIterator[bytes]:
+            nonlocal size
+            while chunk := await self._read_part(stream):
+                await to_thread(hasher.update, chunk)
+                size += len(chunk)
+                yield chunk
+
+        upload_id = await self.create_multipart_upload(object_name)
+        try:
+            parts = await self._upload_parts(object_name, upload_id, chunks(), self.config.max_parts_in_memory)
+        except BaseException:
+            await self.abort_multipart_upload(object_name, upload_id)
+            raise
+
+        if not parts:
+            await self.abort_multipart_upload(object_name, upload_id)
+            await self.put_object(object_name, BytesIO(), 0)
+        else:
+            await self.complete_multipart_upload(object_name, upload_id, parts)
+        return UploadedObject(object_name=object_name, size=size, checksum=hasher.hexdigest())
+
+    async def _read_part(self, stream: AsyncReader) -> bytes:
+        """
+        Read exactly one part from the stream, or less at the end of it.
+        """
+        chunk = await stream.read(self._part_size)
+        if not chunk or len(chunk) >= self._part_size:
+            return chunk
+        buffer = bytearray(chunk)
+        while len(buffer) < self._part_size:
+            chunk = await stream.read(self._part_size - len(buffer))
+            if not chunk:
+                break
+            buffer += chunk
+        return bytes(buffer)
+
+    async def _upload_parts(
+        self, object_name: str, upload_id: str, chunks: AsyncIterator[bytes], max_in_flight: int
+    ) -> list[StoragePart]:
+        """
+        Upload chunks as consecutive parts, keeping at most `max_in_flight` of them pending.
+
+        A failed part is retried on its own; the whole upload fails once its retries run out.
+        """
+        slots = Semaphore(max_in_flight)
+        tasks: list[Task[StoragePart]] = []
+
+        async def upload(part_number: int, chunk: bytes) -> StoragePart:
+            try:
+                etag = await self._upload_part_with_retry(object_name, upload_id, part_number, chunk)
+            finally:
+                slots.release()
+            return StoragePart(part_number=part_number, etag=etag)
+
+        try:
+            while True:
+                await slots.acquire()
+                raise_failed(tasks)
+                chunk = await anext(chunks, None)
+                if chunk is None:
+                    slots.release()
+                    break
+                tasks.append(create_task(upload(len(tasks) + 1, chunk)))
+            return list(await gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _upload_part_with_retry(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        retrying = backoff.on_exception(
+            backoff.expo, RETRYABLE_ERRORS, max_tries=self.config.part_retries, giveup=is_permanent
+        )
+        return await retrying(self.upload_part)(object_name, upload_id, part_number, data)
+
+
+class MinioClient(MultipartStorageClient):
     def __init__(self, config: ObjectStorageConfig, default_bucket: str = "files") -> None:
         """
         Initialize the Minio client with the given configuration and default bucket.
@@ -60,10 +360,7 @@ class MinioClient(ObjectStorageProtocol):
             logger.exception("Bucket creation failed for %s", self.default_bucket, exc_info=exc)
             raise
 
-    async def put_object(self, object_name: str, data: BytesIO, length: int) -> str:
-        """
-        Upload an object to the default bucket.
-        """
+    async def _put_single(self, object_name: str, data: BytesIO, length: int) -> str:
         try:
             result = await to_thread(
                 self._client.put_object, self.default_bucket, object_name, data, length, part_size=self._part_size
@@ -74,20 +371,80 @@ class MinioClient(ObjectStorageProtocol):
         else:
             return result.object_name
 
-    async def get_object_stream(self, object_name: str) -> AsyncGenerator[bytes, None]:
+    async def create_multipart_upload(self, object_name: str) -> str:
+        """
+        Start a multipart upload and return its upload id.
+        """
+        try:
+            return await to_thread(self._client._create_multipart_upload, self.default_bucket, object_name, {})  # noqa: SLF001
+        except S3Error as exc:
+            logger.exception("Failed to start multipart upload for %s", object_name, exc_info=exc)
+            raise
+
+    async def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """
+        Upload a single part of a multipart upload and return its etag.
+        """
+        try:
+            return await to_thread(
+                self._client._upload_part,  # noqa: SLF001
+                self.default_bucket,
+                object_name,
+                data,
+                None,
+                upload_id,
+                part_number,
+            )
+        except S3Error as exc:
+            logger.exception("Failed to upload part %s of %s", part_number, object_name, exc_info=exc)
+            raise
+
+    async def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[StoragePart]) -> str:
+        """
+        Assemble the uploaded parts into the final object.
+        """
+        try:
+            result = await to_thread(
+                self._client._complete_multipart_upload,  # noqa: SLF001
+                self.default_bucket,
+                object_name,
+                upload_id,
+                [Part(part.part_number, part.etag) for part in parts],
+            )
+        except S3Error as exc:
+            logger.exception("Failed to complete multipart upload for %s", object_name, exc_info=exc)
+            raise
+        else:
+            return result.object_name
+
+    async def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
         """
-        Retrieve an object stream from the default bucket.
+        Abort a multipart upload and drop the parts uploaded so far.
+        """
+        try:
+            await to_thread(self._client._abort_multipart_upload, self.default_bucket, object_name, upload_id)  # noqa: SLF001
+        except S3Error as exc:
+            logger.exception("Failed to abort multipart upload for %s", object_name, exc_info=exc)
+            raise
+
+    async def get_object_stream(
+        self, object_name: str, offset: int = 0, length: int | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Retrieve an object stream from the default bucket, optionally limited to a byte range.
         """
 
         async def stream_generator() -> AsyncGenerator[bytes, None]:
             try:
-                response = await to_thread(self._client.get_object, self.default_bucket, object_name)
+                response = await to_thread(
+                    self._client.get_object, self.default_bucket, object_name, offset=offset, length=length or 0
+                )
             except MinioClientError as exc:
                 logger.exception("Failed to get object %s", object_name, exc_info=exc)
                 raise
             try:
                 while True:
-                    chunk = await to_thread(response.read, self._part_size)
+                    chunk = await to_thread(response.read, self.config.read_chunk_size)
                     if not chunk:
                         break
                     yield chunk
@@ -98,7 +455,67 @@ class MinioClient(ObjectStorageProtocol):
                 response.close()
                 response.release_conn()
 
-        return stream_generator()
+        return read_ahead(stream_generator(), self.config.read_ahead)
+
+    async def stat_object(self, object_name: str) -> StorageObjectStat:
+        """
+        Get size, etag and, if storage checked one, SHA-256 of an object in the default bucket.
+        """
+        try:
+            result = await to_thread(
+                self._client.stat_object,
+                self.default_bucket,
+                object_name,
+                extra_headers={"x-amz-checksum-mode": "ENABLED"},
+            )
+        except S3Error as exc:
+            logger.exception("Failed to stat object %s", object_name, exc_info=exc)
+            raise
+        else:
+            return StorageObjectStat(
+                object_name=object_name,
+                size=result.size or 0,
+                etag=result.etag or "",
+                checksum=checksum_hex(result.metadata.get("x-amz-checksum-sha256") if result.metadata else None),
+            )
+
+    async def copy_object(self, source_name: str, object_name: str) -> str:
+        """
+        Copy an object server-side within the default bucket.
+
+        Objects over `MAX_COPY_SIZE` are composed of part copies; one CopyObject cannot take them.
+        """
+        try:
+            stat = await to_thread(self._client.stat_object, self.default_bucket, source_name)
+            if (stat.size or 0) > MAX_COPY_SIZE:
+                result = await to_thread(
+                    self._client.compose_object,
+                    self.default_bucket,
+                    object_name,
+                    [ComposeSource(self.default_bucket, source_name)],
+                )
+            else:
+                result = await to_thread(
+                    self._client.copy_object,
+                    self.default_bucket,
+                    object_name,
+                    CopySource(self.default_bucket, source_name),
+                )
+        except S3Error as exc:
+            logger.exception("Failed to copy object %s to %s", source_name, object_name, exc_info=exc)
+            raise
+        else:
+            return result.object_name
+
+    async def remove_object(self, object_name: str) -> None:
+        """
+        Remove an object from the default bucket.
+        """
+        try:
+            await to_thread(self._client.remove_object, self.default_bucket, object_name)
+        except S3Error as exc:
+            logger.exception("Failed to remove object %s", object_name, exc_info=exc)
+            raise
 
     async def list_objects(self, prefix: str) -> list[StorageObject]:
         """
@@ -118,11 +535,52 @@ class MinioClient(ObjectStorageProtocol):
         Generate a presigned URL for an object in the default bucket.
         """
         try:
-            return await to_thread(self._client.presigned_get_object, self.default_bucket, object_name, expires=expires)
+            return await to_thread(
+                self._client.presigned_get_object, self.default_bucket, object_name, expires=timedelta(seconds=expires)
+            )
         except MinioClientError as exc:
             logger.exception("Failed to generate presigned URL for %s", object_name, exc_info=exc)
             raise
 
+    async def generate_presigned_put_url(
+        self, object_name: str, expires: int, checksum: str | None = None
+    ) -> PresignedUpload:
+        """
+        Generate a presigned URL a client can PUT the whole object to.
+
+        The minio SDK signs no headers in presigned URLs, so `checksum` is not bound to the URL; the
+        client is told to declare it all the same, for storage to check and keep it.
+        """
+        try:
+            url = await to_thread(
+                self._client.presigned_put_object, self.default_bucket, object_name, expires=timedelta(seconds=expires)
+            )
+        except S3Error as exc:
+            logger.exception("Failed to generate presigned PUT URL for %s", object_name, exc_info=exc)
+            raise
+        return PresignedUpload(url=url, headers=checksum_header(checksum) if checksum else {})
+
+    async def generate_presigned_part_url(
+        self, object_name: str, upload_id: str, part_number: int, expires: int
+    ) -> str:
+        """
+        Generate a presigned URL a client can PUT one part of a multipart upload to.
+        """
+        try:
+            return await to_thread(
+                self._client.get_presigned_url,
+                "PUT",
+                self.default_bucket,
+                object_name,
+                expires=timedelta(seconds=expires),
+                extra_query_params={"uploadId": upload_id, "partNumber": str(part_number)},
+            )
+        except S3Error as exc:
+            logger.exception(
+                "Failed to generate presigned URL for part %s of %s", part_number, object_name, exc_info=exc
+            )
+            raise
+
     async def check(self) -> bool:
-        result = self._client.list_buckets()
+        result = await to_thread(self._client.list_buckets)
         return result is not None
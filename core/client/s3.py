@@ -0,0 +1,544 @@
+import hmac
+
+from asyncio import Semaphore, create_task, gather
+from collections.abc import AsyncGenerator, AsyncIterator, Mapping
+from datetime import UTC, datetime
+from hashlib import sha256
+from io import BytesIO
+from urllib.parse import quote
+from xml.etree import ElementTree as ET
+
+import backoff
+import httpx
+
+from minio import S3Error
+
+from core.client.minio import (
+    MAX_COPY_SIZE,
+    RETRYABLE_ERRORS,
+    MultipartStorageClient,
+    checksum_header,
+    checksum_hex,
+    is_permanent,
+    read_ahead,
+    storage_error,
+)
+from core.database.schemas.minio import (
+    ObjectStorageConfig,
+    PresignedUpload,
+    StorageObject,
+    StorageObjectStat,
+    StoragePart,
+)
+from core.logging.logger import CoreLogger
+
+logger = CoreLogger.get_logger("s3_client")
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+# Codes for error responses without a body, e.g. to HEAD requests.
+STATUS_CODES = {
+    400: "BadRequest",
+    403: "AccessDenied",
+    404: "NoSuchKey",
+    405: "MethodNotAllowed",
+    409: "Conflict",
+    416: "InvalidRange",
+    501: "NotImplemented",
+    503: "SlowDown",
+}
+
+
+def uri_encode(value: str, safe: str = "") -> str:
+    return quote(value, safe=f"-_.~{safe}")
+
+
+async def single_chunk(data: bytearray) -> AsyncIterator[bytes]:
+    yield data
+
+
+def canonical_query(params: Mapping[str, str]) -> str:
+    return "&".join(f"{uri_encode(key)}={uri_encode(value)}" for key, value in sorted(params.items()))
+
+
+class SigV4Signer:
+    """
+    AWS Signature Version 4 for S3, as request headers or as presigned URL parameters.
+
+    Payloads are not hashed (`UNSIGNED-PAYLOAD`), so bodies are never read twice.
+    """
+
+    __slots__ = ("_access_key", "_secret_key", "_signing_keys", "region")
+
+    def __init__(self, access_key: str, secret_key: str, region: str) -> None:
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._signing_keys: dict[str, bytes] = {}
+        self.region = region
+
+    def _signing_key(self, date: str) -> bytes:
+        key = self._signing_keys.get(date)
+        if key is None:
+            key = f"AWS4{self._secret_key}".encode()
+            for part in (date, self.region, "s3", "aws4_request"):
+                key = hmac.new(key, part.encode(), sha256).digest()
+            # The key changes daily; only today's is worth keeping.
+            self._signing_keys = {date: key}
+        return key
+
+    def _scope(self, now: datetime) -> str:
+        return f"{now:%Y%m%d}/{self.region}/s3/aws4_request"
+
+    def _signature(self, method: str, path: str, query: str, headers: Mapping[str, str], now: datetime) -> str:
+        names = sorted(headers)
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                query,
+                *(f"{name}:{' '.join(headers[name].split())}" for name in names),
+                "",
+                ";".join(names),
+                UNSIGNED_PAYLOAD,
+            ]
+        )
+        string_to_sign = "\n".join(
+            [ALGORITHM, f"{now:%Y%m%dT%H%M%SZ}", self._scope(now), sha256(canonical_request.encode()).hexdigest()]
+        )
+        return hmac.new(self._signing_key(f"{now:%Y%m%d}"), string_to_sign.encode(), sha256).hexdigest()
+
+    def sign(self, method: str, path: str, query: str, headers: Mapping[str, str], now: datetime) -> dict[str, str]:
+        """
+        Headers of a signed request; `headers` must hold lower-case names and include `host`.
+        """
+        signed = {**headers, "x-amz-content-sha256": UNSIGNED_PAYLOAD, "x-amz-date": f"{now:%Y%m%dT%H%M%SZ}"}
+        signature = self._signature(method, path, query, signed, now)
+        signed["authorization"] = (
+            f"{ALGORITHM} Credential={self._access_key}/{self._scope(now)}, "
+            f"SignedHeaders={';'.join(sorted(signed))}, Signature={signature}"
+        )
+        return signed
+
+    def presign(
+        self,
+        method: str,
+        host: str,
+        path: str,
+        params: Mapping[str, str],
+        expires: int,
+        now: datetime,
+        headers: Mapping[str, str] | None = None,
+    ) -> str:
+        """
+        Query string of a presigned URL, valid for `expires` seconds from `now`.
+
+        `headers` (lower-case names) are signed too, so the request must carry them as given.
+        """
+        signed = {"host": host, **(headers or {})}
+        query = canonical_query(
+            {
+                **params,
+                "X-Amz-Algorithm": ALGORITHM,
+                "X-Amz-Credential": f"{self._access_key}/{self._scope(now)}",
+                "X-Amz-Date": f"{now:%Y%m%dT%H%M%SZ}",
+                "X-Amz-Expires": str(expires),
+                "X-Amz-SignedHeaders": ";".join(sorted(signed)),
+            }
+        )
+        return f"{query}&X-Amz-Signature={self._signature(method, path, query, signed, now)}"
+
+
+class S3Client(MultipartStorageClient):
+    """
+    S3 client on asyncio, talking to MinIO or any S3 compatible endpoint over `httpx`.
+
+    Requests are signed in-process and share one pool of keep-alive connections; bodies are sent
+    and downloads streamed by the event loop, without a thread per transfer. Pass a `transport`
+    to run against a local S3 stand-in.
+    """
+
+    def __init__(
+        self,
+        config: ObjectStorageConfig,
+        default_bucket: str = "files",
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.config = config
+        self.default_bucket = default_bucket
+        self._part_size = config.part_size
+        self._host = config.endpoint
+        self._base_url = f"{'https' if config.secure else 'http'}://{config.endpoint}"
+        self._signer = SigV4Signer(config.access_key, config.secret_key, config.region)
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=config.max_connections, max_keepalive_connections=config.max_connections
+            ),
+        )
+
+    def _path(self, object_name: str | None = None) -> str:
+        if object_name is None:
+            return f"/{self.default_bucket}"
+        return f"/{self.default_bucket}/{uri_encode(object_name, safe='/')}"
+
+    async def _error(self, response: httpx.Response, object_name: str) -> S3Error:
+        """
+        `S3Error` from the XML error document of a response, or from its status alone.
+        """
+        code = STATUS_CODES.get(response.status_code, "UnknownError")
+        message = response.reason_phrase
+        body = await response.aread()
+        if body:
+            try:
+                root = ET.fromstring(body)  # noqa: S314
+            except ET.ParseError:
+                pass
+            else:
+                code = root.findtext("{*}Code") or code
+                message = root.findtext("{*}Message") or message
+        return storage_error(code, message, self.default_bucket, object_name, response.status_code)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+        content: bytes | bytearray | None = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """
+        Send a signed request; error statuses raise `S3Error`.
+
+        httpx only takes `bytes` as a body, so a `bytearray` is sent as a single chunk stream
+        with its length, rather than copied.
+        """
+        body: bytes | AsyncIterator[bytes] | None = None
+        if isinstance(content, bytearray):
+            headers = {**(headers or {}), "content-length": str(len(content))}
+            body = single_chunk(content)
+        else:
+            body = content
+        query = canonical_query(params or {})
+        signed = self._signer.sign(method, path, query, {"host": self._host, **(headers or {})}, datetime.now(UTC))
+        url = f"{self._base_url}{path}?{query}" if query else f"{self._base_url}{path}"
+        request = self._client.build_request(method, url, headers=signed, content=body)
+        response = await self._client.send(request, stream=stream)
+        if response.is_error:
+            try:
+                raise await self._error(response, path.removeprefix(f"/{self.default_bucket}/"))
+            finally:
+                await response.aclose()
+        return response
+
+    async def _request_xml(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+        content: bytes | None = None,
+    ) -> ET.Element:
+        """
+        Send a request answered with an XML document, which may be an error despite a 200 status.
+        """
+        response = await self._request(method, path, params=params, headers=headers, content=content)
+        root = ET.fromstring(response.content)  # noqa: S314
+        if root.tag == "Error":
+            code = root.findtext("Code") or "InternalError"
+            message = root.findtext("Message") or ""
+            raise storage_error(code, message, self.default_bucket, path.removeprefix(f"/{self.default_bucket}/"), 500)
+        return root
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def bucket_exists(self) -> bool:
+        """
+        Check if the default bucket exists.
+        """
+        try:
+            await self._request("HEAD", self._path())
+        except S3Error as exc:
+            if exc.code == "NoSuchKey":
+                return False
+            logger.exception("Bucket existence check failed for %s", self.default_bucket, exc_info=exc)
+            raise
+        return True
+
+    async def make_bucket(self) -> None:
+        """
+        Create the default bucket.
+        """
+        content = None
+        if self.config.region != "us-east-1":
+            content = (
+                "<CreateBucketConfiguration><LocationConstraint>"
+                f"{self.config.region}"
+                "</LocationConstraint></CreateBucketConfiguration>"
+            ).encode()
+        try:
+            await self._request("PUT", self._path(), content=content)
+        except S3Error as exc:
+            logger.exception("Bucket creation failed for %s", self.default_bucket, exc_info=exc)
+            raise
+
+    async def _put_single(self, object_name: str, data: BytesIO, length: int) -> str:
+        try:
+            await self._request("PUT", self._path(object_name), content=data.read(length))
+        except S3Error as exc:
+            logger.exception("Failed to upload object %s", object_name, exc_info=exc)
+            raise
+        return object_name
+
+    async def create_multipart_upload(self, object_name: str) -> str:
+        """
+        Start a multipart upload and return its upload id.
+        """
+        try:
+            root = await self._request_xml("POST", self._path(object_name), params={"uploads": ""})
+        except S3Error as exc:
+            logger.exception("Failed to start multipart upload for %s", object_name, exc_info=exc)
+            raise
+        return root.findtext("{*}UploadId") or ""
+
+    async def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """
+        Upload a single part of a multipart upload and return its etag.
+
+        `data` may be a `bytearray`, which is sent without a copy.
+        """
+        try:
+            response = await self._request(
+                "PUT",
+                self._path(object_name),
+                params={"partNumber": str(part_number), "uploadId": upload_id},
+                content=data,
+            )
+        except S3Error as exc:
+            logger.exception("Failed to upload part %s of %s", part_number, object_name, exc_info=exc)
+            raise
+        return response.headers.get("etag", "").strip('"')
+
+    async def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[StoragePart]) -> str:
+        """
+        Assemble the uploaded parts into the final object.
+        """
+        content = "".join(
+            f'<Part><PartNumber>{part.part_number}</PartNumber><ETag>"{part.etag.strip(chr(34))}"</ETag></Part>'
+            for part in sorted(parts, key=lambda part: part.part_number)
+        )
+        try:
+            await self._request_xml(
+                "POST",
+                self._path(object_name),
+                params={"uploadId": upload_id},
+                content=f"<CompleteMultipartUpload>{content}</CompleteMultipartUpload>".encode(),
+            )
+        except S3Error as exc:
+            logger.exception("Failed to complete multipart upload for %s", object_name, exc_info=exc)
+            raise
+        return object_name
+
+    async def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        """
+        Abort a multipart upload and drop the parts uploaded so far.
+        """
+        try:
+            await self._request("DELETE", self._path(object_name), params={"uploadId": upload_id})
+        except S3Error as exc:
+            logger.exception("Failed to abort multipart upload for %s", object_name, exc_info=exc)
+            raise
+
+    async def get_object_stream(
+        self, object_name: str, offset: int = 0, length: int | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream an object, or a byte range of it, straight from the response body.
+        """
+        headers = {}
+        if offset or length:
+            headers["range"] = f"bytes={offset}-{offset + length - 1 if length else ''}"
+
+        async def stream_generator() -> AsyncGenerator[bytes, None]:
+            try:
+                response = await self._request("GET", self._path(object_name), headers=headers, stream=True)
+            except S3Error as exc:
+                logger.exception("Failed to get object %s", object_name, exc_info=exc)
+                raise
+            try:
+                async for chunk in response.aiter_raw(self.config.read_chunk_size):
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return read_ahead(stream_generator(), self.config.read_ahead)
+
+    async def stat_object(self, object_name: str) -> StorageObjectStat:
+        """
+        Get size, etag and, if storage checked one, SHA-256 of an object in the default bucket.
+        """
+        try:
+            response = await self._request("HEAD", self._path(object_name), headers={"x-amz-checksum-mode": "ENABLED"})
+        except S3Error as exc:
+            logger.exception("Failed to stat object %s", object_name, exc_info=exc)
+            raise
+        return StorageObjectStat(
+            object_name=object_name,
+            size=int(response.headers.get("content-length", 0)),
+            etag=response.headers.get("etag", "").strip('"'),
+            checksum=checksum_hex(response.headers.get("x-amz-checksum-sha256")),
+        )
+
+    async def upload_part_copy(
+        self, source_name: str, object_name: str, upload_id: str, part_number: int, offset: int, length: int
+    ) -> str:
+        """
+        Copy a byte range of an object into one part of a multipart upload and return its etag.
+        """
+        try:
+            root = await self._request_xml(
+                "PUT",
+                self._path(object_name),
+                params={"partNumber": str(part_number), "uploadId": upload_id},
+                headers={
+                    "x-amz-copy-source": self._path(source_name),
+                    "x-amz-copy-source-range": f"bytes={offset}-{offset + length - 1}",
+                },
+            )
+        except S3Error as exc:
+            logger.exception("Failed to copy part %s of %s to %s", part_number, source_name, object_name, exc_info=exc)
+            raise
+        return (root.findtext("{*}ETag") or "").strip('"')
+
+    async def _copy_parts(self, source_name: str, object_name: str, size: int) -> str:
+        """
+        Copy an object as a multipart upload of part copies, running them concurrently.
+        """
+        part_size = self._choose_part_size(size)
+        slots = Semaphore(self.config.upload_concurrency)
+        retrying = backoff.on_exception(
+            backoff.expo, RETRYABLE_ERRORS, max_tries=self.config.part_retries, giveup=is_permanent
+        )
+
+        async def copy(part_number: int, offset: int) -> StoragePart:
+            async with slots:
+                etag = await retrying(self.upload_part_copy)(
+                    source_name, object_name, upload_id, part_number, offset, min(part_size, size - offset)
+                )
+            return StoragePart(part_number=part_number, etag=etag)
+
+        upload_id = await self.create_multipart_upload(object_name)
+        tasks = [create_task(copy(number, offset)) for number, offset in enumerate(range(0, size, part_size), start=1)]
+        try:
+            parts = list(await gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            await self.abort_multipart_upload(object_name, upload_id)
+            raise
+        return await self.complete_multipart_upload(object_name, upload_id, parts)
+
+    async def copy_object(self, source_name: str, object_name: str) -> str:
+        """
+        Copy an object server-side within the default bucket.
+
+        Objects over `MAX_COPY_SIZE` are copied part by part, as one CopyObject cannot take them.
+        """
+        stat = await self.stat_object(source_name)
+        if stat.size > MAX_COPY_SIZE:
+            return await self._copy_parts(source_name, object_name, stat.size)
+        try:
+            await self._request_xml(
+                "PUT", self._path(object_name), headers={"x-amz-copy-source": self._path(source_name)}
+            )
+        except S3Error as exc:
+            logger.exception("Failed to copy object %s to %s", source_name, object_name, exc_info=exc)
+            raise
+        return object_name
+
+    async def remove_object(self, object_name: str) -> None:
+        """
+        Remove an object from the default bucket.
+        """
+        try:
+            await self._request("DELETE", self._path(object_name))
+        except S3Error as exc:
+            logger.exception("Failed to remove object %s", object_name, exc_info=exc)
+            raise
+
+    async def list_objects(self, prefix: str) -> list[StorageObject]:
+        """
+        List object versions in the default bucket with the given prefix, page by page.
+        """
+        objects: list[StorageObject] = []
+        params = {"versions": "", "prefix": prefix}
+        try:
+            while True:
+                root = await self._request_xml("GET", self._path(), params=params)
+                objects.extend(
+                    StorageObject(
+                        object_name=version.findtext("{*}Key") or "",
+                        version_id=version.findtext("{*}VersionId") or "null",
+                        last_modified=version.findtext("{*}LastModified") or "",
+                        size=int(version.findtext("{*}Size") or 0),
+                    )
+                    for version in root.iterfind("{*}Version")
+                )
+                if root.findtext("{*}IsTruncated") != "true":
+                    return objects
+                params["key-marker"] = root.findtext("{*}NextKeyMarker") or ""
+                params["version-id-marker"] = root.findtext("{*}NextVersionIdMarker") or ""
+        except S3Error as exc:
+            logger.exception("Failed to list objects with prefix %s", prefix, exc_info=exc)
+            raise
+
+    def _presign(
+        self,
+        method: str,
+        object_name: str,
+        expires: int,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> str:
+        path = self._path(object_name)
+        query = self._signer.presign(method, self._host, path, params or {}, expires, datetime.now(UTC), headers)
+        return f"{self._base_url}{path}?{query}"
+
+    async def generate_presigned_url(self, object_name: str, expires: int) -> str:
+        """
+        Generate a presigned URL for an object in the default bucket.
+        """
+        return self._presign("GET", object_name, expires)
+
+    async def generate_presigned_put_url(
+        self, object_name: str, expires: int, checksum: str | None = None
+    ) -> PresignedUpload:
+        """
+        Generate a presigned URL a client can PUT the whole object to.
+
+        With a hex SHA-256 `checksum`, the URL only takes a request declaring it in
+        `x-amz-checksum-sha256`; storage rejects content that does not match and keeps the
+        checksum, which `stat_object` then returns.
+        """
+        if checksum is None:
+            return PresignedUpload(url=self._presign("PUT", object_name, expires))
+        headers = checksum_header(checksum)
+        return PresignedUpload(url=self._presign("PUT", object_name, expires, headers=headers), headers=headers)
+
+    async def generate_presigned_part_url(
+        self, object_name: str, upload_id: str, part_number: int, expires: int
+    ) -> str:
+        """
+        Generate a presigned URL a client can PUT one part of a multipart upload to.
+        """
+        return self._presign("PUT", object_name, expires, {"uploadId": upload_id, "partNumber": str(part_number)})
+
+    async def check(self) -> bool:
+        response = await self._request("GET", "/")
+        return response.is_success
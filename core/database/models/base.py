@@ -3,7 +3,7 @@ from typing import Annotated, Any, ClassVar
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import TIMESTAMP, String
+from sqlalchemy import TIMESTAMP, BigInteger, String
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, mapped_column
 
@@ -21,12 +21,13 @@ UUID_PK = Annotated[UUID, mapped_column(primary_key=True, default=uuid4)]
 class Base(AsyncAttrs, DeclarativeBase):
     """Base model class"""
 
-    type_annotations_map: ClassVar[dict[type[Any], Any]] = {
+    type_annotation_map: ClassVar[dict[type[Any], Any]] = {
         STR_10: String(10),
         STR_50: String(50),
         STR_100: String(100),
         STR_255: String(255),
         STR_512: String(512),
+        INT_64: BigInteger(),
     }
 
     def __repr__(self) -> str:
@@ -1,17 +1,63 @@
+from asyncio import Lock
 from collections.abc import AsyncGenerator
 
+from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from core.logging.logger import CoreLogger
 
 logger = CoreLogger.get_logger("postgres_session")
 
 
-async def get_session(dsn: str) -> AsyncGenerator[AsyncSession, None]:
+class PostgresConfig(BaseModel):
+    dsn: str
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+
+
+class PostgresEngine:
+    """One engine and connection pool per worker process."""
+
+    engine: AsyncEngine | None = None
+    session_factory: async_sessionmaker[AsyncSession] | None = None
+    _lock = Lock()
+
+    @classmethod
+    async def ensure_engine(cls, config: PostgresConfig) -> async_sessionmaker[AsyncSession]:
+        async with cls._lock:
+            if cls.session_factory is None:
+                cls.engine = create_async_engine(
+                    url=config.dsn,
+                    echo=config.echo,
+                    pool_size=config.pool_size,
+                    max_overflow=config.max_overflow,
+                    pool_recycle=config.pool_recycle,
+                    pool_pre_ping=config.pool_pre_ping,
+                    connect_args={"prepared_statement_cache_size": config.statement_cache_size},
+                )
+                cls.session_factory = async_sessionmaker(
+                    bind=cls.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+                )
+                logger.info("Postgres engine initialized")
+            return cls.session_factory
+
+    @classmethod
+    async def dispose(cls) -> None:
+        if cls.engine:
+            await cls.engine.dispose()
+            cls.engine = None
+            cls.session_factory = None
+            logger.info("Postgres engine disposed")
+
+
+async def get_session(config: PostgresConfig) -> AsyncGenerator[AsyncSession, None]:
     """Get a session for database operations"""
-    async_engine = create_async_engine(url=dsn, echo=True)
-    async_session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    async_session = PostgresEngine.session_factory or await PostgresEngine.ensure_engine(config)
 
     async with async_session() as session, session.begin():
         try:
@@ -1,10 +1,28 @@
+import hashlib
+
+from asyncio import to_thread
 from collections.abc import AsyncGenerator
 from datetime import timedelta
+from pathlib import Path
 
 from minio import S3Error
 
+from core.client.filesystem import FilesystemStorageClient
 from core.client.minio import ObjectStorageProtocol
-from core.database.schemas.minio import MinioFile, MinioFileDownload, StorageObject
+from core.database.schemas.minio import (
+    MinioBlobDownload,
+    MinioBlobStream,
+    MinioFile,
+    MinioFileDownload,
+    MinioFileStream,
+    PresignedUpload,
+    StagedObject,
+    StorageBlob,
+    StorageObject,
+    StorageObjectStat,
+    StoragePart,
+    UploadedObject,
+)
 from core.logging.logger import CoreLogger
 
 logger = CoreLogger.get_logger("minio_repo")
@@ -27,15 +45,48 @@ class MinioRepository:
             logger.exception("Failed to upload file %s", file.object_name, exc_info=exc)
             raise
 
-    async def download_file(self, file: MinioFileDownload) -> AsyncGenerator[bytes, None]:
-        """Download file contents from storage"""
+    async def upload_file_stream(self, file: MinioFileStream | MinioBlobStream) -> UploadedObject:
+        """Stream file to object storage without buffering it whole"""
         try:
-            async for chunk in await self._storage.get_object_stream(file.object_name):
+            return await self._storage.put_object_stream(file.object_name, file.stream)
+        except S3Error as exc:
+            logger.exception("Failed to upload file %s", file.object_name, exc_info=exc)
+            raise
+
+    async def download_file(self, file: MinioFileDownload | MinioBlobDownload) -> AsyncGenerator[bytes, None]:
+        """Download file contents, or the requested byte range of them, from storage"""
+        try:
+            async for chunk in await self._storage.get_object_stream(file.object_name, file.offset, file.length):
                 yield chunk
         except S3Error as exc:
             logger.exception("Failed to download file %s", file.object_name, exc_info=exc)
             raise
 
+    def local_path(self, file: MinioFileDownload | MinioBlobDownload) -> Path | None:
+        """File holding the object when storage is on local disk, for the server to send as is"""
+        if isinstance(self._storage, FilesystemStorageClient):
+            return self._storage.local_path(file.object_name)
+        return None
+
+    async def blob_exists(self, blob: StorageBlob) -> bool:
+        """Whether the object of a blob is in storage"""
+        try:
+            await self._storage.stat_object(blob.object_name)
+        except S3Error as exc:
+            if exc.code == "NoSuchKey":
+                return False
+            logger.exception("Failed to stat blob %s", blob.object_name, exc_info=exc)
+            raise
+        return True
+
+    async def remove_blob(self, blob: StorageBlob) -> None:
+        """Remove a blob nobody references any more"""
+        try:
+            await self._storage.remove_object(blob.object_name)
+        except S3Error as exc:
+            logger.exception("Failed to remove blob %s", blob.object_name, exc_info=exc)
+            raise
+
     async def list_versions(self, file: MinioFile) -> list[StorageObject]:
         """List all available versions for a file"""
 
@@ -46,7 +97,9 @@ class MinioRepository:
             logger.exception("Failed to list versions for file %s", file.path, exc_info=exc)
             raise
 
-    async def generate_presigned_url(self, file: MinioFile, expires: timedelta = timedelta(hours=1)) -> str:
+    async def generate_presigned_url(
+        self, file: MinioFile | MinioFileDownload | MinioBlobDownload, expires: timedelta = timedelta(hours=1)
+    ) -> str:
         """Generate presigned URL for file access"""
         try:
             return await self._storage.generate_presigned_url(file.object_name, int(expires.total_seconds()))
@@ -54,6 +107,103 @@ class MinioRepository:
             logger.exception("Failed to generate URL for %s", file.object_name, exc_info=exc)
             raise
 
+    async def generate_upload_url(self, file: StagedObject, expires: timedelta, checksum: str) -> PresignedUpload:
+        """Generate presigned URL a client uploads a staged object of this SHA-256 to at once"""
+        try:
+            return await self._storage.generate_presigned_put_url(
+                file.object_name, int(expires.total_seconds()), checksum
+            )
+        except S3Error as exc:
+            logger.exception("Failed to generate upload URL for %s", file.object_name, exc_info=exc)
+            raise
+
+    async def start_multipart_upload(self, file: StagedObject) -> str:
+        """Start a multipart upload of a staged object, return its upload id"""
+        try:
+            return await self._storage.create_multipart_upload(file.object_name)
+        except S3Error as exc:
+            logger.exception("Failed to start multipart upload for %s", file.object_name, exc_info=exc)
+            raise
+
+    async def generate_part_urls(
+        self, file: StagedObject, upload_id: str, part_count: int, expires: timedelta
+    ) -> list[str]:
+        """Generate presigned URLs for parts 1..part_count of a multipart upload"""
+        try:
+            return [
+                await self._storage.generate_presigned_part_url(
+                    file.object_name, upload_id, part_number, int(expires.total_seconds())
+                )
+                for part_number in range(1, part_count + 1)
+            ]
+        except S3Error as exc:
+            logger.exception("Failed to generate part URLs for %s", file.object_name, exc_info=exc)
+            raise
+
+    async def upload_part(self, file: StagedObject, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part of a staged multipart upload, return its etag"""
+        try:
+            return await self._storage.upload_part(file.object_name, upload_id, part_number, data)
+        except S3Error as exc:
+            logger.exception("Failed to upload part %s of %s", part_number, file.object_name, exc_info=exc)
+            raise
+
+    async def complete_multipart_upload(self, file: StagedObject, upload_id: str, parts: list[StoragePart]) -> str:
+        """Assemble uploaded parts of a staged object"""
+        try:
+            return await self._storage.complete_multipart_upload(file.object_name, upload_id, parts)
+        except S3Error as exc:
+            logger.exception("Failed to complete multipart upload for %s", file.object_name, exc_info=exc)
+            raise
+
+    async def abort_multipart_upload(self, file: StagedObject, upload_id: str) -> None:
+        """Drop parts of an unfinished multipart upload"""
+        try:
+            await self._storage.abort_multipart_upload(file.object_name, upload_id)
+        except S3Error as exc:
+            logger.exception("Failed to abort multipart upload for %s", file.object_name, exc_info=exc)
+            raise
+
+    async def stat_file(self, file: StagedObject) -> StorageObjectStat:
+        """Get size and etag of a staged object"""
+        try:
+            return await self._storage.stat_object(file.object_name)
+        except S3Error as exc:
+            logger.exception("Failed to stat file %s", file.object_name, exc_info=exc)
+            raise
+
+    async def checksum_file(self, file: StagedObject) -> str:
+        """Compute SHA-256 of a staged object by streaming it back from storage"""
+        hasher = hashlib.sha256()
+        try:
+            async for chunk in await self._storage.get_object_stream(file.object_name):
+                await to_thread(hasher.update, chunk)
+        except S3Error as exc:
+            logger.exception("Failed to hash file %s", file.object_name, exc_info=exc)
+            raise
+        return hasher.hexdigest()
+
+    async def copy_staged(self, file: StagedObject, blob: StorageBlob) -> None:
+        """Copy a verified staged object to its content-addressed blob key"""
+        try:
+            await self._storage.copy_object(file.object_name, blob.object_name)
+        except S3Error as exc:
+            logger.exception("Failed to promote %s to %s", file.object_name, blob.object_name, exc_info=exc)
+            raise
+
+    async def promote_staged(self, file: StagedObject, blob: StorageBlob) -> None:
+        """Move a verified staged object to its content-addressed blob key"""
+        await self.copy_staged(file, blob)
+        await self.remove_staged(file)
+
+    async def remove_staged(self, file: StagedObject) -> None:
+        """Remove a staged object"""
+        try:
+            await self._storage.remove_object(file.object_name)
+        except S3Error as exc:
+            logger.exception("Failed to remove staged file %s", file.object_name, exc_info=exc)
+            raise
+
     @property
     def storage(self) -> ObjectStorageProtocol:
         return self._storage
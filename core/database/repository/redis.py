@@ -1,11 +1,13 @@
 from typing import Self
 
 from asyncio import Lock
+from collections.abc import AsyncIterator, Iterable, Sequence
 from datetime import timedelta
 from enum import StrEnum
 
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import RedisError
 
@@ -36,6 +38,18 @@ class TokenKey(BaseModel):
         return f"{self.namespace}:{self.jti}"
 
 
+class GenerationKey(BaseModel):
+    """Per-user token generation key wrapper."""
+
+    user_id: str
+    namespace: str = "generation"
+
+    @computed_field(alias="key", repr=True)  # type: ignore[prop-decorator]
+    @property
+    def key(self) -> str:
+        return f"{self.namespace}:{self.user_id}"
+
+
 class TokenData(BaseModel):
     """Token storage model"""
 
@@ -70,22 +84,111 @@ class RedisRepository:
         logger.info("Set result: %s", result)
         return bool(result)
 
+    async def add(self, data: TokenData) -> bool:
+        """Set the key only if it is not there yet; whether it was set."""
+        return bool(await self._redis.set(name=data.key, value=data.value, ex=data.expires, nx=True))
+
     async def get(self, key: str) -> str | None:
         return await self._redis.get(key)
 
-    async def get_all(self) -> list[str] | None:  # type: ignore[return]
+    async def get_all(self, match: str = "*", batch_size: int = 1000) -> list[str] | None:  # type: ignore[return]
+        """Values of the string keys matching `match`: SCAN in pages, one MGET per page."""
         try:
-            keys = await self._redis.keys("*")
-            keys = [await self._redis.get(key) for key in keys]
-            logger.info("Keys: %s", keys)
+            values: list[str] = []
+            batch: list[str] = []
+            async for key in self.scan(match=match, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    values.extend(value for value in await self.mget(batch) if value is not None)
+                    batch = []
+            if batch:
+                values.extend(value for value in await self.mget(batch) if value is not None)
         except RedisError as e:
             logger.exception("Redis error: %s", exc_info=e)
         else:
-            return keys
+            return values
+
+    async def scan(self, match: str = "*", count: int = 1000) -> AsyncIterator[str]:
+        """Yield keys matching `match` with SCAN, `count` keys per round trip at most."""
+        async for key in self._redis.scan_iter(match=match, count=count):
+            yield key
+
+    def pipeline(self, *, transaction: bool = False) -> Pipeline:  # type: ignore[type-arg]
+        """
+        Pipeline for queuing several commands and sending them in one round trip.
+
+        Use it as `async with repo.pipeline() as pipe`, then `await pipe.execute()`;
+        with `transaction=True` the commands run as MULTI/EXEC.
+        """
+        return self._redis.pipeline(transaction=transaction)
+
+    async def mget(self, keys: Sequence[str]) -> list[str | None]:
+        if not keys:
+            return []
+        return await self._redis.mget(keys)  # type: ignore[no-any-return]
+
+    async def mset(self, items: Iterable[TokenData]) -> None:
+        """Set many keys, each with its own TTL, in one round trip."""
+        async with self.pipeline() as pipe:
+            for data in items:
+                pipe.set(name=data.key, value=data.value, ex=data.expires)
+            await pipe.execute()
+
+    async def exists_many(self, keys: Sequence[str]) -> list[bool]:
+        async with self.pipeline() as pipe:
+            for key in keys:
+                pipe.exists(key)
+            return [bool(found) for found in await pipe.execute()]
+
+    async def delete_many(self, keys: Sequence[str]) -> int:
+        """Delete `keys` with one DEL; return how many existed."""
+        if not keys:
+            return 0
+        return await self._redis.delete(*keys)  # type: ignore[no-any-return]
 
     async def delete(self, key: str) -> bool:
         return bool(await self._redis.delete(key))
 
+    async def incr(self, key: str) -> int:
+        return await self._redis.incr(key)  # type: ignore[no-any-return]
+
+    async def incr_many(self, keys: Sequence[str], expires: timedelta) -> None:
+        """Increment each of `keys` and (re)start its TTL, in one round trip."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, expires)
+            await pipe.execute()
+
+    async def hset(self, key: str, mapping: dict[str, str], expires: timedelta) -> None:
+        """Set hash fields and (re)start the hash TTL in one round trip."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)  # type: ignore[arg-type]
+            pipe.expire(key, expires)
+            await pipe.execute()
+
+    async def hget(self, key: str, field: str) -> str | None:
+        return await self._redis.hget(key, field)  # type: ignore[no-any-return,misc]
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return await self._redis.hgetall(key)  # type: ignore[no-any-return,misc]
+
+    async def expire(self, key: str, expires: timedelta) -> bool:
+        return bool(await self._redis.expire(key, expires))
+
+    async def smembers(self, key: str) -> list[str]:
+        return list(await self._redis.smembers(key))  # type: ignore[misc]
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self._redis.publish(channel, message)  # type: ignore[no-any-return]
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        """Yield messages published to `channel` until the connection fails."""
+        async with self._redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(channel)
+            async for message in pubsub.listen():
+                yield message["data"]
+
     async def exists(self, key: str) -> bool:
         logger.info("Checking if token exists: %s", key)
         return bool(await self._redis.exists(key))
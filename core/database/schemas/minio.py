@@ -1,3 +1,5 @@
+from typing import Protocol, runtime_checkable
+
 from io import BytesIO
 from urllib.parse import unquote
 from uuid import UUID
@@ -5,12 +7,26 @@ from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 
 
+@runtime_checkable
+class AsyncReader(Protocol):
+    """Any object with an async `read`, e.g. `fastapi.UploadFile`."""
+
+    async def read(self, size: int = -1) -> bytes: ...
+
+
 class ObjectStorageConfig(BaseModel):
     endpoint: str
     access_key: str
     secret_key: str
     secure: bool = False
+    region: str = "us-east-1"
+    max_connections: int = Field(default=32, ge=1, description="Connections kept open to the storage endpoint")
     part_size: int = 50 * 1024 * 1024
+    max_parts_in_memory: int = Field(default=2, ge=1, description="Upper bound of parts buffered per stream upload")
+    upload_concurrency: int = Field(default=4, ge=1, description="Parts of one object uploaded in parallel")
+    part_retries: int = Field(default=3, ge=1, description="Attempts per part before the upload is aborted")
+    read_chunk_size: int = Field(default=1024 * 1024, ge=1, description="Bytes per chunk of a download stream")
+    read_ahead: int = Field(default=4, ge=0, description="Chunks read ahead of a slow consumer per download")
 
 
 class DataMixin(BaseModel):
@@ -19,6 +35,17 @@ class DataMixin(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+class StreamMixin(BaseModel):
+    stream: AsyncReader
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class RangeMixin(BaseModel):
+    offset: int = Field(default=0, ge=0, description="First byte to read")
+    length: int | None = Field(default=None, ge=0, description="Bytes to read, up to the end when not set")
+
+
 class StorageObjectFile(BaseModel):
     file_id: UUID
     version: int
@@ -44,7 +71,40 @@ class StorageObjectFile(BaseModel):
 class MinioFile(StorageObjectFile, DataMixin): ...
 
 
-class MinioFileDownload(StorageObjectFile): ...
+class MinioFileStream(StorageObjectFile, StreamMixin): ...
+
+
+class MinioFileDownload(StorageObjectFile, RangeMixin): ...
+
+
+class StorageBlob(BaseModel):
+    """Object addressed by the SHA-256 of its content."""
+
+    checksum: str = Field(min_length=64, max_length=64)
+    bucket: str = Field(default="files")
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def object_name(self) -> str:
+        return f"blobs/{self.checksum[:2]}/{self.checksum}"
+
+
+class MinioBlobStream(StorageBlob, StreamMixin): ...
+
+
+class MinioBlobDownload(StorageBlob, RangeMixin): ...
+
+
+class StagedObject(BaseModel):
+    """Object uploaded by a client straight to storage, waiting to be verified."""
+
+    upload_id: UUID
+    bucket: str = Field(default="files")
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def object_name(self) -> str:
+        return f"uploads/{self.upload_id}"
 
 
 class StorageObject(BaseModel):
@@ -52,3 +112,28 @@ class StorageObject(BaseModel):
     version_id: str
     last_modified: str
     size: int
+
+
+class StorageObjectStat(BaseModel):
+    object_name: str
+    size: int
+    etag: str
+    checksum: str | None = Field(default=None, description="SHA-256 of the content checked by storage, hex")
+
+
+class PresignedUpload(BaseModel):
+    """Presigned URL to PUT content to, with the headers the request must carry."""
+
+    url: str
+    headers: dict[str, str] = Field(default_factory=dict)
+
+
+class StoragePart(BaseModel):
+    part_number: int = Field(ge=1)
+    etag: str
+
+
+class UploadedObject(BaseModel):
+    object_name: str
+    size: int
+    checksum: str = Field(description="Hex encoded SHA-256 of the object content")
@@ -1,4 +1,21 @@
+from core.security.auth.blacklist import (
+    GENERATION_CLAIM,
+    BlacklistCacheConfig,
+    get_generation,
+    publish_revocation,
+    revoke_all_sessions,
+)
 from core.security.auth.dependencies import setup_auth_middleware
+from core.security.auth.ip_checker import IPBlacklistSource
 from core.security.auth.service import get_auth_service
 
-__all__: list[str] = ["get_auth_service", "setup_auth_middleware"]
+__all__: list[str] = [
+    "GENERATION_CLAIM",
+    "BlacklistCacheConfig",
+    "IPBlacklistSource",
+    "get_auth_service",
+    "get_generation",
+    "publish_revocation",
+    "revoke_all_sessions",
+    "setup_auth_middleware",
+]
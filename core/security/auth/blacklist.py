@@ -0,0 +1,128 @@
+import time
+
+from asyncio import CancelledError, sleep
+from collections import OrderedDict
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from redis.exceptions import RedisError
+
+from core.database.repository.redis import GenerationKey, RedisRepository, TokenKey
+from core.logging.logger import CoreLogger
+from core.security.auth.schemas import RevokedToken, UserGeneration
+
+logger = CoreLogger.get_logger("blacklist_cache")
+
+REVOKED_CHANNEL = "blacklist:revoked"
+GENERATION_CLAIM = "gen"
+
+Revocation: TypeAdapter[RevokedToken | UserGeneration] = TypeAdapter(RevokedToken | UserGeneration)
+
+
+class BlacklistCacheConfig(BaseModel):
+    max_size: int = Field(default=100_000, ge=1, description="Most jtis and users remembered per process")
+    negative_ttl: float = Field(default=5.0, ge=0, description="Seconds a 'not revoked' answer is trusted")
+    reconnect_delay: float = Field(default=1.0, gt=0, description="Pause before resubscribing after an error")
+
+
+class BlacklistCache:
+    """
+    In-process cache in front of the Redis token blacklist and user token generations.
+
+    Revoked jtis are remembered until their token expires, "not revoked" answers and user
+    generations for `negative_ttl` seconds. Revocations are pushed through Redis pub/sub, so a
+    logout reaches every process at once; `negative_ttl` bounds the delay when a message is lost.
+    """
+
+    __slots__ = ("_config", "_entries", "_generations")
+
+    def __init__(self, config: BlacklistCacheConfig) -> None:
+        self._config = config
+        self._entries: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._generations: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def _remember(self, jti: str, *, revoked: bool, until: float) -> None:
+        self._entries[jti] = (revoked, until)
+        self._entries.move_to_end(jti)
+        while len(self._entries) > self._config.max_size:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, jti: str) -> bool | None:
+        entry = self._entries.get(jti)
+        if entry is None:
+            return None
+        revoked, until = entry
+        if until <= time.time():
+            del self._entries[jti]
+            return None
+        return revoked
+
+    def revoke(self, token: RevokedToken) -> None:
+        self._remember(token.jti, revoked=True, until=token.exp)
+
+    def set_generation(self, user: UserGeneration) -> None:
+        # Generations only grow, so a late message must not lower the cached one.
+        known, _ = self._generations.get(user.user_id, (0, 0.0))
+        self._generations[user.user_id] = (max(known, user.generation), time.time() + self._config.negative_ttl)
+        self._generations.move_to_end(user.user_id)
+        while len(self._generations) > self._config.max_size:
+            self._generations.popitem(last=False)
+
+    async def is_revoked(self, redis: RedisRepository, jti: str, exp: float) -> bool:
+        """Whether the token `jti`, valid until `exp` (unix time), was revoked."""
+        cached = self._lookup(jti)
+        if cached is not None:
+            return cached
+
+        revoked = await redis.exists(TokenKey(jti=jti).key)
+        until = exp if revoked else min(exp, time.time() + self._config.negative_ttl)
+        self._remember(jti, revoked=revoked, until=until)
+        return revoked
+
+    async def is_superseded(self, redis: RedisRepository, user_id: str, generation: int) -> bool:
+        """Whether all sessions of `user_id` were revoked after a `generation` token was issued."""
+        entry = self._generations.get(user_id)
+        if entry is None or entry[1] <= time.time():
+            current = await get_generation(redis, user_id)
+            self.set_generation(UserGeneration(user_id=user_id, generation=current))
+        else:
+            current = entry[0]
+        return generation < current
+
+    def _forget_negatives(self) -> None:
+        for jti in [jti for jti, (revoked, _) in self._entries.items() if not revoked]:
+            del self._entries[jti]
+        self._generations.clear()
+
+    async def listen(self, redis: RedisRepository) -> None:
+        """Apply revocations published by other processes; runs until cancelled."""
+        while True:
+            try:
+                async for message in redis.subscribe(REVOKED_CHANNEL):
+                    revocation = Revocation.validate_json(message)
+                    if isinstance(revocation, RevokedToken):
+                        self.revoke(revocation)
+                    else:
+                        self.set_generation(revocation)
+            except CancelledError:
+                raise
+            except (RedisError, ValidationError) as e:
+                logger.warning("Blacklist subscription failed, resubscribing: %s", e)
+            # Revocations may have been missed while not subscribed.
+            self._forget_negatives()
+            await sleep(self._config.reconnect_delay)
+
+
+async def publish_revocation(redis: RedisRepository, token: RevokedToken | UserGeneration) -> None:
+    await redis.publish(REVOKED_CHANNEL, token.model_dump_json())
+
+
+async def revoke_all_sessions(redis: RedisRepository, user_id: str) -> int:
+    """Bump the token generation of `user_id`, revoking every token issued before; O(1)."""
+    generation = await redis.incr(GenerationKey(user_id=user_id).key)
+    await publish_revocation(redis, UserGeneration(user_id=user_id, generation=generation))
+    return generation
+
+
+async def get_generation(redis: RedisRepository, user_id: str) -> int:
+    """Generation to embed in newly issued tokens of `user_id`."""
+    return int(await redis.get(GenerationKey(user_id=user_id).key) or 0)
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 
 from core.database.repository.redis import RedisConfig
+from core.security.auth.blacklist import BlacklistCache, BlacklistCacheConfig
+from core.security.auth.ip_checker import IPBlacklistSource
 from core.security.auth.middleware import AuthMiddleware
 from core.security.auth.permissions import PermissionChecker, PermissionsCheck
 
@@ -12,6 +14,8 @@ def setup_auth_middleware(
     api_version: str,
     redis_config: RedisConfig,
     permissions_enabled: PermissionsCheck = PermissionsCheck.DISABLED,
+    blacklist_cache: BlacklistCacheConfig | None = None,
+    blacklist_source: IPBlacklistSource | None = None,
 ) -> None:
     permission_checker = PermissionChecker(exempt_endpoints, permissions_enabled)
 
@@ -21,4 +25,6 @@ def setup_auth_middleware(
         api_version=api_version,
         blacklist=blacklist,
         redis_config=redis_config,
+        blacklist_cache=BlacklistCache(blacklist_cache or BlacklistCacheConfig()),
+        blacklist_source=blacklist_source,
     )
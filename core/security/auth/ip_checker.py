@@ -2,7 +2,20 @@ from typing import Any
 
 import ipaddress
 
-from pydantic import BaseModel, field_validator
+from asyncio import CancelledError, sleep, to_thread
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+
+from pydantic import BaseModel, Field, field_validator
+from redis.exceptions import RedisError
+
+from core.database.repository.redis import RedisRepository
+from core.logging.logger import CoreLogger
+
+logger = CoreLogger.get_logger("ip_checker")
+
+Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+Address = ipaddress.IPv4Address | ipaddress.IPv6Address
 
 
 class NetworkConfig(BaseModel):
@@ -14,12 +27,104 @@ class NetworkConfig(BaseModel):
         return [ipaddress.ip_network(net, strict=False) for net in v]
 
 
+class IPBlacklistSource(BaseModel):
+    """Where extra blacklisted networks are reloaded from, on top of the static list."""
+
+    file: Path | None = Field(default=None, description="File with one network per line")
+    redis_key: str | None = Field(default=None, description="Redis set of networks")
+    reload_interval: float = Field(default=30.0, gt=0, description="Seconds between reloads")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.file or self.redis_key)
+
+
+class CompiledNetworks:
+    """
+    Networks compiled into one hash set of prefixes per prefix length and address family.
+
+    A lookup probes each prefix length in use once, so it costs at most 33 (IPv4) or 129 (IPv6)
+    set lookups however many networks are listed. Overlapping networks are collapsed first.
+    """
+
+    __slots__ = ("_v4", "_v6", "size")
+
+    def __init__(self, networks: Iterable[Network]) -> None:
+        networks = list(networks)
+        self._v4 = self._compile([net for net in networks if net.version == 4], 32)
+        self._v6 = self._compile([net for net in networks if net.version == 6], 128)
+        self.size = len(networks)
+
+    @staticmethod
+    def _compile(networks: list[Network], bits: int) -> tuple[tuple[int, frozenset[int]], ...]:
+        by_length: dict[int, set[int]] = {}
+        for net in ipaddress.collapse_addresses(networks):  # type: ignore[type-var]
+            by_length.setdefault(net.prefixlen, set()).add(int(net.network_address) >> (bits - net.prefixlen))
+        return tuple((bits - length, frozenset(prefixes)) for length, prefixes in sorted(by_length.items()))
+
+    def __contains__(self, address: Address) -> bool:
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        levels = self._v4 if address.version == 4 else self._v6
+        value = int(address)
+        return any((value >> shift) in prefixes for shift, prefixes in levels)
+
+
 class IPChecker:
-    __slots__ = ("networks",)
+    __slots__ = ("_static", "networks")
 
     def __init__(self, config: NetworkConfig):
-        self.networks: list[ipaddress.IPv4Network | ipaddress.IPv6Network] = config.blacklist
+        self._static: list[Network] = config.blacklist
+        self.networks = CompiledNetworks(self._static)
 
     def is_blocked(self, ip: str) -> bool:
-        client_ip: ipaddress.IPv4Address | ipaddress.IPv6Address = ipaddress.ip_address(ip)
-        return any(client_ip in net for net in self.networks)
+        try:
+            client_ip = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return client_ip in self.networks
+
+    def reload(self, entries: Iterable[str]) -> None:
+        """Swap in the static networks plus `entries`; malformed entries are logged and skipped."""
+        networks = list(self._static)
+        for entry in entries:
+            try:
+                networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                logger.warning("Skipping malformed blacklist entry %r", entry)
+        self.networks = CompiledNetworks(networks)
+        logger.info("IP blacklist reloaded: %s networks", self.networks.size)
+
+
+def _read_entries(path: Path) -> set[str]:
+    lines = (line.split("#", 1)[0].strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return {line for line in lines if line}
+
+
+async def watch_blacklist(
+    checker: IPChecker, source: IPBlacklistSource, get_redis: Callable[[], Awaitable[RedisRepository]]
+) -> None:
+    """
+    Reload `checker` whenever the entries in `source` change; runs until cancelled.
+
+    A failed reload, an unreadable or non-UTF-8 file included, is logged and leaves the networks
+    compiled last in place, to be retried on the next round.
+    """
+    loaded: set[str] | None = None
+    while True:
+        try:
+            entries: set[str] = set()
+            if source.file:
+                entries |= await to_thread(_read_entries, source.file)
+            if source.redis_key:
+                entries.update(await (await get_redis()).smembers(source.redis_key))
+            if entries != loaded:
+                checker.reload(entries)
+                loaded = entries
+        except CancelledError:
+            raise
+        except (OSError, RedisError, ValueError) as e:
+            logger.warning("IP blacklist reload failed, keeping the current one: %s", e)
+        except Exception:
+            logger.exception("IP blacklist reload failed, keeping the current one")
+        await sleep(source.reload_interval)
@@ -1,13 +1,14 @@
 from typing import Any
 
-from collections.abc import Callable
+from asyncio import Lock, Task, create_task
 
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from core.database.repository.redis import RedisConfig, RedisRepository, TokenKey, get_redis_client
+from core.database.repository.redis import RedisConfig, RedisRepository, get_redis_client
 from core.logging.logger import CoreLogger
+from core.security.auth.blacklist import GENERATION_CLAIM, BlacklistCache
 from core.security.auth.exceptions import (
     AuthenticationError,
     AuthJWTError,
@@ -15,90 +16,136 @@ from core.security.auth.exceptions import (
     InternalServerError,
     PermissionDeniedError,
 )
-from core.security.auth.ip_checker import IPChecker, NetworkConfig
+from core.security.auth.ip_checker import IPBlacklistSource, IPChecker, NetworkConfig, watch_blacklist
 from core.security.auth.permissions import PermissionChecker
-from core.security.auth.schemas import UserId, UserTokenGenData
+from core.security.auth.schemas import UserId
 from core.security.auth.service import get_auth_service
 
 logger = CoreLogger.get_logger("auth_middleware")
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Auth middleware."""
-
-    __slots__ = ("_redis_config", "_redis_repo", "api_version", "blacklist", "permission_checker")
+class AuthMiddleware:
+    """
+    Auth middleware.
+
+    Plain ASGI: requests that pass are handed to the app with the original `receive` and `send`,
+    so streamed responses are not wrapped.
+    """
+
+    __slots__ = (
+        "_blacklist_source",
+        "_blacklist_watcher",
+        "_listener",
+        "_redis_config",
+        "_redis_lock",
+        "_redis_repo",
+        "api_version",
+        "app",
+        "auth_service",
+        "blacklist_cache",
+        "ip_checker",
+        "permission_checker",
+    )
 
     def __init__(
         self,
-        app: FastAPI,
+        app: ASGIApp,
         permission_checker: PermissionChecker,
         blacklist: list[str],
         api_version: str,
         redis_config: RedisConfig,
+        blacklist_cache: BlacklistCache,
+        blacklist_source: IPBlacklistSource | None = None,
     ):
-        super().__init__(app)
+        self.app = app
         self.permission_checker = permission_checker
         self.api_version = api_version
-        self.blacklist = NetworkConfig(blacklist=blacklist)
+        self.ip_checker = IPChecker(NetworkConfig(blacklist=blacklist))
+        self.blacklist_cache = blacklist_cache
+        self.auth_service = get_auth_service()
         self._redis_config = redis_config
         self._redis_repo: RedisRepository | None = None
+        self._redis_lock = Lock()
+        self._listener: Task[None] | None = None
+        self._blacklist_source = blacklist_source if blacklist_source and blacklist_source.enabled else None
+        self._blacklist_watcher: Task[None] | None = None
 
     async def get_redis_repo(self) -> RedisRepository:
         if self._redis_repo is None:
-            redis_client = await get_redis_client(config=self._redis_config)
-            self._redis_repo = RedisRepository(redis=redis_client)
+            # Concurrent first requests wait here, so they share one client and one listener.
+            async with self._redis_lock:
+                if self._redis_repo is None:
+                    redis_client = await get_redis_client(config=self._redis_config)
+                    self._redis_repo = RedisRepository(redis=redis_client)
+                    self._listener = create_task(self.blacklist_cache.listen(self._redis_repo))
         return self._redis_repo
 
-    async def check_blacklist(self, jti: str) -> bool:
-        key = TokenKey(jti=jti).key
-        if not self._redis_repo:
-            return False
-        return await self._redis_repo.exists(key)
-
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Any]) -> JSONResponse:
-        logger.info("Request: query params: %s; headers: %s", request.query_params, request.headers)
-        auth_service = get_auth_service(request=request)
-        path = request.url.path.split(self.api_version)[-1]
-        client_ip = request.client.host
+    async def check_blacklist(self, token: dict[str, Any]) -> bool:
+        redis_repo = await self.get_redis_repo()
+        return await self.blacklist_cache.is_revoked(redis_repo, jti=token.get("jti", ""), exp=token.get("exp", 0))
 
-        logger.info("Client IP: %s, Path: %s", client_ip, path)
-        is_blocked = IPChecker(self.blacklist).is_blocked(client_ip)
+    async def check_generation(self, user_id: str, token: dict[str, Any]) -> bool:
+        redis_repo = await self.get_redis_repo()
+        return await self.blacklist_cache.is_superseded(redis_repo, user_id, int(token.get(GENERATION_CLAIM, 0)))
 
-        logger.info("Checking Client IP is blocked: %s", is_blocked)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if is_blocked:
-            return self.handle_error(exc=BlacklistError())
+        if self._blacklist_source is not None and self._blacklist_watcher is None:
+            self._blacklist_watcher = create_task(
+                watch_blacklist(self.ip_checker, self._blacklist_source, self.get_redis_repo)
+            )
 
-        logger.info("Client IP is not blocked")
+        client = scope.get("client")
+        if client and self.ip_checker.is_blocked(client[0]):
+            await self.handle_error(exc=BlacklistError())(scope, receive, send)
+            return
 
+        path = scope["path"].split(self.api_version)[-1]
         if not self.permission_checker.is_exempt(path):
-            logger.info("Checking permissions for path: %s", path)
-            try:
-                current_user: UserTokenGenData | None = await auth_service.authenticate()
-                logger.info("Current user: %s", current_user)
-                if not current_user:
-                    return self.handle_error(exc=AuthJWTError())
-
-                refresh_token_jti = current_user.refresh_token.get("jti", "")
-                if await self.check_blacklist(jti=refresh_token_jti):
-                    return self.handle_error(exc=AuthJWTError())
-
-                if self.permission_checker.permissions_enabled:
-                    user_perms = current_user.access_token.get("permissions", [])
-                    if not self.permission_checker.has_permission(user_perms, path):
-                        return self.handle_error(exc=PermissionDeniedError())
-
-                request.state.user_id = UserId.model_validate_json(
-                    json_data=current_user.access_token.get("sub", "")
-                ).user_id
-                request.state.jti = refresh_token_jti
-                logger.info("Current user extracted: user_id %s, jti %s", request.state.user_id, request.state.jti)
-
-            except AuthenticationError as e:
-                logger.exception("Failed to authenticate user", exc_info=e)
-                return self.handle_error(exc=InternalServerError())
-
-        return await call_next(request)
+            error = await self.authenticate(scope, path)
+            if error:
+                await self.handle_error(exc=error)(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    async def authenticate(
+        self, scope: Scope, path: str
+    ) -> AuthJWTError | PermissionDeniedError | InternalServerError | None:
+        """Check tokens and permissions, then store the caller in the request state."""
+        try:
+            current_user = await self.auth_service.authenticate(Request(scope))
+        except AuthenticationError as e:
+            logger.info("Authentication failed: %s", e)
+            return AuthJWTError()
+
+        refresh_token = current_user.refresh_token
+        if await self.check_blacklist(refresh_token):
+            return AuthJWTError()
+
+        try:
+            user_id = UserId.model_validate_json(json_data=current_user.access_token.get("sub", "")).user_id
+        except ValueError as e:
+            logger.exception("Malformed token subject", exc_info=e)
+            return InternalServerError()
+
+        if await self.check_generation(str(user_id), refresh_token):
+            return AuthJWTError()
+
+        if self.permission_checker.permissions_enabled:
+            access_token = current_user.access_token
+            user_perms = access_token.get("permissions", [])
+            if not self.permission_checker.has_permission(user_perms, path, jti=access_token.get("jti")):
+                return PermissionDeniedError()
+
+        state = scope.setdefault("state", {})
+        state["user_id"] = user_id
+        state["jti"] = refresh_token.get("jti", "")
+        state["jti_exp"] = refresh_token.get("exp", 0)
+        return None
 
     @staticmethod
     def handle_error(exc: AuthJWTError | PermissionDeniedError | InternalServerError | BlacklistError) -> JSONResponse:
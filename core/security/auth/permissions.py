@@ -1,28 +1,82 @@
+from typing import Any
+
+from collections import OrderedDict
+from collections.abc import Iterable
 from enum import IntEnum
 
 from core.logging.logger import CoreLogger
 
 logger = CoreLogger.get_logger("permissions")
 
+_GRANTED = ""
+
 
 class PermissionsCheck(IntEnum):
     ENABLED = 1
     DISABLED = 0
 
 
+class PermissionTrie:
+    """Permission prefixes as a character trie; a path matches if any permission is its prefix."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, permissions: Iterable[str]) -> None:
+        self._root: dict[str, Any] = {}
+        for permission in permissions:
+            node = self._root
+            for char in permission:
+                node = node.setdefault(char, {})
+            node[_GRANTED] = True
+
+    def matches(self, path: str) -> bool:
+        node = self._root
+        if _GRANTED in node:
+            return True
+        for char in path:
+            node = node.get(char)  # type: ignore[assignment]
+            if node is None:
+                return False
+            if _GRANTED in node:
+                return True
+        return False
+
+
 class PermissionChecker:
-    """Class for checking permissions."""
+    """
+    Class for checking permissions.
 
-    __slots__ = ("exempt_endpoints", "permissions_enabled")
+    Token permissions are compiled into a `PermissionTrie` once per token id and kept in a
+    bounded LRU cache, so a check walks the path once whatever the number of permissions.
+    """
 
-    def __init__(self, exempt_endpoints: list[str], permissions_check: PermissionsCheck = PermissionsCheck.DISABLED):
-        self.exempt_endpoints = exempt_endpoints
+    __slots__ = ("_tries", "cache_size", "exempt_endpoints", "permissions_enabled")
+
+    def __init__(
+        self,
+        exempt_endpoints: list[str],
+        permissions_check: PermissionsCheck = PermissionsCheck.DISABLED,
+        cache_size: int = 10_000,
+    ):
+        self.exempt_endpoints = frozenset(exempt_endpoints)
         self.permissions_enabled = permissions_check
+        self.cache_size = cache_size
+        self._tries: OrderedDict[str, PermissionTrie] = OrderedDict()
 
     def is_exempt(self, path: str) -> bool:
-        logger.info("Checking path %s in exempt list %s", path, self.exempt_endpoints)
         return path in self.exempt_endpoints
 
-    @staticmethod
-    def has_permission(user_permissions: list[str], path: str) -> bool:
-        return any(path.startswith(permission) for permission in user_permissions)
+    def _trie(self, jti: str, user_permissions: list[str]) -> PermissionTrie:
+        trie = self._tries.get(jti)
+        if trie is not None:
+            self._tries.move_to_end(jti)
+            return trie
+        trie = self._tries[jti] = PermissionTrie(user_permissions)
+        if len(self._tries) > self.cache_size:
+            self._tries.popitem(last=False)
+        return trie
+
+    def has_permission(self, user_permissions: list[str], path: str, jti: str | None = None) -> bool:
+        """Whether a permission is a prefix of `path`; with the token `jti` the trie is cached."""
+        trie = self._trie(jti, user_permissions) if jti else PermissionTrie(user_permissions)
+        return trie.matches(path)
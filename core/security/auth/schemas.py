@@ -14,3 +14,13 @@ class UserId(BaseModel):
 class UserTokenGenData(BaseModel):
     access_token: dict[str, Any] = Field(..., description="Access token")
     refresh_token: dict[str, Any] = Field(..., description="Refresh token")
+
+
+class RevokedToken(BaseModel):
+    jti: str = Field(..., min_length=1, description="Revoked token id")
+    exp: float = Field(..., description="Token expiry, unix time")
+
+
+class UserGeneration(BaseModel):
+    user_id: str = Field(..., min_length=1, description="User whose sessions were revoked")
+    generation: int = Field(..., ge=0, description="Tokens issued with a lower generation are revoked")
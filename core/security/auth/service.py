@@ -1,42 +1,75 @@
+from typing import Any
+
 from functools import lru_cache
 
 from async_fastapi_jwt_auth import AuthJWT
-from fastapi import HTTPException, Request, status
+from fastapi import Request
 
 from core.logging.logger import CoreLogger
+from core.security.auth.exceptions import AuthenticationError
 from core.security.auth.schemas import UserTokenGenData
 
 logger = CoreLogger.get_logger("auth_service")
 
 
 class AuthService:
-    def __init__(self, request: Request):
-        self.authjwt = AuthJWT(request)
+    """Validates the access and refresh tokens of a request."""
+
+    __slots__ = ()
+
+    @staticmethod
+    async def _decode(authjwt: AuthJWT, token: str | None, token_type: str) -> dict[str, Any]:
+        if not token:
+            raise AuthenticationError(f"Missing {token_type} token")
+        claims = await authjwt.get_raw_jwt(token)
+        if not claims or claims.get("type") != token_type:
+            raise AuthenticationError(f"Only {token_type} tokens are allowed")
+        return claims
 
     @staticmethod
-    def _handle_error(
-        status_code: int = status.HTTP_422_UNPROCESSABLE_ENTITY, detail: str = "Session expired. Login again."
-    ) -> None:
-        raise HTTPException(status_code=status_code, detail=detail)
+    def _needs_full_checks(authjwt: AuthJWT) -> bool:
+        """Header tokens, CSRF, issuer and denylist checks are left to `AuthJWT` itself."""
+        return bool(
+            authjwt.jwt_in_headers
+            or authjwt._cookie_csrf_protect  # noqa: SLF001
+            or authjwt._decode_issuer  # noqa: SLF001
+            or authjwt._denylist_enabled  # noqa: SLF001
+        )
+
+    async def authenticate(self, request: Request) -> UserTokenGenData:
+        """
+        Verify both tokens and return their claims; raise AuthenticationError if either is invalid.
 
-    async def authenticate(self) -> UserTokenGenData | None:  # type: ignore[return]
+        With cookie-only tokens and no CSRF check each token is decoded exactly once.
+        Other configurations go through the full `AuthJWT` request checks.
+        """
+        authjwt = AuthJWT(request)
         try:
-            await self.authjwt.jwt_required()
-            access_token = await self.authjwt.get_raw_jwt()
-            if not access_token:
-                self._handle_error(
-                    status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials."
+            if self._needs_full_checks(authjwt):
+                await authjwt.jwt_required()
+                access_token = await authjwt.get_raw_jwt()
+                await authjwt.jwt_refresh_token_required()
+                refresh_token = await authjwt.get_raw_jwt()
+            else:
+                access_token = await self._decode(
+                    authjwt,
+                    request.cookies.get(authjwt._access_cookie_key),  # noqa: SLF001
+                    "access",
+                )
+                refresh_token = await self._decode(
+                    authjwt,
+                    request.cookies.get(authjwt._refresh_cookie_key),  # noqa: SLF001
+                    "refresh",
                 )
-            await self.authjwt.jwt_refresh_token_required()
-            refresh_token = await self.authjwt.get_raw_jwt()
-            if not refresh_token:
-                self._handle_error()
-            return UserTokenGenData(access_token=access_token, refresh_token=refresh_token)
+        except AuthenticationError:
+            raise
         except Exception as e:
-            logger.exception("Auth error: %s", exc_info=e)
-            self._handle_error()
+            raise AuthenticationError("Invalid token", original_exception=e) from e
+        if not access_token or not refresh_token:
+            raise AuthenticationError("Invalid authentication credentials")
+        return UserTokenGenData(access_token=access_token, refresh_token=refresh_token)
 
 
 @lru_cache
-def get_auth_service(request: Request) -> AuthService:
-    return AuthService(request)
+def get_auth_service() -> AuthService:
+    return AuthService()
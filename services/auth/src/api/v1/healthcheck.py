@@ -1,9 +1,16 @@
-from fastapi import APIRouter, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
 from starlette.responses import JSONResponse
 
+from services import get_password_hasher
+from services.password import PasswordHasher
+
 router = APIRouter()
 
 
 @router.get("/check")
-async def health_check() -> JSONResponse:
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "OK"})
+async def health_check(hasher: Annotated[PasswordHasher, Depends(get_password_hasher)]) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content={"status": "OK", "password_hasher": hasher.stats().model_dump()}
+    )
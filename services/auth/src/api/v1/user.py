@@ -20,5 +20,16 @@ async def login(data_in: UserAuth, service: Annotated[UserService, Depends(get_u
 
 @router.post("/logout", summary="Logout", description="Logout user", status_code=status.HTTP_200_OK)
 async def logout(request: Request, service: Annotated[UserService, Depends(get_user_service)]) -> UserLogoutResponse:
-    jti = request.state.jti
-    return await service.logout(jti=jti)
+    return await service.logout(jti=request.state.jti, exp=request.state.jti_exp)
+
+
+@router.post(
+    "/logout/all",
+    summary="Logout everywhere",
+    description="Revoke all sessions of the user",
+    status_code=status.HTTP_200_OK,
+)
+async def logout_all(
+    request: Request, service: Annotated[UserService, Depends(get_user_service)]
+) -> UserLogoutResponse:
+    return await service.logout_all(user_id=request.state.user_id)
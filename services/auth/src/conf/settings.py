@@ -1,3 +1,5 @@
+import os
+
 from async_fastapi_jwt_auth import AuthJWT
 from dotenv import find_dotenv, load_dotenv
 from pydantic import Field
@@ -31,6 +33,9 @@ class ApiSettings(DefaultSettings):
     openapi_url: str = Field(...)
     version: str = Field(...)
     blacklist: str = Field(...)
+    blacklist_file: str | None = Field(default=None, description="File of extra blocked networks, reloaded live")
+    blacklist_redis_key: str | None = Field(default=None, description="Redis set of extra blocked networks")
+    blacklist_reload_interval: float = Field(default=30.0, description="Seconds between blacklist reloads")
 
     model_config = SettingsConfigDict(env_prefix="API_")
 
@@ -45,13 +50,24 @@ class PGSettings(DefaultSettings):
     dsn_local: str = Field(...)
     async_schema: str = Field(...)
     dsn_pg: str = Field(...)
-    echo_sql_queries: bool = True
+    echo_sql_queries: bool = False
+    pool_size: int = Field(default=10, description="Connections kept open per worker")
+    max_overflow: int = Field(default=20, description="Extra connections allowed under load")
+    pool_recycle: int = Field(default=1800, description="Seconds after which a connection is replaced")
+    pool_pre_ping: bool = Field(default=True, description="Check connections before handing them out")
+    statement_cache_size: int = Field(default=100, description="asyncpg prepared statement cache size")
 
     model_config = SettingsConfigDict(env_prefix="POSTGRES_")
 
 
 class Auth(DefaultSettings):
     max_age: int = Field(default=60 * 5, description="Max age of tokens in seconds")
+    blacklist_cache_size: int = Field(default=100_000, description="Token ids cached per process")
+    blacklist_negative_ttl: float = Field(default=5.0, description="Seconds a not-revoked token stays cached")
+    hash_workers: int = Field(default_factory=lambda: os.cpu_count() or 1, description="Parallel password hashes")
+    hash_queue_size: int = Field(default=64, description="Password hashes allowed to wait for a worker")
+    argon2_time_cost: int = Field(default=3, description="argon2id iterations")
+    argon2_memory_cost: int = Field(default=64 * 1024, description="argon2id memory in KiB")
 
     model_config = SettingsConfigDict(env_prefix="AUTH_")
 
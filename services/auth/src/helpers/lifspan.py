@@ -5,19 +5,26 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from core.database.repository.redis import RedisConfig, RedisPoolConfig
+from core.database.postgres import PostgresEngine
+from core.database.repository.redis import RedisConfig, RedisPoolConfig, get_redis_client
 from core.logging.logger import CoreLogger
 
 logger = CoreLogger.get_logger("lifespan")
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
     from conf.settings import settings
+    from repositories import get_pg_config
+    from services import get_password_hasher
 
     try:
-        await RedisPoolConfig.ensure_pool(RedisConfig(dsn=settings.redis.dsn, password=settings.redis.password))
+        await PostgresEngine.ensure_engine(get_pg_config())
+        redis_config = RedisConfig(dsn=settings.redis.dsn, password=settings.redis.password)
+        app.state.redis = await get_redis_client(redis_config)
         logger.info("Connected to Redis!")
         yield
     finally:
         await RedisPoolConfig.close_pool()
+        await PostgresEngine.dispose()
+        get_password_hasher().shutdown()
@@ -9,7 +9,7 @@ from conf.exceptions import register_exception_handlers
 from conf.settings import settings
 from core.database.repository.redis import RedisConfig
 from core.logging import CoreLogger
-from core.security import setup_auth_middleware
+from core.security import BlacklistCacheConfig, IPBlacklistSource, setup_auth_middleware
 from helpers.lifspan import lifespan
 
 CoreLogger.setup()
@@ -31,6 +31,14 @@ setup_auth_middleware(
     exempt_endpoints=EXEMPT_ENDPOINTS,
     blacklist=BLACKLIST,
     redis_config=RedisConfig(dsn=settings.redis.dsn, password=settings.redis.password),
+    blacklist_cache=BlacklistCacheConfig(
+        max_size=settings.auth.blacklist_cache_size, negative_ttl=settings.auth.blacklist_negative_ttl
+    ),
+    blacklist_source=IPBlacklistSource(
+        file=settings.api.blacklist_file or None,
+        redis_key=settings.api.blacklist_redis_key or None,
+        reload_interval=settings.api.blacklist_reload_interval,
+    ),
 )
 register_exception_handlers(app=app)
 setup_routers(app=app)
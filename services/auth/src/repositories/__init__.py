@@ -7,14 +7,26 @@ from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from conf.settings import settings
-from core.database.postgres import get_session
+from core.database.postgres import PostgresConfig, get_session
 from core.database.repository.redis import RedisRepository
 from repositories.user import UserRepository
 
 
+def get_pg_config() -> PostgresConfig:
+    return PostgresConfig(
+        dsn=settings.pg.dsn,
+        echo=settings.pg.echo_sql_queries,
+        pool_size=settings.pg.pool_size,
+        max_overflow=settings.pg.max_overflow,
+        pool_recycle=settings.pg.pool_recycle,
+        pool_pre_ping=settings.pg.pool_pre_ping,
+        statement_cache_size=settings.pg.statement_cache_size,
+    )
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, Any]:
     """Provide unit of work for async database operations."""
-    async for session in get_session(dsn=settings.pg.dsn):
+    async for session in get_session(config=get_pg_config()):
         yield session
 
 
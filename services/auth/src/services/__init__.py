@@ -4,16 +4,33 @@ from functools import lru_cache
 
 from async_fastapi_jwt_auth import AuthJWT
 from fastapi import Depends
+from passlib.context import CryptContext
 
+from conf.settings import settings
 from core.database.repository.redis import RedisRepository
 from repositories import UserRepository, get_redis_repo, get_user_repo
+from services.password import PasswordHasher
 from services.user import UserService
 
 
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    """New hashes use argon2id; bcrypt hashes still verify and are replaced on the next login."""
+    context = CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=settings.auth.argon2_time_cost,
+        argon2__memory_cost=settings.auth.argon2_memory_cost,
+    )
+    return PasswordHasher(context, max_concurrency=settings.auth.hash_workers, max_queue=settings.auth.hash_queue_size)
+
+
 @lru_cache
 def get_user_service(
     user_repo: Annotated[UserRepository, Depends(get_user_repo)],
     authjwt: Annotated[AuthJWT, Depends()],
     redis_repo: Annotated[RedisRepository, Depends(get_redis_repo)],
+    hasher: Annotated[PasswordHasher, Depends(get_password_hasher)],
 ) -> UserService:
-    return UserService(user_repo=user_repo, authjwt=authjwt, redis_repo=redis_repo)
+    return UserService(user_repo=user_repo, authjwt=authjwt, redis_repo=redis_repo, hasher=hasher)
@@ -0,0 +1,98 @@
+from typing import ParamSpec, TypeVar
+
+from asyncio import Semaphore, get_running_loop
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fastapi import status
+from passlib.context import CryptContext
+from pydantic import BaseModel
+
+from core.logging.logger import CoreLogger
+from helpers.raise_error import raise_error
+
+logger = CoreLogger.get_logger("password_hasher")
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class PasswordHasherStats(BaseModel):
+    max_concurrency: int
+    max_queue: int
+    running: int
+    waiting: int
+    completed: int
+    rejected: int
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords in a thread pool instead of on the event loop.
+
+    bcrypt and argon2 release the GIL while hashing, so the pool uses every core. At most
+    `max_concurrency` jobs run at once and `max_queue` more may wait; further calls get a 503.
+    """
+
+    __slots__ = (
+        "_completed",
+        "_context",
+        "_executor",
+        "_rejected",
+        "_running",
+        "_semaphore",
+        "_waiting",
+        "max_concurrency",
+        "max_queue",
+    )
+
+    def __init__(self, context: CryptContext, max_concurrency: int, max_queue: int) -> None:
+        self._context = context
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="password")
+        self._semaphore = Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._running = 0
+        self._waiting = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def _run(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self._rejected += 1
+            logger.warning("Password hashing queue is full (%s waiting)", self._waiting)
+            raise_error(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many login attempts, retry later")
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        try:
+            return await get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Check `password`; also return a new hash when the stored one uses outdated settings."""
+        return await self._run(self._context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> PasswordHasherStats:
+        return PasswordHasherStats(
+            max_concurrency=self.max_concurrency,
+            max_queue=self.max_queue,
+            running=self._running,
+            waiting=self._waiting,
+            completed=self._completed,
+            rejected=self._rejected,
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
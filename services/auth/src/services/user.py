@@ -1,36 +1,48 @@
+import time
+
 from datetime import timedelta
+from uuid import UUID
 
 from async_fastapi_jwt_auth import AuthJWT
 from fastapi import status
 
 from conf.settings import settings
 from core.database.repository.redis import RedisRepository, TokenData, TokenKey
+from core.security import GENERATION_CLAIM, get_generation, publish_revocation, revoke_all_sessions
+from core.security.auth.schemas import RevokedToken
 from helpers.raise_error import raise_error
 from models.user import User
 from repositories.user import UserRepository
 from schemas.user import UserAuth, UserCreate, UserLogoutResponse, UserResponse, UserTokenGen
+from services.password import PasswordHasher
 
 
 class UserService:
     """User service class."""
 
-    __slots__ = ("_redis_repo", "_user_repo", "authjwt")
+    __slots__ = ("_hasher", "_redis_repo", "_user_repo", "authjwt")
 
-    def __init__(self, user_repo: UserRepository, authjwt: AuthJWT, redis_repo: RedisRepository):
+    def __init__(
+        self, user_repo: UserRepository, authjwt: AuthJWT, redis_repo: RedisRepository, hasher: PasswordHasher
+    ):
         self._user_repo = user_repo
         self.authjwt = authjwt
         self._redis_repo = redis_repo
+        self._hasher = hasher
 
     async def _set_cookies(self, sbj: UserTokenGen) -> None:
-        access_token = await self.authjwt.create_access_token(subject=sbj.model_dump_json(), fresh=True)
-        refresh_token = await self.authjwt.create_refresh_token(subject=sbj.model_dump_json())
+        claims = {GENERATION_CLAIM: await get_generation(self._redis_repo, str(sbj.user_id))}
+        access_token = await self.authjwt.create_access_token(
+            subject=sbj.model_dump_json(), fresh=True, user_claims=claims
+        )
+        refresh_token = await self.authjwt.create_refresh_token(subject=sbj.model_dump_json(), user_claims=claims)
         await self.authjwt.set_access_cookies(access_token)
         await self.authjwt.set_refresh_cookies(refresh_token)
 
     async def signup(self, user_data: UserCreate) -> UserResponse:
         if await self._user_repo.get_by_username(user_data.username):
             raise_error(status_code=status.HTTP_409_CONFLICT, detail="Username already registered")
-        user = User(**user_data.model_dump(by_alias=True))
+        user = User(username=user_data.username, hashed_password=await self._hasher.hash(user_data.password))
         user = await self._user_repo.upsert(user)
         sbj = UserTokenGen(user_id=user.id)
         await self._set_cookies(sbj)
@@ -38,15 +50,28 @@ class UserService:
 
     async def login(self, user_data: UserAuth) -> UserResponse | None:
         user = await self._user_repo.get_by_username(user_data.username)
-        if not user or not user_data.verify_password(user.hashed_password):
+        verified, new_hash = (
+            await self._hasher.verify(user_data.password, user.hashed_password) if user else (False, None)
+        )
+        if not user or not verified:
             raise_error(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
+        if new_hash:
+            user.hashed_password = new_hash
+            await self._user_repo.upsert(user)
         sbj = UserTokenGen(user_id=user.id)
         await self._set_cookies(sbj)
         return UserResponse.model_validate(user)
 
-    async def logout(self, jti: str) -> UserLogoutResponse:
-        token_key = TokenKey(jti=jti).key
-        await self._redis_repo.set(TokenData(key=token_key, expires=timedelta(seconds=settings.auth.max_age)))
-        await self._redis_repo.get_all()
+    async def logout(self, jti: str, exp: float) -> UserLogoutResponse:
+        """Blacklist the refresh token until it expires and tell every service about it."""
+        expires = timedelta(seconds=max(exp - time.time(), settings.auth.max_age))
+        await self._redis_repo.set(TokenData(key=TokenKey(jti=jti).key, expires=expires))
+        await publish_revocation(self._redis_repo, RevokedToken(jti=jti, exp=time.time() + expires.total_seconds()))
         await self.authjwt.unset_jwt_cookies()
         return UserLogoutResponse()
+
+    async def logout_all(self, user_id: UUID) -> UserLogoutResponse:
+        """Revoke every session of the user at once by bumping their token generation."""
+        await revoke_all_sessions(self._redis_repo, str(user_id))
+        await self.authjwt.unset_jwt_cookies()
+        return UserLogoutResponse(detail="Successfully logged out of all sessions")
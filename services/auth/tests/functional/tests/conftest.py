@@ -17,6 +17,8 @@ fake = Faker()
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, Any, None]:
     with TestClient(app) as test_client:
+        # Connected by the lifespan; `mock_redis_repo` swaps it for a mock in every test.
+        test_client.app.state.live_redis = test_client.app.state.redis
         yield test_client
 
 
@@ -33,3 +35,10 @@ def mock_redis_repo(client, mocker):  # type: ignore[no-untyped-def]
     mock = AsyncMock()
     client.app.state.redis = mock
     return mock
+
+
+@pytest.fixture
+def live_redis(client, mock_redis_repo):  # type: ignore[no-untyped-def]
+    """Put back the Redis the auth middleware reads too, for flows both sides must agree on."""
+    client.app.state.redis = client.app.state.live_redis
+    return client.app.state.redis
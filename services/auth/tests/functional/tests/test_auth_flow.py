@@ -1,9 +1,18 @@
-from unittest.mock import Mock
+import asyncio
+import time
+
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
 from fastapi.testclient import TestClient
 
+from core.security.auth.blacklist import BlacklistCache, BlacklistCacheConfig
+from core.security.auth.ip_checker import IPBlacklistSource, IPChecker, NetworkConfig, watch_blacklist
+from core.security.auth.permissions import PermissionChecker, PermissionsCheck
+from core.security.auth.schemas import RevokedToken
+
 
 @pytest.mark.asyncio
 async def test_flow(client: TestClient, mocker, random_user_data, mock_redis_repo) -> None:  # type: ignore[no-untyped-def]
@@ -36,3 +45,105 @@ async def test_flow(client: TestClient, mocker, random_user_data, mock_redis_rep
 
     assert not logout_response_login.cookies.get("access_token_cookie"), "Access token not cleared"
     assert not logout_response_login.cookies.get("refresh_token_cookie"), "Refresh token not cleared"
+
+
+@pytest.mark.asyncio
+async def test_login_rejects_wrong_password(client: TestClient, mocker, random_user_data) -> None:  # type: ignore[no-untyped-def]
+    mock_client = Mock()
+    mock_client.host = "127.0.0.4"
+    mocker.patch("starlette.requests.Request.client", new_callable=lambda: mock_client)
+
+    assert client.post("/api/v1/user/signup", json=random_user_data).is_success, "Signup failed"
+    wrong_password = {**random_user_data, "hashed_password": random_user_data["hashed_password"] + "x"}
+    login_response = client.post("/api/v1/user/login", json=wrong_password)
+    assert login_response.status_code == 401, "Login succeeded with a wrong password"
+
+    stats = client.get("/api/v1/check").json().get("password_hasher")
+    assert stats and stats["completed"] >= 2, "Password hashing stats not reported"
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_issued_tokens(client: TestClient, mocker, random_user_data, live_redis) -> None:  # type: ignore[no-untyped-def]
+    mock_client = Mock()
+    mock_client.host = "127.0.0.4"
+    mocker.patch("starlette.requests.Request.client", new_callable=lambda: mock_client)
+
+    assert client.post("/api/v1/user/signup", json=random_user_data).is_success, "Signup failed"
+    login_response = client.post("/api/v1/user/login", json=random_user_data)
+    cookies = {name: login_response.cookies.get(name) for name in ("access_token_cookie", "refresh_token_cookie")}
+
+    for name, value in cookies.items():
+        client.cookies.set(name, value)
+    assert client.post("/api/v1/user/logout/all").is_success, "Logout from all sessions failed"
+
+    # The new generation reaches the middleware through pub/sub, within the negative TTL at worst.
+    deadline = time.monotonic() + 10
+    while True:
+        for name, value in cookies.items():
+            client.cookies.set(name, value)
+        status_code = client.post("/api/v1/user/logout/all").status_code
+        if status_code == 401 or time.monotonic() > deadline:
+            break
+        time.sleep(0.2)
+    assert status_code == 401, "Revoked tokens were accepted"
+
+
+@pytest.mark.asyncio
+async def test_blacklist_cache_answers_repeated_checks_in_process() -> None:
+    redis = AsyncMock()
+    redis.exists.return_value = False
+    cache = BlacklistCache(BlacklistCacheConfig(negative_ttl=60))
+    exp = time.time() + 300
+
+    assert not await cache.is_revoked(redis, "cached-jti", exp), "Token reported revoked"
+    assert not await cache.is_revoked(redis, "cached-jti", exp), "Token reported revoked"
+    redis.exists.assert_awaited_once()
+
+    # A published revocation overrides the cached "not revoked" answer without asking Redis.
+    cache.revoke(RevokedToken(jti="cached-jti", exp=exp))
+    assert await cache.is_revoked(redis, "cached-jti", exp), "Revocation not applied"
+    redis.exists.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ip_blacklist_matches_networks_and_reloads_from_file(tmp_path: Path) -> None:
+    checker = IPChecker(NetworkConfig(blacklist=["10.0.0.0/8", "2001:db8::/32"]))
+    assert checker.is_blocked("10.1.2.3"), "Address in a listed IPv4 network allowed"
+    assert checker.is_blocked("::ffff:10.1.2.3"), "IPv4-mapped address in a listed network allowed"
+    assert checker.is_blocked("2001:db8::1"), "Address in a listed IPv6 network allowed"
+    assert not checker.is_blocked("11.0.0.1"), "Address outside the listed networks blocked"
+    assert not checker.is_blocked("not-an-ip"), "Malformed address blocked"
+
+    feed = tmp_path / "blacklist.txt"
+    feed.write_text("192.0.2.0/24  # threat feed\nnot-a-network\n")
+    source = IPBlacklistSource(file=feed, reload_interval=0.05)
+    watcher = asyncio.create_task(watch_blacklist(checker, source, AsyncMock()))
+    try:
+        await asyncio.sleep(0.1)
+        assert checker.is_blocked("192.0.2.7"), "Network from the file not loaded"
+        assert checker.is_blocked("10.1.2.3"), "Static networks dropped on reload"
+
+        feed.write_bytes(b"\xff\xfe198.51.100.0/24\n")
+        await asyncio.sleep(0.1)
+        assert not watcher.done(), "Watcher stopped on a file that is not UTF-8"
+        assert checker.is_blocked("192.0.2.7"), "Networks dropped on a failed reload"
+
+        feed.write_text("")
+        await asyncio.sleep(0.1)
+        assert not checker.is_blocked("192.0.2.7"), "Network removed from the file still blocked"
+    finally:
+        watcher.cancel()
+
+
+def test_permission_checker_matches_path_prefixes() -> None:
+    checker = PermissionChecker(["/user/login", "/user/signup"], PermissionsCheck.ENABLED, cache_size=1)
+    assert checker.is_exempt("/user/login"), "Exempt endpoint not recognised"
+    assert not checker.is_exempt("/user/login/extra"), "Exempt endpoints matched as prefixes"
+
+    permissions = ["/files/download", "/files/upload"]
+    assert checker.has_permission(permissions, "/files/download/report.pdf", "jti-1"), "Prefix not granted"
+    assert checker.has_permission(permissions, "/files/upload", "jti-1"), "Exact permission not granted"
+    assert not checker.has_permission(permissions, "/files/delete", "jti-1"), "Unlisted path granted"
+    assert not checker.has_permission(permissions, "/files/down", "jti-1"), "Partial permission granted"
+    assert not checker.has_permission([], "/files/download", "jti-2"), "Path granted without permissions"
+    assert checker.has_permission([""], "/anything"), "Empty permission does not grant every path"
@@ -1,11 +1,25 @@
 from typing import Annotated
 
+from urllib.parse import quote
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request, UploadFile, status
-from starlette.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, Path, Query, Request, UploadFile, status
+from starlette.responses import FileResponse as LocalFileResponse
+from starlette.responses import Response, StreamingResponse
 
-from schemas.file import FileCreateData, FileResponse, FileVersionResponse, ListUserFilesResponse, ServiceStatusResponse
+from schemas.file import (
+    DownloadConditions,
+    FileCreateData,
+    FileResponse,
+    FileVersionResponse,
+    ListUserFilesResponse,
+    ResumableUploadStatus,
+    ServiceStatusResponse,
+    UploadCompleteData,
+    UploadedChunk,
+    UploadInitData,
+    UploadInitResponse,
+)
 from services import FileServiceProtocol, get_file_service
 
 router = APIRouter(prefix="/files", tags=["files"])
@@ -20,10 +34,13 @@ async def ping_status(file_service: Annotated[FileServiceProtocol, Depends(get_f
 
 @router.get("/", status_code=status.HTTP_200_OK, summary="Get list of files", description="Get list of files")
 async def get_files(
-    request: Request, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
+    request: Request,
+    file_service: Annotated[FileServiceProtocol, Depends(get_file_service)],
+    cursor: str | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
 ) -> ListUserFilesResponse:
     user_id = request.state.user_id
-    return await file_service.list_files(user_id=user_id)
+    return await file_service.list_files(user_id=user_id, cursor=cursor, limit=limit)
 
 
 @router.post("/upload", status_code=status.HTTP_200_OK, summary="Upload file", description="Upload file")
@@ -33,12 +50,148 @@ async def upload_file(
     return await file_service.upload(file=file, data=data)
 
 
+@router.post(
+    "/uploads",
+    status_code=status.HTTP_201_CREATED,
+    summary="Start direct upload",
+    description="Get presigned URLs to upload content straight to storage",
+)
+async def initiate_upload(
+    request: Request, data: UploadInitData, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
+) -> UploadInitResponse:
+    return await file_service.initiate_upload(user_id=request.state.user_id, data=data)
+
+
+@router.post(
+    "/uploads/{upload_id}/complete",
+    status_code=status.HTTP_200_OK,
+    summary="Finalize direct upload",
+    description="Verify uploaded content and create a file version",
+)
+async def complete_upload(
+    request: Request,
+    upload_id: UUID,
+    data: UploadCompleteData,
+    file_service: Annotated[FileServiceProtocol, Depends(get_file_service)],
+) -> FileResponse:
+    return await file_service.complete_upload(user_id=request.state.user_id, upload_id=upload_id, data=data)
+
+
+@router.post(
+    "/resumable",
+    status_code=status.HTTP_201_CREATED,
+    summary="Start resumable upload",
+    description="Open an upload that takes numbered chunks in any order",
+)
+async def create_resumable_upload(
+    request: Request, data: UploadInitData, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
+) -> ResumableUploadStatus:
+    return await file_service.create_resumable_upload(user_id=request.state.user_id, data=data)
+
+
+@router.get(
+    "/resumable/{upload_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Get resumable upload status",
+    description="List received and missing chunks",
+)
+async def get_resumable_upload(
+    request: Request, upload_id: UUID, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
+) -> ResumableUploadStatus:
+    return await file_service.get_resumable_upload(user_id=request.state.user_id, upload_id=upload_id)
+
+
+@router.put(
+    "/resumable/{upload_id}/parts/{part_number}",
+    status_code=status.HTTP_200_OK,
+    summary="Upload chunk",
+    description="Upload one chunk of a resumable upload, the request body is the raw chunk",
+)
+async def upload_chunk(
+    request: Request,
+    upload_id: UUID,
+    part_number: Annotated[int, Path(ge=1)],
+    file_service: Annotated[FileServiceProtocol, Depends(get_file_service)],
+) -> UploadedChunk:
+    return await file_service.upload_chunk(
+        user_id=request.state.user_id, upload_id=upload_id, part_number=part_number, content=request.stream()
+    )
+
+
+@router.post(
+    "/resumable/{upload_id}/commit",
+    status_code=status.HTTP_200_OK,
+    summary="Commit resumable upload",
+    description="Verify received chunks and create a file version",
+)
+async def commit_resumable_upload(
+    request: Request, upload_id: UUID, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
+) -> FileResponse:
+    return await file_service.commit_resumable_upload(user_id=request.state.user_id, upload_id=upload_id)
+
+
 @router.get("/download/", status_code=status.HTTP_200_OK, summary="Download file", description="Download file")
 async def download_file(
-    path: str | UUID, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
-) -> JSONResponse:
-    await file_service.download(path=path)
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "OK"})
+    path: str | UUID,
+    file_service: Annotated[FileServiceProtocol, Depends(get_file_service)],
+    range_header: Annotated[str | None, Header(alias="Range")] = None,
+    if_match: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
+    if_range: Annotated[str | None, Header()] = None,
+) -> Response:
+    conditions = DownloadConditions(
+        if_match=if_match, if_none_match=if_none_match, if_modified_since=if_modified_since, if_range=if_range
+    )
+    download = await file_service.download(path=path, range_header=range_header, conditions=conditions)
+    headers = {
+        **download.validators,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(download.filename)}",
+    }
+    if download.redirect:
+        # nginx streams the object from storage itself, this worker is done once headers are sent.
+        headers["X-Accel-Redirect"] = download.redirect
+        return Response(headers=headers, media_type="application/octet-stream")
+    if download.content is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=download.validators)
+    if download.local_path:
+        # Starlette answers ranges itself and hands the file to servers supporting `pathsend`.
+        return LocalFileResponse(
+            download.local_path,
+            headers=download.validators,
+            filename=download.filename,
+            media_type="application/octet-stream",
+        )
+    headers["Content-Length"] = str(download.content_length)
+    if download.byte_range:
+        headers["Content-Range"] = download.byte_range.content_range(download.size)
+    return StreamingResponse(
+        download.content,
+        status_code=status.HTTP_206_PARTIAL_CONTENT if download.byte_range else status.HTTP_200_OK,
+        headers=headers,
+        media_type="application/octet-stream",
+    )
+
+
+@router.get(
+    "/archive/",
+    status_code=status.HTTP_200_OK,
+    summary="Download files as ZIP",
+    description="Stream a ZIP archive of the files under a path, or of the given file versions",
+)
+async def download_archive(
+    request: Request,
+    file_service: Annotated[FileServiceProtocol, Depends(get_file_service)],
+    path: str | None = None,
+    ids: Annotated[list[UUID] | None, Query()] = None,
+) -> StreamingResponse:
+    archive = await file_service.archive(user_id=request.state.user_id, path=path, ids=ids)
+    return StreamingResponse(
+        archive.content,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(archive.filename)}"},
+        media_type="application/zip",
+    )
 
 
 @router.get(
@@ -48,3 +201,13 @@ async def get_file_revisions(
     path: str, limit: int, file_service: Annotated[FileServiceProtocol, Depends(get_file_service)]
 ) -> list[FileVersionResponse]:
     return await file_service.get_revisions(path=path, limit=limit)
+
+
+@router.delete("/", status_code=status.HTTP_200_OK, summary="Delete file version", description="Delete file version")
+async def delete_file(
+    request: Request,
+    path: str,
+    file_service: Annotated[FileServiceProtocol, Depends(get_file_service)],
+    version: int | None = None,
+) -> FileVersionResponse:
+    return await file_service.delete(user_id=request.state.user_id, path=path, version=version)
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
 from starlette.responses import JSONResponse
 
+from core.client.cache import CachedStorageClient
+from core.client.minio import ObjectStorageProtocol
+from repositories import get_minio_client
+
 router = APIRouter()
 
 
 @router.get("/check")
-async def health_check() -> JSONResponse:
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "OK"})
+async def health_check(storage: Annotated[ObjectStorageProtocol, Depends(get_minio_client)]) -> JSONResponse:
+    content: dict[str, object] = {"status": "OK"}
+    if isinstance(storage, CachedStorageClient):
+        content["storage_cache"] = storage.stats().model_dump()
+    return JSONResponse(status_code=status.HTTP_200_OK, content=content)
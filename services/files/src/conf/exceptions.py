@@ -53,7 +53,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 async def http_exception_handler(request: Request, exc: HTTPException) -> Response:  # noqa: ARG001
     logger.exception(msg="HTTPException", exc_info=exc)
-    return ORJSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return ORJSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
 
 
 async def bad_request_exception_handler(request: Request, exc: BadRequestError) -> Response:  # noqa: ARG001
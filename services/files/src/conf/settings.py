@@ -1,3 +1,5 @@
+from typing import Literal
+
 from async_fastapi_jwt_auth import AuthJWT
 from dotenv import find_dotenv, load_dotenv
 from pydantic import Field
@@ -31,6 +33,19 @@ class ApiSettings(DefaultSettings):
     openapi_url: str = Field(...)
     version: str = Field(...)
     blacklist: str = Field(...)
+    blacklist_file: str | None = Field(default=None, description="File of extra blocked networks, reloaded live")
+    blacklist_redis_key: str | None = Field(default=None, description="Redis set of extra blocked networks")
+    blacklist_reload_interval: float = Field(default=30.0, description="Seconds between blacklist reloads")
+    page_size: int = Field(default=100, description="Default page size of list endpoints")
+    max_page_size: int = Field(default=1000, description="Largest page size a client may request")
+    archive_max_files: int = Field(default=10_000, description="Most files put in one archive download")
+    archive_prefetch: int = Field(default=4, description="Files of an archive read ahead of the one being sent")
+    accel_redirect: str | None = Field(
+        default=None, description="Internal nginx location streaming downloads from storage, unset to stream them here"
+    )
+    accel_cache_purge_url: str | None = Field(
+        default=None, description="nginx server purging its cached copy of blobs that were removed"
+    )
 
     model_config = SettingsConfigDict(env_prefix="API_")
 
@@ -45,13 +60,20 @@ class PGSettings(DefaultSettings):
     dsn_local: str = Field(...)
     async_schema: str = Field(...)
     dsn_pg: str = Field(...)
-    echo_sql_queries: bool = True
+    echo_sql_queries: bool = False
+    pool_size: int = Field(default=10, description="Connections kept open per worker")
+    max_overflow: int = Field(default=20, description="Extra connections allowed under load")
+    pool_recycle: int = Field(default=1800, description="Seconds after which a connection is replaced")
+    pool_pre_ping: bool = Field(default=True, description="Check connections before handing them out")
+    statement_cache_size: int = Field(default=100, description="asyncpg prepared statement cache size")
 
     model_config = SettingsConfigDict(env_prefix="POSTGRES_")
 
 
 class Auth(DefaultSettings):
     max_age: int = Field(default=60 * 5, description="Max age of tokens in seconds")
+    blacklist_cache_size: int = Field(default=100_000, description="Token ids cached per process")
+    blacklist_negative_ttl: float = Field(default=5.0, description="Seconds a not-revoked token stays cached")
 
     model_config = SettingsConfigDict(env_prefix="AUTH_")
 
@@ -84,15 +106,35 @@ class RedisSettings(DefaultSettings):
     user: str = Field(...)
     password: str = Field(...)
     dsn: str = Field(...)
+    metadata_ttl: int = Field(default=300, description="Seconds file metadata stays cached")
 
     model_config = SettingsConfigDict(env_prefix="REDIS_")
 
 
 class MinioSettings(DefaultSettings):
+    backend: Literal["s3", "minio", "memory", "filesystem"] = Field(default="s3", description="Object storage backend")
+    filesystem_root: str = Field(default="/var/lib/files", description="Directory of the filesystem backend")
+    filesystem_fsync: bool = Field(default=True, description="Flush filesystem backend writes to disk")
     endpoint: str = Field(...)
     root_user: str = Field(...)
     root_password: str = Field(...)
     secure: bool = Field(...)
+    region: str = Field(default="us-east-1", description="Region requests are signed for")
+    max_connections: int = Field(default=32, description="Keep-alive connections to the storage endpoint")
+    part_size: int = Field(default=50 * 1024 * 1024, description="Multipart upload part size in bytes")
+    max_parts_in_memory: int = Field(default=2, description="Parts buffered per streaming upload")
+    upload_concurrency: int = Field(default=4, description="Parts of one object uploaded in parallel")
+    part_retries: int = Field(default=3, description="Attempts per part before an upload is aborted")
+    read_chunk_size: int = Field(default=1024 * 1024, description="Download stream chunk size in bytes")
+    read_ahead: int = Field(default=4, description="Download chunks read ahead of a slow client")
+    cache_dir: str | None = Field(default=None, description="Directory of the local object cache, off when unset")
+    cache_max_size: int = Field(
+        default=10 * 1024**3, description="Bytes the local object cache of each worker may take"
+    )
+    cache_max_object_size: int = Field(default=1024**3, description="Largest object kept in the local cache")
+    upload_expires: int = Field(default=60 * 60, description="Seconds a direct upload stays open")
+    resumable_part_size: int = Field(default=8 * 1024 * 1024, description="Chunk size of resumable uploads in bytes")
+    resumable_expires: int = Field(default=24 * 60 * 60, description="Seconds an idle resumable upload is kept")
 
     model_config = SettingsConfigDict(env_prefix="MINIO_")
 
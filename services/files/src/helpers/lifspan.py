@@ -5,19 +5,33 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from core.database.repository.redis import RedisConfig, RedisPoolConfig
+from core.client.cache import CachedStorageClient
+from core.client.s3 import S3Client
+from core.database.postgres import PostgresEngine
+from core.database.repository.redis import RedisConfig, RedisPoolConfig, get_redis_client
 from core.logging.logger import CoreLogger
 
 logger = CoreLogger.get_logger("lifespan")
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
     from conf.settings import settings
+    from repositories import get_minio_client, get_pg_config
 
     try:
-        await RedisPoolConfig.ensure_pool(RedisConfig(dsn=settings.redis.dsn, password=settings.redis.password))
+        await PostgresEngine.ensure_engine(get_pg_config())
+        redis_config = RedisConfig(dsn=settings.redis.dsn, password=settings.redis.password)
+        app.state.redis = await get_redis_client(redis_config)
         logger.info("Connected to Redis!")
+        if isinstance(cache := get_minio_client(), CachedStorageClient):
+            await cache.open()
         yield
     finally:
+        storage = get_minio_client()
+        if isinstance(storage, CachedStorageClient):
+            storage = storage.storage
+        if isinstance(storage, S3Client):
+            await storage.aclose()
         await RedisPoolConfig.close_pool()
+        await PostgresEngine.dispose()
@@ -1,6 +1,10 @@
+from typing import NoReturn
+
 from fastapi import HTTPException
 from starlette import status
 
 
-def raise_error(status_code: int = status.HTTP_200_OK, detail: str = "") -> None:
-    raise HTTPException(status_code=status_code, detail=detail)
+def raise_error(
+    status_code: int = status.HTTP_200_OK, detail: str = "", headers: dict[str, str] | None = None
+) -> NoReturn:
+    raise HTTPException(status_code=status_code, detail=detail, headers=headers)
@@ -1,3 +1,3 @@
-from models.file import Base, File, FileVersion, User
+from models.file import Base, Blob, File, FileVersion, User
 
-__all__: list[str] = ["Base", "File", "FileVersion", "User"]
+__all__: list[str] = ["Base", "Blob", "File", "FileVersion", "User"]
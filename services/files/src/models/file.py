@@ -15,7 +15,11 @@ class User(Base, TimestampMixin):
 
 class File(Base, IdMixin, TimestampMixin):
     __tablename__ = "file"
-    __table_args__ = (Index("ix_file_owner_ver", "owner_id", "version_id"), Index("ix_file_name_trgm", "name"))
+    __table_args__ = (
+        Index("ix_file_owner_ver", "owner_id", "version_id"),
+        Index("ix_file_name_trgm", "name"),
+        Index("ix_file_owner_updated", "owner_id", "updated_at", "id"),
+    )
     name: Mapped[STR_512] = mapped_column(nullable=False, index=True)
     owner_id: Mapped[UUID] = mapped_column(
         ForeignKey(column="user.external_user_id", ondelete="CASCADE"), nullable=False, index=True
@@ -23,6 +27,20 @@ class File(Base, IdMixin, TimestampMixin):
     version_id: Mapped[UUID] = mapped_column(nullable=True, index=True)
 
 
+class Blob(Base, IdMixin, TimestampMixin):
+    """Content-addressed object shared by every version with the same checksum."""
+
+    __tablename__ = "blob"
+    __table_args__ = (
+        CheckConstraint("ref_count >= 0", name="ref_count_non_negative"),
+        CheckConstraint("octet_length(checksum) = 64", name="blob_checksum_length"),
+    )
+    checksum: Mapped[STR_1024] = mapped_column(nullable=False, unique=True)
+    size: Mapped[INT_64] = mapped_column(nullable=False)
+    bucket: Mapped[STR_50] = mapped_column(nullable=False)
+    ref_count: Mapped[INT_64] = mapped_column(default=1, nullable=False)
+
+
 class FileVersion(Base, IdMixin, TimestampMixin, IsDeletedMixin):
     __tablename__ = "file_version"
     __table_args__ = (
@@ -38,6 +56,7 @@ class FileVersion(Base, IdMixin, TimestampMixin, IsDeletedMixin):
     checksum: Mapped[STR_1024] = mapped_column(nullable=False, index=True)
     path: Mapped[STR_1024] = mapped_column(nullable=False, index=True)
     bucket: Mapped[STR_50] = mapped_column(nullable=False)
+    blob_id: Mapped[UUID] = mapped_column(ForeignKey(column="blob.id", ondelete="RESTRICT"), nullable=True, index=True)
 
     @property
     def s3_uri(self) -> str:
@@ -1,36 +1,60 @@
 from typing import Annotated, Any
 
 from collections.abc import AsyncGenerator
+from datetime import timedelta
 from functools import lru_cache
+from pathlib import Path
 
 from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from conf.settings import settings
+from core.client.cache import CachedStorageClient
+from core.client.filesystem import FilesystemStorageClient
+from core.client.memory import InMemoryStorageClient
 from core.client.minio import MinioClient, ObjectStorageProtocol
-from core.database.postgres import get_session
+from core.client.s3 import S3Client
+from core.database.postgres import PostgresConfig, get_session
 from core.database.repository.minio import MinioRepository
 from core.database.repository.redis import RedisRepository
 from core.database.schemas.minio import ObjectStorageConfig
-from repositories.file import FileRepository, FileVersionRepository
+from repositories.cache import CachedFileVersionRepository
+from repositories.file import BlobRepository, FileRepository, FileVersionRepository
 from repositories.user import UserRepository
 
 __all__: list[str] = [
+    "BlobRepository",
+    "CachedFileVersionRepository",
     "FileRepository",
     "FileVersionRepository",
     "UserRepository",
+    "get_blob_repo",
     "get_db_session",
     "get_file_repo",
     "get_file_version_repo",
     "get_minio_repo",
+    "get_pg_config",
     "get_redis_repo",
     "get_user_repo",
+    "get_version_cache",
 ]
 
 
+def get_pg_config() -> PostgresConfig:
+    return PostgresConfig(
+        dsn=settings.pg.dsn,
+        echo=settings.pg.echo_sql_queries,
+        pool_size=settings.pg.pool_size,
+        max_overflow=settings.pg.max_overflow,
+        pool_recycle=settings.pg.pool_recycle,
+        pool_pre_ping=settings.pg.pool_pre_ping,
+        statement_cache_size=settings.pg.statement_cache_size,
+    )
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, Any]:
     """Provide unit of work for async database operations."""
-    async for session in get_session(dsn=settings.pg.dsn):
+    async for session in get_session(config=get_pg_config()):
         yield session
 
 
@@ -55,14 +79,52 @@ def get_file_version_repo(session: Annotated[AsyncSession, Depends(get_db_sessio
 
 
 @lru_cache
-def get_minio_client() -> MinioClient:
+def get_version_cache(
+    repo: Annotated[FileVersionRepository, Depends(get_file_version_repo)],
+    redis: Annotated[RedisRepository, Depends(get_redis_repo)],
+) -> CachedFileVersionRepository:
+    return CachedFileVersionRepository(repo=repo, redis=redis, ttl=timedelta(seconds=settings.redis.metadata_ttl))
+
+
+@lru_cache
+def get_blob_repo(session: Annotated[AsyncSession, Depends(get_db_session)]) -> BlobRepository:
+    return BlobRepository(session=session)
+
+
+@lru_cache
+def get_minio_client() -> ObjectStorageProtocol:
     config = ObjectStorageConfig(
         endpoint=settings.minio.endpoint,
         access_key=settings.minio.root_user,
         secret_key=settings.minio.root_password,
         secure=settings.minio.secure,
+        region=settings.minio.region,
+        max_connections=settings.minio.max_connections,
+        part_size=settings.minio.part_size,
+        max_parts_in_memory=settings.minio.max_parts_in_memory,
+        upload_concurrency=settings.minio.upload_concurrency,
+        part_retries=settings.minio.part_retries,
+        read_chunk_size=settings.minio.read_chunk_size,
+        read_ahead=settings.minio.read_ahead,
+    )
+    if settings.minio.backend == "memory":
+        return InMemoryStorageClient(config=config)
+    if settings.minio.backend == "filesystem":
+        return FilesystemStorageClient(
+            config=config, root=Path(settings.minio.filesystem_root), fsync=settings.minio.filesystem_fsync
+        )
+    storage: ObjectStorageProtocol = (
+        MinioClient(config=config) if settings.minio.backend == "minio" else S3Client(config=config)
     )
-    return MinioClient(config=config)
+    if settings.minio.cache_dir:
+        return CachedStorageClient(
+            storage=storage,
+            config=config,
+            root=Path(settings.minio.cache_dir),
+            max_size=settings.minio.cache_max_size,
+            max_object_size=settings.minio.cache_max_object_size,
+        )
+    return storage
 
 
 @lru_cache
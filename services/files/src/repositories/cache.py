@@ -0,0 +1,163 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from redis.exceptions import RedisError
+
+from core.database.repository.redis import RedisRepository, TokenData
+from core.logging.logger import CoreLogger
+from models import FileVersion
+from repositories.file import FileVersionRepository
+
+logger = CoreLogger.get_logger("version_cache")
+
+
+class VersionRecord(BaseModel):
+    """Cached copy of a `FileVersion` row."""
+
+    id: UUID
+    file_id: UUID
+    version: int
+    size: int
+    checksum: str
+    path: str
+    bucket: str
+    blob_id: UUID | None = None
+    is_deleted: bool
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    def to_model(self) -> FileVersion:
+        """Detached `FileVersion`, good for reading only."""
+        return FileVersion(**self.model_dump())
+
+
+VersionRecords = TypeAdapter(list[VersionRecord])
+
+
+class CachedFileVersionRepository:
+    """
+    Read-through Redis cache for version lookups by path and by id.
+
+    Misses are read from Postgres and stored for `ttl`; Redis failures and entries that no longer
+    decode fall back to Postgres.
+    Writers call `invalidate` after commit for every path and version they changed. It bumps a
+    generation counter per key, and entries are stored with the generation read before their
+    Postgres read, so a read-through that raced an invalidation writes an entry nobody accepts.
+    """
+
+    __slots__ = ("_redis", "_repo", "_ttl")
+
+    def __init__(self, repo: FileVersionRepository, redis: RedisRepository, ttl: timedelta) -> None:
+        self._repo = repo
+        self._redis = redis
+        self._ttl = ttl
+
+    @staticmethod
+    def _path_key(path: str) -> str:
+        return f"file:path:{path}"
+
+    @staticmethod
+    def _id_key(version_id: UUID) -> str:
+        return f"file:id:{version_id}"
+
+    @staticmethod
+    def _revisions_key(path: str) -> str:
+        return f"file:revisions:{path}"
+
+    @staticmethod
+    def _generation_key(key: str) -> str:
+        return f"{key}:generation"
+
+    async def _get(self, key: str, generation_key: str | None = None) -> tuple[str | None, str | None]:
+        """
+        Current generation of `key` and its entry, if one was stored under that generation.
+
+        The generation is None when Redis could not be read, and then nothing should be stored.
+        """
+        try:
+            generation, cached = await self._redis.mget([generation_key or self._generation_key(key), key])
+        except RedisError as e:
+            logger.warning("Cache read failed for %s: %s", key, e)
+            return None, None
+        generation = generation or "0"
+        stamp, _, payload = (cached or "").partition(":")
+        return generation, payload if stamp == generation and payload else None
+
+    async def _drop(self, key: str, error: ValidationError) -> None:
+        logger.warning("Dropping undecodable cache entry %s: %s", key, error)
+        try:
+            await self._redis.delete(key)
+        except RedisError as e:
+            logger.warning("Cache invalidation failed for %s: %s", key, e)
+
+    async def _set(self, key: str, generation: str | None, value: str) -> None:
+        if generation is None:
+            return
+        try:
+            await self._redis.set(TokenData(key=key, value=f"{generation}:{value}", expires=self._ttl))
+        except RedisError as e:
+            logger.warning("Cache write failed for %s: %s", key, e)
+
+    async def get_by_path(self, path: str) -> FileVersion | None:
+        """Current version of `path`."""
+        key = self._path_key(path)
+        generation, cached = await self._get(key)
+        if cached:
+            try:
+                return VersionRecord.model_validate_json(cached).to_model()
+            except ValidationError as e:
+                await self._drop(key, e)
+
+        version = await self._repo.get_by_path(path)
+        if version:
+            await self._set(key, generation, VersionRecord.model_validate(version).model_dump_json())
+        return version
+
+    async def get_by_id(self, version_id: UUID) -> FileVersion | None:
+        key = self._id_key(version_id)
+        generation, cached = await self._get(key)
+        if cached:
+            try:
+                return VersionRecord.model_validate_json(cached).to_model()
+            except ValidationError as e:
+                await self._drop(key, e)
+
+        version = next(iter(await self._repo.get_by_ids([version_id])), None)
+        if version:
+            await self._set(key, generation, VersionRecord.model_validate(version).model_dump_json())
+        return version
+
+    async def get_revisions(self, path: str, limit: int) -> Sequence[FileVersion]:
+        """Latest `limit` live versions of `path`, cached per limit with one generation per path."""
+        key = f"{self._revisions_key(path)}:{limit}"
+        generation, cached = await self._get(key, self._generation_key(self._revisions_key(path)))
+        if cached:
+            try:
+                return [record.to_model() for record in VersionRecords.validate_json(cached)]
+            except ValidationError as e:
+                await self._drop(key, e)
+
+        versions = list(await self._repo.list_by_path(path, limit))
+        if versions:
+            records = VersionRecords.dump_json([VersionRecord.model_validate(v) for v in versions]).decode()
+            await self._set(key, generation, records)
+        return versions
+
+    async def invalidate(self, path: str, *version_ids: UUID) -> None:
+        """
+        Bump the generations of `path` and `version_ids`, then drop their entries.
+
+        Generations live twice as long as entries, so one cannot expire back to the value a stale
+        entry carries unless its read-through took longer than `ttl`.
+        """
+        keys = [self._path_key(path), *map(self._id_key, version_ids)]
+        generations = [self._generation_key(key) for key in [*keys, self._revisions_key(path)]]
+        try:
+            await self._redis.incr_many(generations, self._ttl * 2)
+            await self._redis.delete_many(keys)
+        except RedisError as e:
+            logger.warning("Cache invalidation failed for %s: %s", path, e)
@@ -1,10 +1,13 @@
 from collections.abc import Sequence
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Select, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 
 from core.database.repository.postgres import BaseRepository
-from models import File, FileVersion
+from core.utils.current_timestamp import get_timestamp
+from models import Blob, File, FileVersion
 
 
 class FileRepository(BaseRepository[File, File]):
@@ -12,9 +15,25 @@ class FileRepository(BaseRepository[File, File]):
 
     model = File
 
-    async def get_by_owner(self, owner_id: UUID) -> Sequence[File]:
-        stmt = select(self.model).where(self.model.owner_id == owner_id and self.model.is_deleted is False)
-        return await self.get_all(stmt)
+    async def get_current_by_owner(
+        self, owner_id: UUID, limit: int, after: tuple[datetime, UUID] | None = None
+    ) -> Sequence[tuple[File, FileVersion]]:
+        """
+        Page of the owner's files with their current versions, newest first.
+
+        Keyset pagination on `(updated_at, id)`: `after` is the key of the previous page's last row.
+        """
+        stmt = (
+            select(self.model, FileVersion)
+            .join(FileVersion, FileVersion.id == self.model.version_id)
+            .where(self.model.owner_id == owner_id)
+            .order_by(self.model.updated_at.desc(), self.model.id.desc())
+            .limit(limit)
+        )
+        if after:
+            stmt = stmt.where(tuple_(self.model.updated_at, self.model.id) < tuple_(*after))
+        result = await self.session.execute(stmt)
+        return result.tuples().all()
 
     async def get_by_checksum(self, checksum: str) -> File | None:
         stmt = (
@@ -30,10 +49,16 @@ class FileVersionRepository(BaseRepository[FileVersion, FileVersion]):
 
     model = FileVersion
 
+    def _owned_by(self, stmt: Select[FileVersion], owner_id: UUID | None) -> Select[FileVersion]:
+        """Restrict `stmt` to versions of the owner's files; no restriction without an owner."""
+        if owner_id is None:
+            return stmt
+        return stmt.join(File, File.id == self.model.file_id).where(File.owner_id == owner_id)
+
     async def get_current_version(self, file_id: UUID) -> FileVersion | None:
         stmt = (
             select(self.model)
-            .where(self.model.file_id == file_id and self.model.is_deleted is False)
+            .where(self.model.file_id == file_id, self.model.is_deleted.is_(False))
             .order_by(self.model.version.desc())
             .limit(1)
         )
@@ -42,22 +67,98 @@ class FileVersionRepository(BaseRepository[FileVersion, FileVersion]):
     async def get_versions(self, file_id: UUID) -> Sequence[FileVersion]:
         stmt = (
             select(self.model)
-            .where(self.model.file_id == file_id and self.model.is_deleted is False)
+            .where(self.model.file_id == file_id, self.model.is_deleted.is_(False))
             .order_by(self.model.version)
         )
         return await self.get_all(stmt)
 
-    async def get_by_path(self, path: str, limit: int = 1) -> FileVersion | None | Sequence[FileVersion]:
+    def _by_path(self, path: str, owner_id: UUID | None, *, include_deleted: bool = False) -> Select[FileVersion]:
+        stmt = select(self.model).where(self.model.path == path).order_by(self.model.version.desc())
+        stmt = self._owned_by(stmt, owner_id)
+        if not include_deleted:
+            stmt = stmt.where(self.model.is_deleted.is_(False))
+        return stmt
+
+    async def get_by_path(
+        self, path: str, *, include_deleted: bool = False, owner_id: UUID | None = None
+    ) -> FileVersion | None:
+        """Latest version of `path`."""
+        return await self.get_by_statement(self._by_path(path, owner_id, include_deleted=include_deleted).limit(1))
+
+    async def list_by_path(self, path: str, limit: int, *, owner_id: UUID | None = None) -> Sequence[FileVersion]:
+        """Latest `limit` versions of `path`, newest first."""
+        return await self.get_all(self._by_path(path, owner_id).limit(limit))
+
+    async def get_by_version(self, path: str, version: int, owner_id: UUID | None = None) -> FileVersion | None:
+        stmt = select(self.model).where(
+            self.model.path == path, self.model.version == version, self.model.is_deleted.is_(False)
+        )
+        return await self.get_by_statement(self._owned_by(stmt, owner_id))
+
+    async def get_current_by_prefix(self, owner_id: UUID, prefix: str, limit: int) -> Sequence[FileVersion]:
+        """Current versions of the owner's files whose path starts with `prefix`, by path."""
         stmt = (
             select(self.model)
-            .where(self.model.path == path and self.model.is_deleted is False)
-            .order_by(self.model.version.desc())
+            .join(File, File.version_id == self.model.id)
+            .where(File.owner_id == owner_id, self.model.path.startswith(prefix, autoescape=True))
+            .order_by(self.model.path)
+            .limit(limit)
         )
-        if limit == 1:
-            stmt = stmt.limit(1)
-            return await self.get_by_statement(stmt)
-        return await self.get_all(stmt.limit(limit))
-
-    async def get_by_ids(self, ids: Sequence[UUID]) -> Sequence[FileVersion]:
-        stmt = select(self.model).where(self.model.id.in_(ids).order_by(self.model.version.desc()))
         return await self.get_all(stmt)
+
+    async def get_by_ids(self, ids: Sequence[UUID], owner_id: UUID | None = None) -> Sequence[FileVersion]:
+        stmt = select(self.model).where(self.model.id.in_(ids)).order_by(self.model.version.desc())
+        return await self.get_all(self._owned_by(stmt, owner_id))
+
+
+class BlobRepository(BaseRepository[Blob, Blob]):
+    """Repository for reference counted content-addressed blobs."""
+
+    model = Blob
+
+    async def get_by_checksum(self, checksum: str) -> Blob | None:
+        stmt = select(self.model).where(self.model.checksum == checksum)
+        return await self.get_by_statement(stmt)
+
+    async def lock(self, checksum: str) -> None:
+        """Serialize with other transactions locking this checksum until the current one ends."""
+        await self.session.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(checksum, 0))))
+
+    async def acquire(self, checksum: str, size: int, bucket: str) -> Blob:
+        """
+        Take a reference to the blob with this checksum, creating its row when it is new.
+
+        A `ref_count` of 1 in the result means the caller created the row and must make sure the
+        object is stored. The checksum stays locked until the transaction ends, so garbage
+        collection cannot remove the object in between.
+        """
+        await self.lock(checksum)
+        stmt = (
+            insert(self.model)
+            .values(checksum=checksum, size=size, bucket=bucket, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[self.model.checksum],
+                set_={"ref_count": self.model.ref_count + 1, "updated_at": get_timestamp()},
+            )
+            .returning(self.model)
+        )
+        result = await self.session.execute(stmt, execution_options={"populate_existing": True})
+        return result.scalar_one()
+
+    async def release(self, blob_id: UUID) -> Blob | None:
+        """
+        Drop a reference to the blob.
+
+        Returns the blob when this was the last reference and its row was deleted.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == blob_id)
+            .values(ref_count=self.model.ref_count - 1)
+            .returning(self.model)
+        )
+        blob = (await self.session.execute(stmt, execution_options={"populate_existing": True})).scalar_one_or_none()
+        if blob is None or blob.ref_count > 0:
+            return None
+        await self.session.execute(delete(self.model).where(self.model.id == blob_id, self.model.ref_count <= 0))
+        return blob
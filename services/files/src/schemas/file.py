@@ -1,7 +1,37 @@
-from datetime import datetime
+from typing import Annotated, Self
+
+import base64
+import binascii
+
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, ValidationError
+
+from core.database.schemas.minio import MinioBlobDownload, MinioFileDownload, StoragePart
+
+# Largest object S3 stores; larger uploads are refused before any URL is signed.
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024 * 1024 * 1024
+# Column lengths of `file_version.path` and `file.name`.
+MAX_PATH_LENGTH = 1024
+MAX_NAME_LENGTH = 512
+
+
+def check_name_length(path: str) -> str:
+    """The file name, last segment of `path`, has to fit `file.name`."""
+    if len(path.rstrip("/").rsplit("/", 1)[-1]) > MAX_NAME_LENGTH:
+        raise ValueError(f"File name must be at most {MAX_NAME_LENGTH} characters")
+    return path
+
+
+FilePath = Annotated[
+    str,
+    Field(min_length=1, max_length=MAX_PATH_LENGTH, description="File path on storage"),
+    AfterValidator(check_name_length),
+]
 
 
 class FileResponse(BaseModel):
@@ -18,14 +48,33 @@ class FileResponse(BaseModel):
 class ListUserFilesResponse(BaseModel):
     user_id: UUID
     files: list[FileResponse]
+    next_cursor: str | None = None
 
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
+class FileCursor(BaseModel):
+    """Position in a file listing: key of the last file of the previous page."""
+
+    updated_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> Self:
+        """Raises ValueError for a cursor we did not issue."""
+        try:
+            return cls.model_validate_json(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValidationError) as exc:
+            raise ValueError(f"Invalid cursor: {cursor}") from exc
+
+
 class FileCreateData(BaseModel):
-    path: str = Field(..., min_length=1, description="File path on storage")
+    path: FilePath
     user_id: UUID = Field(..., description="User ID of the file owner")
-    bucket: str = Field(..., min_length=1, description="Storage bucket")
+    bucket: str = Field(..., min_length=1, max_length=50, description="Storage bucket")
 
 
 class FileVersion(BaseModel):
@@ -60,3 +109,200 @@ class FileVersionResponse(BaseModel):
     modified_at: datetime
 
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
+
+class ByteRange(BaseModel):
+    """Single byte range of a `Range: bytes=...` request header, bounds inclusive."""
+
+    start: int = Field(ge=0)
+    end: int = Field(ge=0)
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        return f"bytes {self.start}-{self.end}/{size}"
+
+    @classmethod
+    def from_header(cls, header: str | None, size: int) -> Self | None:
+        """
+        Parse a Range header against a representation of `size` bytes.
+
+        Returns None when the whole representation should be sent: no header, a syntax we ignore
+        or several ranges. Raises ValueError when the range cannot be satisfied.
+        """
+        if not header or not header.startswith("bytes=") or "," in header:
+            return None
+        first, _, last = header.removeprefix("bytes=").strip().partition("-")
+        if not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+            return None
+        if first and last and int(last) < int(first):
+            return None
+
+        if not first:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+
+        if start > end or start >= size:
+            raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+        return cls(start=start, end=end)
+
+
+class DownloadConditions(BaseModel):
+    """Conditional headers of a download request, evaluated against the strong checksum ETag."""
+
+    if_match: str | None = None
+    if_none_match: str | None = None
+    if_modified_since: str | None = None
+    if_range: str | None = None
+
+    @staticmethod
+    def _matches(header: str, etag: str, *, weak: bool) -> bool:
+        if header.strip() == "*":
+            return True
+        tags = [tag.strip() for tag in header.split(",")]
+        return etag in ([tag.removeprefix("W/") for tag in tags] if weak else tags)
+
+    def precondition_failed(self, etag: str) -> bool:
+        return bool(self.if_match) and not self._matches(self.if_match or "", etag, weak=False)
+
+    def not_modified(self, etag: str, last_modified: datetime) -> bool:
+        """Whether the client copy is current; If-Modified-Since counts without If-None-Match."""
+        if self.if_none_match:
+            return self._matches(self.if_none_match, etag, weak=True)
+        if not self.if_modified_since:
+            return False
+        try:
+            since = parsedate_to_datetime(self.if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since.replace(tzinfo=since.tzinfo or UTC)
+
+    def use_range(self, etag: str, last_modified: str) -> bool:
+        """Whether to honor Range: If-Range must name the current version exactly, if sent."""
+        return not self.if_range or self.if_range in {etag, last_modified}
+
+
+class FileDownload(BaseModel):
+    """Version metadata together with a lazy stream of its content, or where nginx finds it."""
+
+    path: str
+    size: int
+    checksum: str
+    version: int
+    updated_at: datetime
+    byte_range: ByteRange | None = None
+    content: AsyncIterator[bytes] | None = Field(default=None, description="Not set when the client has it already")
+    local_path: Path | None = Field(default=None, description="Content file, when storage is on local disk")
+    redirect: str | None = Field(default=None, description="Internal nginx location to serve the content from")
+    pinned: bool = Field(default=False, description="Requested by version id, so its content never changes")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.checksum}"'
+
+    @property
+    def last_modified(self) -> str:
+        return format_datetime(self.updated_at.astimezone(UTC), usegmt=True)
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Headers letting clients cache the content and revalidate it with conditional requests."""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": "private, max-age=31536000, immutable" if self.pinned else "private, no-cache",
+        }
+
+    @property
+    def filename(self) -> str:
+        return self.path.rstrip("/").rsplit("/", 1)[-1]
+
+    @property
+    def content_length(self) -> int:
+        return self.byte_range.length if self.byte_range else self.size
+
+
+class ArchiveEntry(BaseModel):
+    """File version to put in an archive, under `name`."""
+
+    name: str
+    size: int
+    modified_at: datetime
+    source: MinioBlobDownload | MinioFileDownload
+
+
+class FileArchive(BaseModel):
+    """ZIP archive of several files, streamed as it is built."""
+
+    filename: str
+    content: AsyncIterator[bytes]
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class UploadInitData(BaseModel):
+    path: FilePath
+    bucket: str = Field(..., min_length=1, max_length=50, description="Storage bucket")
+    size: int = Field(..., ge=0, le=MAX_UPLOAD_SIZE, description="Exact size of the content in bytes")
+    checksum: str = Field(..., pattern=r"^[0-9a-f]{64}$", description="SHA-256 of the content, hex")
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class UploadInitResponse(BaseModel):
+    """Where to PUT the content: `url` with `headers` for a single request, or one URL per part."""
+
+    upload_id: UUID
+    expires_at: datetime
+    url: str | None = None
+    headers: dict[str, str] = Field(default_factory=dict)
+    part_size: int | None = None
+    parts: list[PresignedPart] = Field(default_factory=list)
+
+
+class UploadSession(BaseModel):
+    """Direct upload waiting to be finalized, kept in Redis until it expires."""
+
+    upload_id: UUID
+    user_id: UUID
+    path: str
+    bucket: str
+    size: int
+    checksum: str
+    multipart_upload_id: str | None = None
+    part_size: int | None = None
+    part_count: int = 0
+
+    def chunk_size(self, part_number: int) -> int:
+        """Exact size of a part: `part_size` for all but the last one."""
+        part_size = self.part_size or self.size
+        return min(part_size, self.size - part_size * (part_number - 1))
+
+
+class UploadCompleteData(BaseModel):
+    parts: list[StoragePart] = Field(default_factory=list, description="ETags returned by part uploads")
+
+
+class UploadedChunk(BaseModel):
+    part_number: int
+    offset: int
+    size: int
+
+
+class ResumableUploadStatus(BaseModel):
+    """Chunks of a resumable upload the server already holds, and those still missing."""
+
+    upload_id: UUID
+    size: int
+    part_size: int
+    part_count: int
+    received: list[UploadedChunk] = Field(default_factory=list)
+    missing: list[int] = Field(default_factory=list)
@@ -8,15 +8,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database.repository.minio import MinioRepository
 from core.database.repository.redis import RedisRepository
 from repositories import (
+    BlobRepository,
+    CachedFileVersionRepository,
     FileRepository,
     FileVersionRepository,
     UserRepository,
+    get_blob_repo,
     get_db_session,
     get_file_repo,
     get_file_version_repo,
     get_minio_repo,
     get_redis_repo,
     get_user_repo,
+    get_version_cache,
 )
 from services.file import FileService, FileServiceProtocol
 
@@ -29,5 +33,7 @@ def get_file_service(
     user_repo: Annotated[UserRepository, Depends(get_user_repo)],
     file_repo: Annotated[FileRepository, Depends(get_file_repo)],
     file_version_repo: Annotated[FileVersionRepository, Depends(get_file_version_repo)],
+    blob_repo: Annotated[BlobRepository, Depends(get_blob_repo)],
+    version_cache: Annotated[CachedFileVersionRepository, Depends(get_version_cache)],
 ) -> FileServiceProtocol:
-    return FileService(db, minio, redis, user_repo, file_repo, file_version_repo)
+    return FileService(db, minio, redis, user_repo, file_repo, file_version_repo, blob_repo, version_cache)
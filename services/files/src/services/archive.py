@@ -0,0 +1,80 @@
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Sequence
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
+
+from core.client.minio import ReadAhead
+from schemas.file import ArchiveEntry
+
+
+class _ArchiveSink:
+    """Write-only file for `ZipFile`; the stream drains what was written after each step."""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _zip_info(entry: ArchiveEntry) -> ZipInfo:
+    info = ZipInfo(entry.name, date_time=entry.modified_at.timetuple()[:6])
+    info.compress_type = ZIP_STORED
+    info.external_attr = 0o644 << 16
+    # With the size known up front, zipfile switches to ZIP64 records where the file needs them.
+    info.file_size = entry.size
+    return info
+
+
+async def stream_zip(
+    entries: Sequence[ArchiveEntry],
+    open_entry: Callable[[ArchiveEntry], AsyncGenerator[bytes, None]],
+    prefetch: int,
+    read_ahead: int,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream a ZIP archive of `entries`, built as it is sent and never stored anywhere.
+
+    Entries are stored uncompressed, followed by data descriptors since CRCs are only known once
+    their content went through. While one entry is sent, the following ones up to `prefetch`
+    are already being read, `read_ahead` chunks each, which bounds memory whatever the archive size.
+    """
+    sink = _ArchiveSink()
+    readers: deque[ReadAhead] = deque()
+    opened = 0
+
+    try:
+        with ZipFile(sink, "w", ZIP_STORED) as archive:
+            for entry in entries:
+                while opened < len(entries) and len(readers) < max(prefetch, 1):
+                    reader = ReadAhead(open_entry(entries[opened]), max(read_ahead, 1))
+                    reader.start()
+                    readers.append(reader)
+                    opened += 1
+
+                reader = readers.popleft()
+                try:
+                    with archive.open(_zip_info(entry), "w") as target:
+                        async for chunk in reader:
+                            target.write(chunk)
+                            yield sink.drain()
+                finally:
+                    await reader.aclose()
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        for reader in readers:
+            await reader.aclose()
@@ -1,44 +1,113 @@
 from typing import Any, Protocol
 
 import hashlib
+import posixpath
 import time
 
-from collections.abc import AsyncGenerator, Awaitable
+from asyncio import Task, create_task, to_thread
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from datetime import UTC, datetime
-from io import BytesIO
-from uuid import UUID
+from math import ceil
+from urllib.parse import quote
+from uuid import UUID, uuid4
 
 from asyncpg.pgproto.pgproto import timedelta
 from fastapi import UploadFile
+from minio import S3Error
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from conf.settings import settings
 from core.database.repository.minio import MinioRepository
 from core.database.repository.redis import RedisRepository, TokenData
-from core.database.schemas.minio import MinioFile, MinioFileDownload
+from core.database.schemas.minio import (
+    MinioBlobDownload,
+    MinioBlobStream,
+    MinioFileDownload,
+    StagedObject,
+    StorageBlob,
+    StorageObjectStat,
+    StoragePart,
+)
 from core.logging.logger import CoreLogger
-from core.utils.current_timestamp import get_timestamp
 from helpers.raise_error import raise_error
-from models.file import File, FileVersion, User
-from repositories import FileRepository, FileVersionRepository, UserRepository
-from schemas.file import FileCreateData, FileResponse, FileVersionResponse, ListUserFilesResponse, ServiceStatusResponse
+from models.file import Blob, File, FileVersion, User
+from repositories import (
+    BlobRepository,
+    CachedFileVersionRepository,
+    FileRepository,
+    FileVersionRepository,
+    UserRepository,
+)
+from schemas.file import (
+    MAX_NAME_LENGTH,
+    ArchiveEntry,
+    ByteRange,
+    DownloadConditions,
+    FileArchive,
+    FileCreateData,
+    FileCursor,
+    FileDownload,
+    FileResponse,
+    FileVersionResponse,
+    ListUserFilesResponse,
+    PresignedPart,
+    ResumableUploadStatus,
+    ServiceStatusResponse,
+    UploadCompleteData,
+    UploadedChunk,
+    UploadInitData,
+    UploadInitResponse,
+    UploadSession,
+)
+from services.archive import stream_zip
+from services.proxy_cache import purge_proxy_cache
 
 logger = CoreLogger.get_logger("file_service")
 
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_PART_COUNT = 10_000
+CHECKSUM_PENDING = "pending"
+CHECKSUM_RETRY_AFTER = 5
+
+# Background hashes of staged uploads; the event loop only keeps weak references to tasks.
+_checksum_jobs: set[Task[None]] = set()
+
+
+def _checksum_job_done(job: Task[None]) -> None:
+    _checksum_jobs.discard(job)
+    if not job.cancelled() and (exc := job.exception()):
+        logger.warning("Failed to hash staged upload: %s", exc)
+
 
 class FileServiceProtocol(Protocol):
     async def upload(self, file: UploadFile, data: FileCreateData) -> FileResponse: ...
-    async def download(self, path: str | UUID) -> AsyncGenerator[bytes, None]: ...
-    async def list_files(self, user_id: UUID) -> ListUserFilesResponse: ...
+    async def initiate_upload(self, user_id: UUID, data: UploadInitData) -> UploadInitResponse: ...
+    async def complete_upload(self, user_id: UUID, upload_id: UUID, data: UploadCompleteData) -> FileResponse: ...
+    async def create_resumable_upload(self, user_id: UUID, data: UploadInitData) -> ResumableUploadStatus: ...
+    async def upload_chunk(
+        self, user_id: UUID, upload_id: UUID, part_number: int, content: AsyncIterator[bytes]
+    ) -> UploadedChunk: ...
+    async def get_resumable_upload(self, user_id: UUID, upload_id: UUID) -> ResumableUploadStatus: ...
+    async def commit_resumable_upload(self, user_id: UUID, upload_id: UUID) -> FileResponse: ...
+    async def download(
+        self, path: str | UUID, range_header: str | None = None, conditions: DownloadConditions | None = None
+    ) -> FileDownload: ...
+    async def archive(self, user_id: UUID, path: str | None = None, ids: list[UUID] | None = None) -> FileArchive: ...
+    async def list_files(
+        self, user_id: UUID, cursor: str | None = None, limit: int | None = None
+    ) -> ListUserFilesResponse: ...
     async def get_revisions(self, path: str | UUID, limit: int) -> list[FileVersionResponse]: ...
+    async def delete(self, user_id: UUID, path: str, version: int | None = None) -> FileVersionResponse: ...
     async def get_service_status(self) -> ServiceStatusResponse: ...
 
 
 class FileService(FileServiceProtocol):
     """Service for working with files."""
 
-    __slots__ = ("db", "file_repo", "file_version_repo", "minio", "redis", "user_repo")
+    __slots__ = ("blob_repo", "db", "file_repo", "file_version_repo", "minio", "redis", "user_repo", "version_cache")
 
     def __init__(
         self,
@@ -48,6 +117,8 @@ class FileService(FileServiceProtocol):
         user_repo: UserRepository,
         file_repo: FileRepository,
         file_version_repo: FileVersionRepository,
+        blob_repo: BlobRepository,
+        version_cache: CachedFileVersionRepository,
     ) -> None:
         self.db = db_session
         self.minio = minio_repo
@@ -55,6 +126,8 @@ class FileService(FileServiceProtocol):
         self.user_repo = user_repo
         self.file_repo = file_repo
         self.file_version_repo = file_version_repo
+        self.blob_repo = blob_repo
+        self.version_cache = version_cache
 
     async def _get_or_create_user(self, user_id: UUID) -> User:
         user = await self.user_repo.get(user_id)
@@ -64,95 +137,535 @@ class FileService(FileServiceProtocol):
         return user
 
     @staticmethod
-    def _calculate_checksum(data: bytes) -> str:
-        return hashlib.sha256(data).hexdigest()
+    async def _hash_upload(file: UploadFile) -> tuple[str, int]:
+        """Hash the spooled upload chunk by chunk, then rewind it for the storage write."""
+        hasher = hashlib.sha256()
+        size = 0
+        while chunk := await file.read(HASH_CHUNK_SIZE):
+            await to_thread(hasher.update, chunk)
+            size += len(chunk)
+        await file.seek(0)
+        return hasher.hexdigest(), size
+
+    async def _store_blob(self, file: UploadFile, blob: StorageBlob) -> None:
+        await file.seek(0)
+        uploaded = await self.minio.upload_file_stream(
+            MinioBlobStream(checksum=blob.checksum, bucket=blob.bucket, stream=file)
+        )
+        if uploaded.checksum != blob.checksum:
+            await self.minio.remove_blob(blob)
+            raise raise_error(status.HTTP_409_CONFLICT, "File content changed during upload")
+
+    async def _acquire_blob(self, blob: StorageBlob, size: int, store: Callable[[], Awaitable[None]]) -> Blob:
+        """
+        Take a reference to `blob`, storing its object first when the checksum looks new.
+
+        The object is written before any row is locked. Once the reference is taken, garbage
+        collection of the checksum waits for the commit; an object it removed just before is
+        stored again, under the lock.
+        """
+        stored = False
+        if not await self.blob_repo.get_by_checksum(blob.checksum):
+            await store()
+            stored = True
+        row = await self.blob_repo.acquire(checksum=blob.checksum, size=size, bucket=blob.bucket)
+        if row.ref_count == 1 and not (stored and await self.minio.blob_exists(blob)):
+            await store()
+        return row
+
+    async def _collect_blob(self, blob: StorageBlob, size: int) -> None:
+        """
+        Remove the object of a blob that lost its last reference, unless an upload took it again.
+
+        Runs under the checksum lock `BlobRepository.acquire` takes, so no new reference can be
+        recorded between the check and the removal.
+        """
+        try:
+            await self.blob_repo.lock(blob.checksum)
+            if await self.blob_repo.get_by_checksum(blob.checksum):
+                return
+            await self.minio.remove_blob(blob)
+        finally:
+            await self.db.rollback()
+        if settings.api.accel_redirect and settings.api.accel_cache_purge_url:
+            await purge_proxy_cache(settings.api.accel_cache_purge_url, settings.api.accel_redirect, blob, size)
 
     async def upload(self, file: UploadFile, data: FileCreateData) -> FileResponse:
-        async with self.db.begin():
-            user = await self._get_or_create_user(data.user_id)
-            file_data = await file.read()
-            checksum = self._calculate_checksum(file_data)
-
-            existing_file = await self.file_version_repo.get_by_path(path=data.path)
-
-            if existing_file:
-                new_version_number = existing_file.version + 1
-                file_meta = self.file_repo.get(existing_file.file_id)
-            else:
-                new_version_number = 1
-                file_meta = File(name=file.filename, owner_id=user.id, version_id=None)
-
-            version = FileVersion(
-                file_id=file_meta.id,
-                version=new_version_number,
-                checksum=checksum,
-                size=len(file_data),
-                path=data.path,
-                bucket=data.bucket,
-            )
-            new_version = await self.file_version_repo.upsert(version)
-            file_meta.version_id = new_version.id
-            file_meta = await self.file_repo.upsert(file_meta)
-
-            await self.minio.upload_file(
-                MinioFile(
-                    file_id=file_meta.id,
-                    version=new_version_number,
-                    data=BytesIO(file_data),
-                    original_path=data.path,
-                    bucket=data.bucket,
-                )
+        if file.filename and len(file.filename) > MAX_NAME_LENGTH:
+            raise raise_error(
+                status.HTTP_422_UNPROCESSABLE_ENTITY, f"File name must be at most {MAX_NAME_LENGTH} characters"
             )
+        checksum, size = await self._hash_upload(file)
+        storage_blob = StorageBlob(checksum=checksum, bucket=data.bucket)
+        blob = await self._acquire_blob(storage_blob, size, lambda: self._store_blob(file, storage_blob))
 
-            file_response = FileResponse(
-                id=file_meta.id,
-                name=file_meta.name,
-                created_at=get_timestamp(),
-                path=new_version.path,
-                size=new_version.size,
-                is_downloadable=True,
-            )
-            await self.redis.set(
-                TokenData(
-                    key=str(file_meta.id),
-                    expires=datetime.fromtimestamp(new_version.updated_at, tz=UTC) - get_timestamp(),
-                )
+        return await self._add_version(
+            user_id=data.user_id, path=data.path, bucket=data.bucket, filename=file.filename, blob=blob
+        )
+
+    async def _add_version(
+        self, user_id: UUID, path: str, bucket: str, filename: str | None, blob: Blob
+    ) -> FileResponse:
+        """Record a new version of `path` pointing at an already stored blob and commit."""
+        user = await self._get_or_create_user(user_id)
+        existing_file = await self.file_version_repo.get_by_path(path=path, include_deleted=True, owner_id=user_id)
+
+        if existing_file:
+            new_version_number = existing_file.version + 1
+            file_meta = await self.file_repo.get(existing_file.file_id)
+        else:
+            new_version_number = 1
+            file_meta = await self.file_repo.upsert(
+                File(name=filename, owner_id=user.external_user_id, version_id=None)
             )
-            return file_response
-
-    async def download(self, path: str | UUID) -> AsyncGenerator[bytes, None]:
-        async def generator() -> AsyncGenerator[bytes, None]:
-            if isinstance(path, UUID):
-                file_meta, *_ = await self.file_version_repo.get_by_ids([path])
-                if not file_meta:
-                    raise raise_error(status.HTTP_404_NOT_FOUND, f"File not found: {path}")
-            else:
-                file_meta = await self.file_version_repo.get_by_path(path)
-                if not file_meta:
-                    raise raise_error(status.HTTP_404_NOT_FOUND, f"File not found: {path}")
-
-            async for chunk in self.minio.download_file(
-                file=MinioFileDownload(
-                    file_id=file_meta.file_id, version=file_meta.version, original_path=file_meta.path
+
+        version = FileVersion(
+            file_id=file_meta.id,
+            version=new_version_number,
+            checksum=blob.checksum,
+            size=blob.size,
+            path=path,
+            bucket=bucket,
+            blob_id=blob.id,
+        )
+        new_version = await self.file_version_repo.upsert(version)
+        file_meta.version_id = new_version.id
+        file_meta = await self.file_repo.upsert(file_meta)
+        await self.db.commit()
+
+        file_response = FileResponse(
+            id=file_meta.id,
+            name=file_meta.name,
+            created_at=file_meta.created_at,
+            updated_at=new_version.updated_at,
+            path=new_version.path,
+            size=new_version.size,
+            version=new_version.version,
+            is_downloadable=True,
+        )
+        await self.version_cache.invalidate(path)
+        return file_response
+
+    @staticmethod
+    def _upload_key(upload_id: UUID) -> str:
+        return f"upload:{upload_id}"
+
+    async def initiate_upload(self, user_id: UUID, data: UploadInitData) -> UploadInitResponse:
+        """
+        Open a direct upload to storage.
+
+        Content goes to a staging key; it only becomes a version in `complete_upload`,
+        after its size and checksum are checked against what is declared here. A single PUT
+        must declare the checksum to storage, which verifies it; multipart content is hashed
+        by a background job, as storage only keeps checksums of its parts.
+        """
+        expires = timedelta(seconds=settings.minio.upload_expires)
+        staged = StagedObject(upload_id=uuid4(), bucket=data.bucket)
+        session = UploadSession(
+            upload_id=staged.upload_id,
+            user_id=user_id,
+            path=data.path,
+            bucket=data.bucket,
+            size=data.size,
+            checksum=data.checksum,
+        )
+        response = UploadInitResponse(upload_id=staged.upload_id, expires_at=datetime.now(tz=UTC) + expires)
+
+        if data.size <= settings.minio.part_size:
+            upload = await self.minio.generate_upload_url(staged, expires, data.checksum)
+            response.url, response.headers = upload.url, upload.headers
+        else:
+            part_size = max(settings.minio.part_size, ceil(data.size / MAX_PART_COUNT))
+            session.part_count = ceil(data.size / part_size)
+            session.multipart_upload_id = await self.minio.start_multipart_upload(staged)
+            urls = await self.minio.generate_part_urls(staged, session.multipart_upload_id, session.part_count, expires)
+            session.part_size = response.part_size = part_size
+            response.parts = [PresignedPart(part_number=n, url=url) for n, url in enumerate(urls, start=1)]
+
+        await self.redis.set(
+            TokenData(key=self._upload_key(staged.upload_id), value=session.model_dump_json(), expires=expires)
+        )
+        return response
+
+    async def _assemble_parts(self, staged: StagedObject, session: UploadSession, parts: list[StoragePart]) -> None:
+        if len(parts) != session.part_count:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, f"Expected {session.part_count} parts, got {len(parts)}")
+        try:
+            await self.minio.complete_multipart_upload(staged, str(session.multipart_upload_id), parts)
+        except S3Error:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, "Upload parts are missing or invalid") from None
+
+    @staticmethod
+    def _checksum_key(upload_id: UUID) -> str:
+        return f"upload:{upload_id}:checksum"
+
+    async def _stat_staged(self, staged: StagedObject) -> StorageObjectStat | None:
+        try:
+            return await self.minio.stat_file(staged)
+        except S3Error as exc:
+            if exc.code == "NoSuchKey":
+                return None
+            raise raise_error(status.HTTP_503_SERVICE_UNAVAILABLE, "Storage is unavailable, try again") from None
+
+    async def _hash_staged(self, staged: StagedObject, key: str, expires: timedelta) -> None:
+        """Hash a staged object for the next finalize; on failure the next one starts over."""
+        try:
+            checksum = await self.minio.checksum_file(staged)
+        except Exception:
+            await self.redis.delete(key)
+            raise
+        await self.redis.set(TokenData(key=key, value=checksum, expires=expires))
+
+    async def _staged_checksum(self, staged: StagedObject, stat: StorageObjectStat) -> str:
+        """
+        SHA-256 of a staged object: the one storage checked, or else that of a background job.
+
+        The first finalize starts the job and every finalize gets 202 until it is done, so no
+        request streams the content back from storage.
+        """
+        if stat.checksum:
+            return stat.checksum
+        key = self._checksum_key(staged.upload_id)
+        expires = timedelta(seconds=settings.minio.upload_expires)
+        if await self.redis.add(TokenData(key=key, value=CHECKSUM_PENDING, expires=expires)):
+            job = create_task(self._hash_staged(staged, key, expires))
+            _checksum_jobs.add(job)
+            job.add_done_callback(_checksum_job_done)
+        elif (checksum := await self.redis.get(key)) not in (None, CHECKSUM_PENDING):
+            return str(checksum)
+        raise raise_error(
+            status.HTTP_202_ACCEPTED,
+            "Uploaded content is being verified, finalize again later",
+            headers={"Retry-After": str(CHECKSUM_RETRY_AFTER)},
+        )
+
+    async def _get_upload_session(self, user_id: UUID, upload_id: UUID) -> UploadSession:
+        raw_session = await self.redis.get(self._upload_key(upload_id))
+        session = UploadSession.model_validate_json(raw_session) if raw_session else None
+        if not session or session.user_id != user_id:
+            raise raise_error(status.HTTP_404_NOT_FOUND, f"Upload not found: {upload_id}")
+        return session
+
+    async def _finalize_upload(self, session: UploadSession, parts: list[StoragePart]) -> FileResponse:
+        """
+        Assemble and verify a staged upload, then turn it into a new file version.
+
+        The session is only claimed once the content is verified, so a finalize that comes too
+        early or hits a storage error can be retried; content that does not match ends the upload.
+        """
+        staged = StagedObject(upload_id=session.upload_id, bucket=session.bucket)
+        # A retried finalize finds the parts already assembled.
+        stat = await self._stat_staged(staged)
+        if stat is None and session.multipart_upload_id:
+            await self._assemble_parts(staged, session, parts)
+            stat = await self._stat_staged(staged)
+        if stat is None:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, "Nothing was uploaded")
+        verified = stat.size == session.size and await self._staged_checksum(staged, stat) == session.checksum
+
+        if not await self.redis.delete(self._upload_key(session.upload_id)):
+            raise raise_error(status.HTTP_404_NOT_FOUND, f"Upload not found: {session.upload_id}")
+        await self.redis.delete_many([self._parts_key(session.upload_id), self._checksum_key(session.upload_id)])
+        if not verified:
+            await self.minio.remove_staged(staged)
+            raise raise_error(status.HTTP_422_UNPROCESSABLE_ENTITY, "Uploaded content does not match size or checksum")
+
+        storage_blob = StorageBlob(checksum=session.checksum, bucket=session.bucket)
+        blob = await self._acquire_blob(
+            storage_blob, session.size, lambda: self.minio.copy_staged(staged, storage_blob)
+        )
+        response = await self._add_version(
+            user_id=session.user_id,
+            path=session.path,
+            bucket=session.bucket,
+            filename=session.path.rstrip("/").rsplit("/", 1)[-1],
+            blob=blob,
+        )
+        await self.minio.remove_staged(staged)
+        return response
+
+    async def complete_upload(self, user_id: UUID, upload_id: UUID, data: UploadCompleteData) -> FileResponse:
+        """Verify a presigned upload and turn it into a new file version."""
+        session = await self._get_upload_session(user_id, upload_id)
+        return await self._finalize_upload(session, data.parts)
+
+    @staticmethod
+    def _parts_key(upload_id: UUID) -> str:
+        return f"upload:{upload_id}:parts"
+
+    async def create_resumable_upload(self, user_id: UUID, data: UploadInitData) -> ResumableUploadStatus:
+        """
+        Open a resumable upload: the client PUTs numbered chunks in any order, then commits.
+
+        Every chunk is one multipart part of a staged object; received etags are kept in Redis,
+        so a broken connection only costs the chunk that was in flight.
+        """
+        expires = timedelta(seconds=settings.minio.resumable_expires)
+        staged = StagedObject(upload_id=uuid4(), bucket=data.bucket)
+        part_size = max(settings.minio.resumable_part_size, ceil(data.size / MAX_PART_COUNT))
+        session = UploadSession(
+            upload_id=staged.upload_id,
+            user_id=user_id,
+            path=data.path,
+            bucket=data.bucket,
+            size=data.size,
+            checksum=data.checksum,
+            part_size=part_size,
+            part_count=max(ceil(data.size / part_size), 1),
+            multipart_upload_id=await self.minio.start_multipart_upload(staged),
+        )
+        await self.redis.set(
+            TokenData(key=self._upload_key(staged.upload_id), value=session.model_dump_json(), expires=expires)
+        )
+        return self._resumable_status(session, {})
+
+    @staticmethod
+    def _resumable_status(session: UploadSession, parts: dict[str, str]) -> ResumableUploadStatus:
+        part_size = session.part_size or session.size
+        received = sorted(int(part_number) for part_number in parts)
+        return ResumableUploadStatus(
+            upload_id=session.upload_id,
+            size=session.size,
+            part_size=part_size,
+            part_count=session.part_count,
+            received=[
+                UploadedChunk(part_number=n, offset=part_size * (n - 1), size=session.chunk_size(n)) for n in received
+            ],
+            missing=sorted(set(range(1, session.part_count + 1)).difference(received)),
+        )
+
+    async def upload_chunk(
+        self, user_id: UUID, upload_id: UUID, part_number: int, content: AsyncIterator[bytes]
+    ) -> UploadedChunk:
+        session = await self._get_upload_session(user_id, upload_id)
+        if not session.multipart_upload_id or not 1 <= part_number <= session.part_count:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, f"Invalid part number: {part_number}")
+
+        expected = session.chunk_size(part_number)
+        data = bytearray()
+        async for chunk in content:
+            data += chunk
+            if len(data) > expected:
+                raise raise_error(
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, f"Part {part_number} exceeds {expected} bytes"
                 )
-            ):
-                yield chunk
+        if len(data) != expected:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, f"Part {part_number} must be {expected} bytes")
+
+        staged = StagedObject(upload_id=upload_id, bucket=session.bucket)
+        etag = await self.minio.upload_part(staged, session.multipart_upload_id, part_number, data)
+
+        expires = timedelta(seconds=settings.minio.resumable_expires)
+        await self.redis.hset(self._parts_key(upload_id), {str(part_number): etag}, expires)
+        await self.redis.expire(self._upload_key(upload_id), expires)
+        return UploadedChunk(
+            part_number=part_number, offset=(session.part_size or 0) * (part_number - 1), size=expected
+        )
+
+    async def get_resumable_upload(self, user_id: UUID, upload_id: UUID) -> ResumableUploadStatus:
+        session = await self._get_upload_session(user_id, upload_id)
+        return self._resumable_status(session, await self.redis.hgetall(self._parts_key(upload_id)))
+
+    async def commit_resumable_upload(self, user_id: UUID, upload_id: UUID) -> FileResponse:
+        session = await self._get_upload_session(user_id, upload_id)
+        received = await self.redis.hgetall(self._parts_key(upload_id))
+        parts = sorted(
+            (StoragePart(part_number=int(part_number), etag=etag) for part_number, etag in received.items()),
+            key=lambda part: part.part_number,
+        )
+        return await self._finalize_upload(session, parts)
+
+    @staticmethod
+    def _version_id(path: str | UUID) -> UUID | None:
+        """Version id a download refers to; query parameters arrive as strings, ids included."""
+        if isinstance(path, UUID):
+            return path
+        try:
+            return UUID(path)
+        except ValueError:
+            return None
+
+    async def _get_version(self, path: str | UUID) -> FileVersion:
+        if version_id := self._version_id(path):
+            file_meta = await self.version_cache.get_by_id(version_id)
+        else:
+            file_meta = await self.version_cache.get_by_path(str(path))
+        if not file_meta:
+            raise raise_error(status.HTTP_404_NOT_FOUND, f"File not found: {path}")
+        return file_meta
+
+    @staticmethod
+    def _storage_file(
+        file_meta: FileVersion, offset: int = 0, length: int | None = None
+    ) -> MinioBlobDownload | MinioFileDownload:
+        if file_meta.blob_id:
+            return MinioBlobDownload(checksum=file_meta.checksum, offset=offset, length=length)
+        return MinioFileDownload(
+            file_id=file_meta.file_id,
+            version=file_meta.version,
+            original_path=file_meta.path,
+            offset=offset,
+            length=length,
+        )
+
+    async def download(
+        self, path: str | UUID, range_header: str | None = None, conditions: DownloadConditions | None = None
+    ) -> FileDownload:
+        """
+        Current version of `path`, or the version with that id, with a lazy stream of its content,
+        or with the internal nginx location to stream it from when `accel_redirect` is set.
+
+        Conditional headers are evaluated on the metadata alone; a client holding the current
+        version gets it back without `content`, and storage is not touched.
+        """
+        file_meta = await self._get_version(path)
+        download = FileDownload(
+            path=file_meta.path,
+            size=file_meta.size,
+            checksum=file_meta.checksum,
+            version=file_meta.version,
+            updated_at=file_meta.updated_at,
+            pinned=self._version_id(path) is not None,
+        )
+        conditions = conditions or DownloadConditions()
+        if conditions.precondition_failed(download.etag):
+            raise raise_error(status.HTTP_412_PRECONDITION_FAILED, f"File changed: {path}", download.validators)
+        if conditions.not_modified(download.etag, download.updated_at):
+            return download
+        if not conditions.use_range(download.etag, download.last_modified):
+            range_header = None
 
-        return generator()
+        try:
+            download.byte_range = ByteRange.from_header(range_header, file_meta.size)
+        except ValueError:
+            raise raise_error(
+                status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                f"Range not satisfiable: {range_header}",
+                headers={"Content-Range": f"bytes */{file_meta.size}"},
+            ) from None
+
+        byte_range = download.byte_range
+        offset, length = (byte_range.start, byte_range.length) if byte_range else (0, None)
+        storage_file = self._storage_file(file_meta, offset, length)
+        download.local_path = self.minio.local_path(storage_file)
+        if settings.api.accel_redirect and not download.local_path:
+            download.redirect = self._accel_redirect(storage_file)
+            return download
+        download.content = self.minio.download_file(file=storage_file)
+        return download
+
+    @staticmethod
+    def _accel_redirect(storage_file: MinioBlobDownload | MinioFileDownload) -> str:
+        """
+        Internal nginx location serving `storage_file`: bucket and object under `accel_redirect`.
+
+        nginx unescapes the path and signs its own storage requests, so nothing here expires.
+        """
+        location = str(settings.api.accel_redirect).rstrip("/")
+        return f"{location}/{storage_file.bucket}/{quote(storage_file.object_name)}"
+
+    @staticmethod
+    def _archive_names(versions: Sequence[FileVersion], prefix: str) -> list[str]:
+        """
+        Entry names of `versions`: their path relative to `prefix`, with `.vN` before the extension
+        of paths that come up more than once, as several versions of one file do.
+        """
+        names = [
+            "/".join(part for part in fv.path.removeprefix(prefix).split("/") if part not in {"", ".", ".."})
+            for fv in versions
+        ]
+        counts = Counter(names)
+        taken: set[str] = set()
+        unique: list[str] = []
+        for name, fv in zip(names, versions, strict=True):
+            root, ext = posixpath.splitext(name)
+            suffix = f".v{fv.version}" if counts[name] > 1 else ""
+            candidate, attempt = f"{root}{suffix}{ext}", 1
+            while candidate in taken:
+                attempt += 1
+                candidate = f"{root}{suffix}~{attempt}{ext}"
+            taken.add(candidate)
+            unique.append(candidate)
+        return unique
+
+    async def archive(self, user_id: UUID, path: str | None = None, ids: list[UUID] | None = None) -> FileArchive:
+        """
+        ZIP archive of the user's files under `path`, or of the file versions in `ids`.
+
+        Entries are named after their path, relative to `path` when one is given, and
+        unique within the archive.
+        """
+        if bool(path) == bool(ids):
+            raise raise_error(status.HTTP_400_BAD_REQUEST, "Pass either a path or file ids")
+
+        limit = settings.api.archive_max_files
+        if path:
+            prefix = f"{path.rstrip('/')}/"
+            versions = await self.file_version_repo.get_current_by_prefix(user_id, prefix, limit + 1)
+        else:
+            prefix = "/"
+            versions = [
+                v for v in await self.file_version_repo.get_by_ids(ids or [], owner_id=user_id) if not v.is_deleted
+            ]
+        if not versions:
+            raise raise_error(status.HTTP_404_NOT_FOUND, f"No files found: {path or ids}")
+        if len(versions) > limit:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, f"Archives hold at most {limit} files")
+
+        entries = [
+            ArchiveEntry(name=name, size=fv.size, modified_at=fv.updated_at, source=self._storage_file(fv))
+            for name, fv in zip(self._archive_names(versions, prefix), versions, strict=True)
+        ]
+        name = path.strip("/").rsplit("/", 1)[-1] if path else ""
+        return FileArchive(
+            filename=f"{name or 'files'}.zip",
+            content=stream_zip(
+                entries,
+                lambda entry: self.minio.download_file(entry.source),
+                prefetch=settings.api.archive_prefetch,
+                read_ahead=settings.minio.read_ahead,
+            ),
+        )
+
+    async def list_files(
+        self, user_id: UUID, cursor: str | None = None, limit: int | None = None
+    ) -> ListUserFilesResponse:
+        """Page of the user's current file versions; pass `next_cursor` back for the next page."""
+        page_size = min(limit or settings.api.page_size, settings.api.max_page_size)
+        try:
+            after = FileCursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise raise_error(status.HTTP_400_BAD_REQUEST, f"Invalid cursor: {cursor}") from None
+
+        rows = await self.file_repo.get_current_by_owner(
+            owner_id=user_id, limit=page_size + 1, after=(after.updated_at, after.id) if after else None
+        )
+        page = rows[:page_size]
+        next_cursor = None
+        if len(rows) > page_size:
+            last_file = page[-1][0]
+            next_cursor = FileCursor(updated_at=last_file.updated_at, id=last_file.id).encode()
 
-    async def list_files(self, user_id: UUID) -> ListUserFilesResponse:
-        files_meta = await self.file_repo.get_by_owner(owner_id=user_id)
-        files = await self.file_version_repo.get_by_ids(ids=[f.version_id for f in files_meta])
         return ListUserFilesResponse(
             user_id=user_id,
             files=[
-                FileResponse(id=f.file_id, path=f.path, size=f.size, version=f.version, updated_at=f.updated_at)
-                for f in files
+                FileResponse(
+                    id=f.id,
+                    name=f.name,
+                    created_at=f.created_at,
+                    updated_at=fv.updated_at,
+                    path=fv.path,
+                    size=fv.size,
+                    version=fv.version,
+                    is_downloadable=True,
+                )
+                for f, fv in page
             ],
+            next_cursor=next_cursor,
         )
 
     async def get_revisions(self, path: str | UUID, limit: int = 10) -> list[FileVersionResponse]:
-        file_versions = await self.file_version_repo.get_by_path(path, limit=limit)
+        file_versions = await self.version_cache.get_revisions(str(path), limit=limit)
         if not file_versions:
             raise raise_error(status.HTTP_404_NOT_FOUND, f"File not found: {path}")
 
@@ -161,6 +674,37 @@ class FileService(FileServiceProtocol):
             for fv in file_versions
         ]
 
+    async def delete(self, user_id: UUID, path: str, version: int | None = None) -> FileVersionResponse:
+        if version is None:
+            file_version = await self.file_version_repo.get_by_path(path, owner_id=user_id)
+        else:
+            file_version = await self.file_version_repo.get_by_version(path, version, owner_id=user_id)
+        if not file_version:
+            raise raise_error(status.HTTP_404_NOT_FOUND, f"File not found: {path}")
+
+        file_version.is_deleted = True
+        await self.file_version_repo.upsert(file_version)
+
+        file_meta = await self.file_repo.get(file_version.file_id)
+        if file_meta and file_meta.version_id == file_version.id:
+            current = await self.file_version_repo.get_current_version(file_meta.id)
+            file_meta.version_id = current.id if current else None
+            await self.file_repo.upsert(file_meta)
+
+        garbage = await self.blob_repo.release(file_version.blob_id) if file_version.blob_id else None
+        await self.db.commit()
+        await self.version_cache.invalidate(file_version.path, file_version.id)
+
+        if garbage:
+            await self._collect_blob(StorageBlob(checksum=garbage.checksum, bucket=garbage.bucket), garbage.size)
+
+        return FileVersionResponse(
+            version=file_version.version,
+            hash=file_version.checksum,
+            size=file_version.size,
+            modified_at=file_version.updated_at,
+        )
+
     @staticmethod
     async def _ping(coro: Awaitable[Any]) -> float:
         service_start = time.monotonic()
@@ -0,0 +1,26 @@
+from urllib.parse import quote
+
+import httpx
+
+from core.database.schemas.minio import StorageBlob
+from core.logging.logger import CoreLogger
+
+logger = CoreLogger.get_logger("proxy_cache")
+
+PURGE_TIMEOUT = 5.0
+
+
+async def purge_proxy_cache(purge_url: str, location: str, blob: StorageBlob, size: int) -> None:
+    """
+    Drop the slices of a garbage-collected blob from the nginx cache of `location`.
+
+    Failures are only logged: downloads are never redirected to a removed blob, so its entries
+    would age out of the cache anyway.
+    """
+    url = f"{purge_url.rstrip('/')}{location.rstrip('/')}/{blob.bucket}/{quote(blob.object_name)}"
+    try:
+        async with httpx.AsyncClient(timeout=PURGE_TIMEOUT) as client:
+            response = await client.delete(url, params={"size": size})
+            response.raise_for_status()
+    except httpx.HTTPError as exc:
+        logger.warning("Failed to purge %s from the download cache: %s", blob.object_name, exc)
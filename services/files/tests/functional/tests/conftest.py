@@ -33,6 +33,8 @@ def app():
 @pytest.fixture(scope="module")
 def client(app: FastAPI):
     with TestClient(app) as test_client:
+        # Connected by the lifespan; `mock_redis_repo` swaps it for a mock in every test.
+        test_client.app.state.live_redis = test_client.app.state.redis
         yield test_client
 
 
@@ -59,11 +61,25 @@ def mock_dependencies(mocker):
     mock_minio = MagicMock()
     mock_minio.upload_file = AsyncMock(return_value="test_object")
     mock_minio.download_file = AsyncMock(return_value=[b"test content"])
+    mock_minio.blob_exists = AsyncMock(return_value=True)
+    mock_minio.generate_presigned_url = AsyncMock(
+        return_value="http://minio1:9000/files/blobs/test?X-Amz-Signature=test"
+    )
     mocker.patch("repositories.get_minio_client", return_value=mock_minio)
 
 
 @pytest.fixture(autouse=True)
 def mock_redis_repo(client, mocker):  # type: ignore[no-untyped-def]
     mock = AsyncMock()
+    mock.get.return_value = None
+    mock.hget.return_value = None
+    mock.mget.return_value = [None, None]
     client.app.state.redis = mock
     return mock
+
+
+@pytest.fixture
+def live_redis(client, mock_redis_repo):  # type: ignore[no-untyped-def]
+    """Put back the Redis of the lifespan, for flows that keep state between requests."""
+    client.app.state.redis = client.app.state.live_redis
+    return client.app.state.redis
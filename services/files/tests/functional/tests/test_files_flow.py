@@ -1,5 +1,13 @@
+import time
 import uuid
+from hashlib import sha256
 from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from core.client.filesystem import FilesystemStorageClient
+from core.database.schemas.minio import ObjectStorageConfig, StoragePart
 
 
 def test_ping(client, mock_redis_repo):
@@ -36,13 +44,209 @@ def test_upload_file(client, mock_redis_repo):
 
 
 def test_download_file(client, mock_redis_repo):
-    file_id = str(uuid.uuid4())
-    response = client.get(f"/api/v1/files/download/?path={file_id}")
+    response = client.get("/api/v1/files/download/?path=/test/path")
     assert response.status_code == 200
-    assert response.json()["status"] == "OK"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == "12"
+    assert response.content == b"test content"
+
+
+def test_download_file_range(client, mock_redis_repo):
+    response = client.get("/api/v1/files/download/?path=/test/path", headers={"Range": "bytes=5-"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 5-11/12"
+    assert response.content == b"content"
+
+    response = client.get("/api/v1/files/download/?path=/test/path", headers={"Range": "bytes=100-"})
+    assert response.status_code == 416
 
 
 def test_get_revisions(client, mock_redis_repo):
     response = client.get("/api/v1/files/revisions/?path=/test/path&limit=10")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def test_delete_file_version(client, mock_redis_repo):
+    test_file = BytesIO(b"test content")
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("copy.txt", test_file)},
+        data={"path": "/test/copy", "user_id": str(uuid.uuid4()), "bucket": "test-bucket"},
+    )
+    assert response.status_code == 200
+
+    response = client.delete("/api/v1/files/?path=/test/copy")
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+
+    response = client.get("/api/v1/files/download/?path=/test/copy")
+    assert response.status_code == 404
+
+    response = client.get("/api/v1/files/download/?path=/test/path")
+    assert response.content == b"test content"
+
+
+def test_initiate_upload_rejects_bad_checksum(client, mock_redis_repo):
+    response = client.post(
+        "/api/v1/files/uploads", json={"path": "/test/direct", "bucket": "test-bucket", "size": 12, "checksum": "abc"}
+    )
+    assert response.status_code == 422
+
+
+def test_initiate_upload_rejects_content_over_object_limit(client, mock_redis_repo):
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"path": "/test/direct", "bucket": "test-bucket", "size": 6 * 1024**4, "checksum": "0" * 64},
+    )
+    assert response.status_code == 422
+
+
+def test_initiate_upload_rejects_long_file_name(client, mock_redis_repo):
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"path": f"/test/{'a' * 513}", "bucket": "test-bucket", "size": 12, "checksum": "0" * 64},
+    )
+    assert response.status_code == 422
+
+
+def test_resumable_chunk_requires_positive_part_number(client, mock_redis_repo):
+    response = client.put(f"/api/v1/files/resumable/{uuid.uuid4()}/parts/0", content=b"chunk")
+    assert response.status_code == 422
+
+
+def test_list_files_rejects_bad_cursor(client, mock_redis_repo):
+    response = client.get("/api/v1/files/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_archive_requires_path_or_ids(client, mock_redis_repo):
+    response = client.get("/api/v1/files/archive/")
+    assert response.status_code == 400
+
+    response = client.get(f"/api/v1/files/archive/?path=/test&ids={uuid.uuid4()}")
+    assert response.status_code == 400
+
+
+def test_download_file_not_modified(client, mock_redis_repo):
+    response = client.get("/api/v1/files/download/?path=/test/path")
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/files/download/?path=/test/path", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+def test_download_file_accel_redirect(client, mocker, mock_redis_repo):
+    from conf.settings import settings
+
+    mocker.patch.object(settings.api, "accel_redirect", "/_storage")
+    response = client.get("/api/v1/files/download/?path=/test/path", headers={"Range": "bytes=0-3"})
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"].startswith("/_storage/")
+    assert response.content == b""
+
+
+def test_accel_redirect_escapes_object_names(mocker):
+    from conf.settings import settings
+    from core.database.schemas.minio import MinioFileDownload
+    from services.file import FileService
+
+    mocker.patch.object(settings.api, "accel_redirect", "/_storage/")
+    storage_file = MinioFileDownload(file_id=uuid.uuid4(), version=2, original_path="/docs/a b+c?.txt")
+    assert FileService._accel_redirect(storage_file) == "/_storage/files/docs/a%20b%2Bc%3F.txt/v2/content"
+
+
+def test_archive_names_of_versions_of_one_file_are_unique():
+    from types import SimpleNamespace
+
+    from services.file import FileService
+
+    versions = [
+        SimpleNamespace(path="/docs/a.txt", version=1),
+        SimpleNamespace(path="/docs/a.txt", version=2),
+        SimpleNamespace(path="/docs/a.v1.txt", version=1),
+        SimpleNamespace(path="/docs/b", version=3),
+    ]
+    assert FileService._archive_names(versions, "/") == ["docs/a.v1.txt", "docs/a.v2.txt", "docs/a.v1~2.txt", "docs/b"]
+
+
+def test_resumable_upload_takes_chunks_in_any_order(client, live_redis):
+    part_size = 8 * 1024 * 1024
+    content = bytes(range(256)) * (part_size // 256) + b"last chunk"
+    response = client.post(
+        "/api/v1/files/resumable",
+        json={
+            "path": "/test/resumable",
+            "bucket": "test-bucket",
+            "size": len(content),
+            "checksum": sha256(content).hexdigest(),
+        },
+    )
+    assert response.status_code == 201
+    upload = response.json()
+    assert upload["part_size"] == part_size
+    assert upload["missing"] == [1, 2]
+    url = f"/api/v1/files/resumable/{upload['upload_id']}"
+
+    response = client.put(f"{url}/parts/2", content=content[part_size:])
+    assert response.status_code == 200
+    assert response.json()["offset"] == part_size
+
+    status = client.get(url).json()
+    assert [chunk["part_number"] for chunk in status["received"]] == [2]
+    assert status["missing"] == [1]
+
+    assert client.put(f"{url}/parts/1", content=content[:part_size]).status_code == 200
+    # Storage keeps no SHA-256 of multipart content: commit answers 202 until a background job hashed it.
+    response = client.post(f"{url}/commit")
+    for _ in range(50):
+        if response.status_code != 202:
+            break
+        time.sleep(0.1)
+        response = client.post(f"{url}/commit")
+    assert response.status_code == 200
+    assert response.json()["size"] == len(content)
+
+    response = client.get("/api/v1/files/download/?path=/test/resumable", headers={"Range": f"bytes={part_size}-"})
+    assert response.content == b"last chunk"
+    assert client.get(url).status_code == 404
+
+
+class ChunkReader:
+    def __init__(self, data: bytes) -> None:
+        self._data = BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._data.read(size)
+
+
+@pytest.mark.asyncio
+async def test_filesystem_storage_round_trip(tmp_path: Path):
+    config = ObjectStorageConfig(endpoint="local", access_key="", secret_key="", part_size=5 * 1024 * 1024)
+    storage = FilesystemStorageClient(config, tmp_path, fsync=False)
+    content = b"0123456789" * 1000
+
+    uploaded = await storage.put_object_stream("docs/a/v1/content", ChunkReader(content))
+    assert uploaded.checksum == sha256(content).hexdigest()
+    assert b"".join([chunk async for chunk in await storage.get_object_stream("docs/a/v1/content", 10, 5)]) == b"01234"
+
+    upload_id = await storage.create_multipart_upload("docs/b/v1/content")
+    parts = [
+        StoragePart(part_number=2, etag=await storage.upload_part("docs/b/v1/content", upload_id, 2, b"world")),
+        StoragePart(part_number=1, etag=await storage.upload_part("docs/b/v1/content", upload_id, 1, b"hello ")),
+    ]
+    await storage.complete_multipart_upload("docs/b/v1/content", upload_id, parts)
+    assert b"".join([chunk async for chunk in await storage.get_object_stream("docs/b/v1/content")]) == b"hello world"
+
+    await storage.copy_object("docs/b/v1/content", "other/c/v1/content")
+    assert [obj.object_name for obj in await storage.list_objects("docs/")] == [
+        "docs/a/v1/content",
+        "docs/b/v1/content",
+    ]
+    assert storage.local_path("other/c/v1/content").read_bytes() == b"hello world"
+
+    await storage.remove_object("docs/a/v1/content")
+    assert [obj.object_name for obj in await storage.list_objects("docs/")] == ["docs/b/v1/content"]
+    assert not [path for path in tmp_path.rglob("*.tmp")]
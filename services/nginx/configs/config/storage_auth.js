@@ -0,0 +1,69 @@
+// Signature of the /_storage/ requests to MinIO (AWS Signature Version 4), made with the MinIO
+// credentials nginx gets from the files service .env, so no download depends on a presigned URL
+// expiring while its slices are fetched.
+import crypto from 'crypto';
+
+// Signed for MINIO_ENDPOINT, which MinIO checks against the Host of the request.
+const HOST = 'minio1:9000';
+const PREFIX = '/_storage';
+const UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD';
+const SIGNED_HEADERS = 'host;x-amz-content-sha256;x-amz-date';
+
+function sha256(data) {
+    return crypto.createHash('sha256').update(data).digest('hex');
+}
+
+function hmac(key, data) {
+    return crypto.createHmac('sha256', key).update(data).digest();
+}
+
+// S3 URI encoding: everything but unreserved characters and `/`, as UTF-8 bytes in upper-case hex.
+function uriEncode(value) {
+    const bytes = Buffer.from(value);
+    let encoded = '';
+    for (let i = 0; i < bytes.length; i++) {
+        const byte = bytes[i];
+        const ch = String.fromCharCode(byte);
+        encoded += /[A-Za-z0-9\-_.~\/]/.test(ch) ? ch : `%${byte.toString(16).toUpperCase().padStart(2, '0')}`;
+    }
+    return encoded;
+}
+
+// Object path on MinIO: `$uri` is unescaped by nginx, so it is encoded once here, the way it is signed,
+// and passed to MinIO as is.
+function path(r) {
+    return uriEncode(r.uri.slice(PREFIX.length));
+}
+
+// Authorization header of the request, also setting $storage_date it is signed with.
+function authorization(r) {
+    const accessKey = process.env.MINIO_ROOT_USER;
+    const region = process.env.MINIO_REGION || 'us-east-1';
+    const date = new Date().toISOString().replace(/[-:]/g, '').replace(/\.\d+/, '');
+    const day = date.slice(0, 8);
+    const scope = `${day}/${region}/s3/aws4_request`;
+
+    const canonicalRequest = [
+        'GET',
+        path(r),
+        '',
+        `host:${HOST}`,
+        `x-amz-content-sha256:${UNSIGNED_PAYLOAD}`,
+        `x-amz-date:${date}`,
+        '',
+        SIGNED_HEADERS,
+        UNSIGNED_PAYLOAD,
+    ].join('\n');
+    const stringToSign = ['AWS4-HMAC-SHA256', date, scope, sha256(canonicalRequest)].join('\n');
+
+    let key = `AWS4${process.env.MINIO_ROOT_PASSWORD}`;
+    for (const part of [day, region, 's3', 'aws4_request']) {
+        key = hmac(key, part);
+    }
+    const signature = crypto.createHmac('sha256', key).update(stringToSign).digest('hex');
+
+    r.variables.storage_date = date;
+    return `AWS4-HMAC-SHA256 Credential=${accessKey}/${scope}, SignedHeaders=${SIGNED_HEADERS}, Signature=${signature}`;
+}
+
+export default { path, authorization };
@@ -0,0 +1,38 @@
+// Purges of the `storage` proxy_cache. Open source nginx has no proxy_cache_purge, but takes an
+// entry whose file is gone for a miss, so an object is purged by removing the file of each slice.
+import crypto from 'crypto';
+import fs from 'fs';
+
+const CACHE_DIR = '/var/cache/nginx/storage';
+// `slice` of the /_storage/ location
+const SLICE = 1024 * 1024;
+
+function cacheFile(key) {
+    const digest = crypto.createHash('md5').update(key).digest('hex');
+    // levels=1:2
+    return `${CACHE_DIR}/${digest.slice(-1)}/${digest.slice(-3, -1)}/${digest}`;
+}
+
+function purge(r) {
+    const size = parseInt(r.args.size, 10);
+    if (!(size >= 0)) {
+        r.return(400, 'size is required\n');
+        return;
+    }
+
+    let purged = 0;
+    for (let start = 0; start < Math.max(size, 1); start += SLICE) {
+        try {
+            // Same key as proxy_cache_key: $uri$slice_range
+            fs.unlinkSync(cacheFile(`${r.uri}bytes=${start}-${start + SLICE - 1}`));
+            purged++;
+        } catch (e) {
+            if (e.code !== 'ENOENT') {
+                throw e;
+            }
+        }
+    }
+    r.return(200, `${purged}\n`);
+}
+
+export default { purge };